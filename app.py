@@ -4,7 +4,7 @@ Main Streamlit Application Entry Point
 """
 
 import streamlit as st
-from src.config.settings import load_config
+from src.config.settings import get_settings
 from src.auth.authenticator import check_authentication
 from src.utils.diagnostics import run_diagnostics
 
@@ -16,11 +16,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Run database diagnostics before anything else and cache result in session
-if "db_diagnostics" not in st.session_state:
-    st.session_state.db_diagnostics = run_diagnostics()
-
-diagnostics = st.session_state.db_diagnostics
+# Database diagnostics come from the process-wide health monitor's cached
+# snapshot (refreshed in the background), so this costs no round trip
+diagnostics = run_diagnostics()
 
 with st.container():
     if diagnostics["config_ok"] and diagnostics["connection_ok"]:
@@ -75,8 +73,8 @@ with st.container():
 
     st.divider()
 
-# Load configuration
-config = load_config()
+# Load configuration (built once per process)
+config = get_settings()
 
 # Initialize session state
 if "authenticated" not in st.session_state:
@@ -0,0 +1,176 @@
+"""
+Micro-benchmarks for the performance work on settings and data loading
+Run: python benchmark.py settings [--calls 2000]
+     python benchmark.py student-columns [--seed 10000] [--repeat 5]
+
+Each benchmark prints per-call (or per-query) timings so a change can be
+compared before and after on the same machine:
+
+- settings: resolving configuration. "rebuild per call" is what every
+  load_config() call used to do (read Streamlit secrets and environment
+  variables into a new dict); load_config() is now a copy of the settings
+  built once per process, and get_settings() returns that object.
+- student-columns: ``session.query(Student).all()`` with every deferred
+  column group loaded (the behaviour before the groups were deferred),
+  with none (list views) and with contact + academic (profile cards).
+  ``--seed N`` first tops the students table up to N synthetic
+  registrations with realistic JSON and notes; point DATABASE_URL at a
+  scratch database for that.
+
+Run outside ``streamlit run``: secrets lookups fail fast there, so the
+rebuild cost measured here is a lower bound.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import func, select, text
+
+from src.config.settings import _build_settings, get_settings, load_config
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.services.student_service import student_details
+
+
+def _per_call_us(fn, calls: int) -> float:
+    """Best of three runs of ``calls`` calls, in microseconds per call"""
+    fn()
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1e6
+
+
+def bench_settings(args):
+    """Cost of reading configuration per call"""
+    print(f"{'settings lookup':<40} {'us/call':>10}")
+    for label, fn in (
+        ("rebuild per call (previous load_config)", lambda: _build_settings().as_dict()),
+        ("load_config() (dict copy)", load_config),
+        ("get_settings()", get_settings),
+    ):
+        print(f"{label:<40} {_per_call_us(fn, args.calls):>10.1f}")
+
+
+def _synthetic_student(number: int, rnd: random.Random) -> dict:
+    grade = str(number % 12 + 1)
+    return dict(
+        admission_number=f"BENCH-{number:06d}",
+        first_name=f"First{rnd.randrange(1000)}",
+        last_name=f"Last{rnd.randrange(1000)}",
+        date_of_birth=date(2015, 1, 1),
+        enrollment_date=date(2025, 1, 1),
+        grade=grade,
+        section="ABC"[number % 3],
+        registration_status='approved',
+        registration_step=6,
+        contact_info={
+            'primary_guardian': {'full_name': "Guardian Name", 'phone': "555-0100", 'email': "g@example.com", 'relationship': "Mother"},
+            'address': {'line1': "1 Main St", 'city_state_zip': "Springfield 12345"},
+            'emergency_contacts': [{'name': "Emergency Contact", 'relationship': "Aunt", 'phone': "555-0101"}] * 2,
+        },
+        academic_info={
+            'current_enrollment': {'grade': grade, 'section': "A", 'class_teacher': "Teacher", 'previous_school': "Previous School"},
+            'schedule_preferences': {'prefers_morning': True},
+        },
+        medical_info={
+            'conditions': [{'name': "Asthma", 'severity': "mild", 'notes': "n" * 200}],
+            'allergies': [{'allergen': "Peanut", 'severity': "high"}],
+            'medications': [{'name': "Medication", 'dosage': "5mg"}],
+        },
+        learning_profile={
+            'primary_diagnosis': "Dyslexia",
+            'impact_level': "moderate",
+            'affected_areas': ["reading", "writing"],
+            'notes': "x" * 400,
+        },
+        internal_notes="i" * 120,
+        parent_notes="p" * 120,
+    )
+
+
+def _seed_students(target: int):
+    """Insert synthetic students until the table holds ``target`` rows"""
+    with get_db_session() as session:
+        existing = session.scalar(select(func.count()).select_from(Student))
+        missing = target - existing
+        if missing <= 0:
+            return
+        print(f"Seeding {missing} synthetic students...")
+        rnd = random.Random(1)
+        first = session.scalar(
+            select(func.count()).select_from(Student).where(Student.admission_number.like("BENCH-%"))
+        )
+        session.execute(
+            Student.__table__.insert(),
+            [_synthetic_student(first + i, rnd) for i in range(missing)],
+        )
+
+
+def bench_student_columns(args):
+    """Cost of loading Student objects with and without the deferred column groups"""
+    if args.seed:
+        _seed_students(args.seed)
+
+    with get_db_session(readonly=True) as session:
+        count = session.scalar(select(func.count()).select_from(Student))
+        if session.get_bind().dialect.name == 'postgresql':
+            sizes = session.execute(text(
+                "SELECT sum(pg_column_size(s.*)), "
+                "sum(coalesce(pg_column_size(contact_info), 0) + coalesce(pg_column_size(academic_info), 0) "
+                "+ coalesce(pg_column_size(medical_info), 0) + coalesce(pg_column_size(learning_profile), 0) "
+                "+ coalesce(pg_column_size(internal_notes), 0) + coalesce(pg_column_size(parent_notes), 0)) "
+                "FROM students s"
+            )).one()
+            print(f"students: {count} rows, {sizes[0] / 1e6:.1f} MB row data, {sizes[1] / 1e6:.1f} MB in deferred columns")
+        else:
+            print(f"students: {count} rows")
+
+    print(f"{'session.query(Student).all()':<40} {'best ms':>10}")
+    for label, options in (
+        ("all groups loaded (before deferral)", student_details()),
+        ("groups deferred (list views)", []),
+        ("contact + academic (profile cards)", student_details('contact', 'academic')),
+    ):
+        best = float("inf")
+        for _ in range(args.repeat):
+            with get_db_session(readonly=True) as session:
+                started = time.perf_counter()
+                session.query(Student).options(*options).all()
+                best = min(best, time.perf_counter() - started)
+        print(f"{label:<40} {best * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SEIMS micro-benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    settings_parser = subparsers.add_parser("settings", help="Configuration lookup cost")
+    settings_parser.add_argument("--calls", type=int, default=2000, help="Calls per run (default: 2000)")
+    settings_parser.set_defaults(run=bench_settings)
+
+    columns_parser = subparsers.add_parser("student-columns", help="Deferred Student column groups")
+    columns_parser.add_argument("--seed", type=int, default=0, help="Top the students table up to this many rows first")
+    columns_parser.add_argument("--repeat", type=int, default=5, help="Runs per variant; the best is reported (default: 5)")
+    columns_parser.set_defaults(run=bench_student_columns)
+
+    args = parser.parse_args()
+    return args.run(args) or 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Cancelled by user.")
+        sys.exit(1)
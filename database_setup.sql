@@ -13,11 +13,20 @@ CREATE TABLE IF NOT EXISTS users (
     role VARCHAR(50) NOT NULL,
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     last_login TIMESTAMP
 );
 
+-- Ensure updated_at exists (for upgrades on existing databases)
+ALTER TABLE users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+-- Change watermark for cache invalidation polling (src/services/invalidation_bus.py)
+CREATE INDEX IF NOT EXISTS idx_users_updated_at ON users(updated_at);
+-- Case-insensitive prefix search in the Admin Panel (src/services/user_service.py)
+CREATE INDEX IF NOT EXISTS idx_users_name_prefix ON users (lower(name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_prefix ON users (lower(email) text_pattern_ops);
 
 -- Create students table
 CREATE TABLE IF NOT EXISTS students (
@@ -43,6 +52,9 @@ CREATE TABLE IF NOT EXISTS students (
     learning_profile JSONB,
     review_status VARCHAR(50),
     review_notes TEXT,
+    claimed_by INTEGER REFERENCES users(user_id),
+    claimed_until TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 1,
     created_by INTEGER REFERENCES users(user_id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -51,6 +63,10 @@ CREATE TABLE IF NOT EXISTS students (
 CREATE INDEX IF NOT EXISTS idx_students_admission ON students(admission_number);
 CREATE INDEX IF NOT EXISTS idx_students_status ON students(status);
 CREATE INDEX IF NOT EXISTS idx_students_registration_status ON students(registration_status);
+-- Roster sort order; also serves keyset pagination on (first_name, last_name, student_id)
+CREATE INDEX IF NOT EXISTS idx_students_roster ON students(first_name, last_name, student_id);
+-- Change watermark for cache invalidation polling (src/services/invalidation_bus.py)
+CREATE INDEX IF NOT EXISTS idx_students_updated_at ON students(updated_at);
 
 -- Ensure new registration columns exist (for upgrades on existing databases)
 ALTER TABLE students
@@ -65,7 +81,30 @@ ALTER TABLE students
     ADD COLUMN IF NOT EXISTS internal_notes TEXT,
     ADD COLUMN IF NOT EXISTS parent_notes TEXT,
     ADD COLUMN IF NOT EXISTS reviewed_by INTEGER REFERENCES users(user_id),
-    ADD COLUMN IF NOT EXISTS reviewed_at TIMESTAMP;
+    ADD COLUMN IF NOT EXISTS reviewed_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS claimed_by INTEGER REFERENCES users(user_id),
+    ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- "Claim next registration" (src/services/student_service.claim_next_registration):
+-- oldest pending first, and each reviewer's own claim
+CREATE INDEX IF NOT EXISTS idx_students_review_queue ON students(created_at, student_id)
+    WHERE registration_status = 'pending_review';
+CREATE INDEX IF NOT EXISTS idx_students_claimed_by ON students(claimed_by)
+    WHERE claimed_by IS NOT NULL;
+
+-- Student search (src/services/search_service.py); the expression must match
+-- _PG_SEARCH_DOCUMENT exactly for the planner to use this index
+CREATE INDEX IF NOT EXISTS idx_students_search ON students USING GIN ((
+    setweight(to_tsvector('simple', regexp_replace(
+        coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(admission_number, ''),
+        '[^[:alnum:]]+', ' ', 'g')), 'A') ||
+    setweight(to_tsvector('simple', regexp_replace(
+        coalesce(preferred_name, ''), '[^[:alnum:]]+', ' ', 'g')), 'B') ||
+    setweight(to_tsvector('simple', regexp_replace(
+        coalesce(contact_info -> 'primary_guardian' ->> 'full_name', ''), '[^[:alnum:]]+', ' ', 'g')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(grade, '')), 'D')
+));
 
 -- Sample student registrations for review/testing
 INSERT INTO users (email, password_hash, name, role, is_active)
@@ -291,6 +330,12 @@ END;
 $$ language 'plpgsql';
 
 -- Create triggers for updated_at
+DROP TRIGGER IF EXISTS update_users_updated_at ON users;
+CREATE TRIGGER update_users_updated_at
+    BEFORE UPDATE ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 DROP TRIGGER IF EXISTS update_students_updated_at ON students;
 CREATE TRIGGER update_students_updated_at
     BEFORE UPDATE ON students
@@ -303,6 +348,86 @@ CREATE TRIGGER update_ieps_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Cache invalidation polls count(*) and max(updated_at) instead of a shared
+-- change-counter row, which serialized every writer; drop it if present
+DROP TRIGGER IF EXISTS bump_users_cache_version ON users;
+DROP TRIGGER IF EXISTS bump_students_cache_version ON students;
+DROP FUNCTION IF EXISTS bump_cache_table_version();
+DROP TABLE IF EXISTS cache_table_versions;
+
+-- Admission numbers: S-<year>-<n>, with n counting up per calendar year
+-- from one sequence per year (admission_numbers_<year>). nextval() never
+-- waits for other transactions, so registrations and imports don't queue
+-- behind each other; the price is that a rolled-back insert leaves a gap
+-- in the year's numbers, which is fine for an identifier.
+-- Assigned by a BEFORE INSERT trigger so the number comes back in the
+-- INSERT's RETURNING clause (see Student.admission_number in models.py)
+CREATE OR REPLACE FUNCTION admission_number_sequence(admission_year INTEGER)
+RETURNS REGCLASS AS $$
+DECLARE
+    sequence_name TEXT := 'admission_numbers_' || admission_year;
+    issued BIGINT;
+BEGIN
+    IF to_regclass(sequence_name) IS NULL THEN
+        -- First number of the year: continue after any already issued
+        SELECT max(substring(admission_number FROM 8)::BIGINT) INTO issued
+        FROM students
+        WHERE admission_number ~ ('^S-' || admission_year || '-[0-9]+$');
+        IF to_regclass('admission_counters') IS NOT NULL THEN
+            EXECUTE 'SELECT greatest($1, max(last_number)) FROM admission_counters WHERE year = $2'
+            INTO issued USING issued, admission_year;
+        END IF;
+        BEGIN
+            EXECUTE format('CREATE SEQUENCE %I START WITH %s', sequence_name, coalesce(issued, 0) + 1);
+        EXCEPTION WHEN duplicate_table OR unique_violation THEN
+            NULL;  -- a concurrent transaction created it first
+        END;
+    END IF;
+    RETURN sequence_name::REGCLASS;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION next_admission_number()
+RETURNS VARCHAR AS $$
+DECLARE
+    current_year INTEGER := extract(year FROM CURRENT_DATE)::INTEGER;
+    issued BIGINT := nextval(admission_number_sequence(current_year));
+BEGIN
+    -- At least 4 digits, never truncated past 9999
+    RETURN 'S-' || current_year || '-' || lpad(issued::TEXT, greatest(length(issued::TEXT), 4), '0');
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION assign_admission_number()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.admission_number IS NULL THEN
+        NEW.admission_number = next_admission_number();
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS assign_students_admission_number ON students;
+CREATE TRIGGER assign_students_admission_number
+    BEFORE INSERT ON students
+    FOR EACH ROW
+    EXECUTE FUNCTION assign_admission_number();
+
+-- Databases set up with the earlier per-year counter table (a locked row
+-- per year): carry each year's count over into its sequence, then drop it
+DO $$
+DECLARE
+    counter_year INTEGER;
+BEGIN
+    IF to_regclass('admission_counters') IS NOT NULL THEN
+        FOR counter_year IN SELECT year FROM admission_counters LOOP
+            PERFORM admission_number_sequence(counter_year);
+        END LOOP;
+        DROP TABLE admission_counters;
+    END IF;
+END $$;
+
 -- Success message
 DO $$
 BEGIN
@@ -0,0 +1,59 @@
+"""
+Export students, sessions and assessments for the district
+Run: python export_data.py [students sessions assessments] --format csv|jsonl|parquet [--flatten] [--out-dir exports]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.services.export_service import EXPORT_BATCH_SIZE, EXPORT_FORMATS, EXPORT_TABLES, export_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream SEIMS tables to export files")
+    parser.add_argument(
+        "tables",
+        nargs="*",
+        help=f"Tables to export: {', '.join(EXPORT_TABLES)} (default: all)",
+    )
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="Output format (default: csv)")
+    parser.add_argument("--flatten", action="store_true", help="Expand JSON columns into one column per nested key")
+    parser.add_argument("--out-dir", default="exports", help="Directory for export files (default: exports)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=EXPORT_BATCH_SIZE,
+        help=f"Rows fetched per round trip (default: {EXPORT_BATCH_SIZE})",
+    )
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    stamp = date.today().strftime("%Y%m%d")
+    failed = False
+    for table_name in args.tables or list(EXPORT_TABLES):
+        path = os.path.join(args.out_dir, f"{table_name}_{stamp}.{args.format}")
+        started = time.perf_counter()
+        try:
+            rows = export_table(
+                table_name, args.format, path, flatten=args.flatten, batch_size=args.batch_size
+            )
+        except Exception as e:
+            print(f"❌ {table_name}: {e}")
+            failed = True
+            continue
+        print(f"✅ {table_name}: {rows} row(s) → {path} ({time.perf_counter() - started:.1f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Cancelled by user.")
+        sys.exit(1)
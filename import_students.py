@@ -0,0 +1,83 @@
+"""
+Bulk-import students from a CSV or Excel file
+Run: python import_students.py students.csv [--status draft] [--dry-run] [--errors errors.csv]
+"""
+
+import argparse
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.database.connection import get_db_session
+from src.database.models import User
+from src.services.import_service import IMPORT_STATUSES, import_students, read_student_file
+
+
+def _user_id_for(email):
+    """user_id of the account recorded as the registering user"""
+    with get_db_session(readonly=True) as session:
+        user = session.query(User).filter(User.email == email).first()
+        return user.user_id if user else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import students into SEIMS")
+    parser.add_argument("file", help="CSV or XLSX file to import")
+    parser.add_argument(
+        "--status",
+        choices=IMPORT_STATUSES,
+        default="pending_review",
+        help="Registration status for imported students (default: pending_review)",
+    )
+    parser.add_argument("--created-by", metavar="EMAIL", help="Record this user as the registering user")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only; write nothing")
+    parser.add_argument("--errors", metavar="PATH", help="Write the per-row error report to this CSV file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SEIMS - Bulk Student Import")
+    print("=" * 60)
+
+    try:
+        df = read_student_file(args.file)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    created_by = None
+    if args.created_by:
+        created_by = _user_id_for(args.created_by)
+        if created_by is None:
+            print(f"❌ No user with email '{args.created_by}'")
+            return 1
+
+    print(f"\n⏳ {'Validating' if args.dry_run else 'Importing'} {len(df)} row(s) from {args.file}...")
+    result = import_students(df, created_by=created_by, registration_status=args.status, dry_run=args.dry_run)
+
+    print(f"Valid rows:    {result.valid_rows}")
+    print(f"Rejected rows: {result.rejected_rows}")
+    if not args.dry_run:
+        print(f"✅ Imported:   {len(result.imported)}")
+        if not result.imported.empty:
+            first, last = result.imported['admission_number'].iloc[[0, -1]]
+            print(f"Admission numbers: {first} … {last}")
+
+    if not result.errors.empty:
+        if args.errors:
+            with open(args.errors, "wb") as f:
+                f.write(result.error_report_csv())
+            print(f"⚠️  Error report written to {args.errors}")
+        else:
+            print("\n⚠️  Errors:")
+            print(result.errors.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Cancelled by user.")
+        sys.exit(1)
@@ -0,0 +1,174 @@
+"""
+Concurrent-user load test for the database connection profiles
+Run: python load_test.py [--profiles session_pooler transaction_pooler direct] [--users 5 10 20 40 80] [--duration 15]
+
+Each simulated user repeatedly "views a page": a few short read-only
+sessions (dashboard counters, a student lookup, a user count) run one
+after another, followed by think time. For every profile and user count
+the test reports page views per second, page latency percentiles,
+connection checkout wait, failures (e.g. pool timeouts) and the peak
+number of server connections seen in pg_stat_activity.
+
+A profile's capacity is the largest user count whose p95 page latency
+stays within --target-ms without failures. Point DATABASE_URL at the
+pooler being sized; results depend on its limits and network latency.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import func, select, text
+
+from src.config.settings import reload_settings
+from src.database.connection import _get_engine, connect_outside_pool, dispose_engines, get_db_session
+from src.database.connection_profiles import PROFILE_NAMES
+from src.database.instrumentation import _percentile, clear_query_records, get_checkout_records
+from src.database.models import Student, User
+from src.services.dashboard_service import _dashboard_metrics_stmt
+
+
+def _page_view(student_ids):
+    """One page render's worth of database work, one session per section"""
+    with get_db_session(readonly=True) as session:
+        session.execute(_dashboard_metrics_stmt()).one()
+    with get_db_session(readonly=True) as session:
+        session.execute(select(Student).where(Student.student_id == random.choice(student_ids))).first()
+    with get_db_session(readonly=True) as session:
+        session.execute(select(func.count()).select_from(User).where(User.is_active == True)).scalar()
+
+
+class _ServerConnectionMonitor:
+    """Samples this database's backend count from a connection outside the pool"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-test-monitor", daemon=True)
+
+    def _run(self):
+        connection = connect_outside_pool(_get_engine()[0])
+        connection.autocommit = True
+        try:
+            cursor = connection.cursor()
+            while not self._stop.is_set():
+                cursor.execute(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                )
+                self.peak = max(self.peak, cursor.fetchone()[0])
+                self._stop.wait(self.interval)
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_level(users: int, duration: float, think_time: float, student_ids) -> dict:
+    """Run ``users`` concurrent users for ``duration`` seconds"""
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user():
+        # Stagger start-up so users don't arrive in lockstep
+        time.sleep(random.uniform(0, think_time))
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                _page_view(student_ids)
+            except Exception as e:
+                with lock:
+                    failures.append(type(e).__name__)
+            else:
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(random.expovariate(1 / think_time) if think_time > 0 else 0)
+
+    clear_query_records()
+    threads = [threading.Thread(target=user, daemon=True) for _ in range(users)]
+    with _ServerConnectionMonitor() as monitor:
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    waits = sorted(r.wait_ms for r in get_checkout_records())
+    return {
+        'users': users,
+        'views_per_s': len(latencies) / elapsed,
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'wait_p95_ms': _percentile(waits, 95),
+        'failures': len(failures),
+        'failure_types': sorted(set(failures)),
+        'server_connections': monitor.peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-user capacity per connection profile")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILE_NAMES, default=list(PROFILE_NAMES))
+    parser.add_argument("--users", nargs="+", type=int, default=[5, 10, 20, 40, 80], help="Concurrent users per step")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per step (default: 15)")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between page views (default: 1)")
+    parser.add_argument("--target-ms", type=float, default=500, help="p95 page latency target (default: 500)")
+    args = parser.parse_args()
+
+    capacities = {}
+    for profile in args.profiles:
+        os.environ['DB_CONNECTION_PROFILE'] = profile
+        reload_settings()
+        dispose_engines()
+        with get_db_session(readonly=True) as session:
+            if session.get_bind().dialect.name != 'postgresql':
+                print("❌ The load test needs a PostgreSQL DATABASE_URL")
+                return 1
+            student_ids = session.execute(select(Student.student_id).limit(1000)).scalars().all() or [0]
+            session.execute(text("SELECT 1"))
+
+        print(f"\n=== {profile} ===")
+        print(f"{'users':>6} {'views/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'wait p95':>9} {'fails':>6} {'server conns':>13}")
+        capacities[profile] = 0
+        for users in args.users:
+            result = run_level(users, args.duration, args.think_time, student_ids)
+            print(
+                f"{result['users']:>6} {result['views_per_s']:>8.1f} {result['p50_ms']:>8.1f} "
+                f"{result['p95_ms']:>8.1f} {result['wait_p95_ms']:>9.1f} {result['failures']:>6} "
+                f"{result['server_connections']:>13}"
+                + (f"  ({', '.join(result['failure_types'])})" if result['failures'] else "")
+            )
+            if result['failures'] or result['p95_ms'] > args.target_ms:
+                break
+            capacities[profile] = users
+        dispose_engines()
+
+    print(f"\nCapacity (p95 ≤ {args.target_ms:g} ms, no failures):")
+    for profile, users in capacities.items():
+        print(f"  {profile:<20} {users if users else '<' + str(args.users[0])} concurrent users")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Cancelled by user.")
+        sys.exit(1)
@@ -4,9 +4,20 @@ Dashboard page - Role-specific dashboard with approval workflow
 
 import streamlit as st
 from datetime import datetime
+from sqlalchemy.orm import joinedload
 from src.auth.permissions import get_role_display_name, can_approve_registrations
+from src.database.async_runner import gather_loaders
 from src.database.connection import get_db_session
-from src.database.models import User, Student
+from src.database.models import Student
+from src.services.dashboard_service import EMPTY_METRICS, load_dashboard_metrics_async
+from src.services.student_service import (
+    claim_next_registration,
+    list_approval_queue_async,
+    patch_registration,
+    release_registration_claim,
+    review_registrations,
+    student_details,
+)
 
 st.set_page_config(page_title="Dashboard", page_icon="🏠", layout="wide")
 
@@ -22,59 +33,15 @@ user_id = st.session_state.get('user_id')
 # Helper functions
 # ---------------------------------------------------------------------------
 
-def _load_dashboard_metrics():
-    """Load dashboard metrics from database"""
-    with get_db_session() as session:
-        total_users = session.query(User).filter(User.is_active == True).count()
-        active_students = session.query(Student).filter(Student.status == 'active').count()
-        pending_approvals = session.query(Student).filter(
-            Student.registration_status == 'pending_review'
-        ).count()
-        on_hold = session.query(Student).filter(
-            Student.registration_status == 'on_hold'
-        ).count()
-        return {
-            'total_users': total_users,
-            'active_students': active_students,
-            'pending_approvals': pending_approvals,
-            'on_hold': on_hold
-        }
-
-def _load_pending_registrations():
-    """Load students pending approval"""
-    with get_db_session() as session:
-        students = session.query(Student).filter(
-            Student.registration_status.in_(['pending_review', 'on_hold'])
-        ).order_by(Student.created_at.desc()).all()
-        # Detach from session to use outside
-        result = []
-        for s in students:
-            result.append({
-                'student_id': s.student_id,
-                'admission_number': s.admission_number,
-                'first_name': s.first_name,
-                'last_name': s.last_name,
-                'preferred_name': s.preferred_name,
-                'date_of_birth': s.date_of_birth,
-                'gender': s.gender,
-                'enrollment_date': s.enrollment_date,
-                'registration_status': s.registration_status,
-                'registration_step': s.registration_step,
-                'contact_info': s.contact_info or {},
-                'academic_info': s.academic_info or {},
-                'medical_info': s.medical_info or {},
-                'learning_profile': s.learning_profile or {},
-                'internal_notes': s.internal_notes or '',
-                'parent_notes': s.parent_notes or '',
-                'created_at': s.created_at,
-                'created_by': s.created_by_user.name if s.created_by_user else 'Unknown'
-            })
-        return result
-
 def _get_student_by_id(student_id: int):
-    """Load a single student for detail view"""
+    """Load a single student, including profile JSON, for the detail view"""
     with get_db_session() as session:
-        s = session.query(Student).filter(Student.student_id == student_id).first()
+        s = (
+            session.query(Student)
+            .options(joinedload(Student.created_by_user), joinedload(Student.claimed_by_user), *student_details())
+            .filter(Student.student_id == student_id)
+            .first()
+        )
         if not s:
             return None
         return {
@@ -97,25 +64,54 @@ def _get_student_by_id(student_id: int):
             'internal_notes': s.internal_notes or '',
             'parent_notes': s.parent_notes or '',
             'created_at': s.created_at,
-            'created_by': s.created_by_user.name if s.created_by_user else 'Unknown'
+            'created_by': s.created_by_user.name if s.created_by_user else 'Unknown',
+            'claimed_by': s.claimed_by,
+            'claimed_by_name': s.claimed_by_user.name if s.claimed_by_user else None,
+            'claimed_until': s.claimed_until,
+            'version': s.version,
         }
 
-def _update_registration_status(student_id: int, new_status: str, internal_notes: str, parent_notes: str, reviewer_id: int):
-    """Update student registration status and notes"""
-    with get_db_session() as session:
-        student = session.query(Student).filter(Student.student_id == student_id).first()
-        if student:
-            student.registration_status = new_status
-            student.internal_notes = internal_notes
-            student.parent_notes = parent_notes
-            student.reviewed_by = reviewer_id
-            student.reviewed_at = datetime.utcnow()
-            # If approved, also set status to active
-            if new_status == 'approved':
-                student.status = 'active'
-            session.commit()
-            return True
-    return False
+def _update_registration_status(student_id: int, new_status: str, internal_notes: str, parent_notes: str, reviewer_id: int, version: int):
+    """
+    Update student registration status and notes, unless someone else changed it since ``version``
+
+    Returns the updated row (with the new version), or None on a conflict
+    """
+    rows = review_registrations(
+        [student_id], new_status, reviewer_id, internal_notes, parent_notes, versions={student_id: version}
+    )
+    return rows[0] if rows else None
+
+def _save_review_notes(student_id: int, internal_notes: str, parent_notes: str, version: int):
+    """
+    Save the review notes without deciding, keeping the reviewer's claim
+
+    Returns the new version, or None if someone else changed the registration since ``version``
+    """
+    saved = patch_registration(
+        student_id,
+        values={'internal_notes': internal_notes, 'parent_notes': parent_notes},
+        version=version,
+    )
+    return version + 1 if saved else None
+
+_CONFLICT_MESSAGE = "it was changed or decided by someone else since you opened it."
+
+def _claim_active(claimed_by, claimed_until) -> bool:
+    """True if another reviewer holds an unexpired claim"""
+    return bool(claimed_by and claimed_by != user_id and claimed_until and claimed_until > datetime.utcnow())
+
+def _open_review(student_id: int, version=None):
+    """Show a registration in the review view; ``version`` is what the reviewer is deciding on"""
+    st.session_state.approval_view_student = student_id
+    st.session_state.approval_view_version = version
+
+def _close_review(student=None):
+    """Back to the queue, giving back the reviewer's claim on ``student`` if they hold one"""
+    if student and user_id and student['claimed_by'] == user_id:
+        release_registration_claim(student['student_id'], user_id)
+    st.session_state.approval_view_student = None
+    st.session_state.approval_view_version = None
 
 # ---------------------------------------------------------------------------
 # Dashboard Header
@@ -125,12 +121,29 @@ st.title("🏠 Dashboard")
 st.markdown(f"### Welcome, {user_name}")
 st.caption(f"Role: {get_role_display_name(user_role)}")
 
-# Load metrics
-try:
-    metrics = _load_dashboard_metrics()
-except Exception as e:
-    st.error(f"Could not load dashboard metrics: {e}")
-    metrics = {'total_users': 0, 'active_students': 0, 'pending_approvals': 0, 'on_hold': 0}
+# Load everything the page shows at once: metrics (cached process-wide; one
+# aggregate query when stale) alongside the approval queue or the registration
+# under review, so the page waits for the slowest query, not the sum
+page_loaders = {'metrics': load_dashboard_metrics_async}
+if can_approve_registrations(user_role):
+    viewing_student_id = st.session_state.get('approval_view_student')
+    if viewing_student_id:
+        page_loaders['student'] = lambda: _get_student_by_id(viewing_student_id)
+    else:
+        page_loaders['queue'] = list_approval_queue_async
+page_data = gather_loaders(return_exceptions=True, **page_loaders)
+
+def _page_data(name: str):
+    """A loaded section, re-raising its loader's error here"""
+    value = page_data[name]
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+metrics = page_data['metrics']
+if isinstance(metrics, Exception):
+    st.error(f"Could not load dashboard metrics: {metrics}")
+    metrics = dict(EMPTY_METRICS)
 
 # ---------------------------------------------------------------------------
 # Role-specific dashboard content
@@ -184,17 +197,23 @@ if can_approve_registrations(user_role):
     # Check if viewing a specific student
     if 'approval_view_student' in st.session_state and st.session_state.approval_view_student:
         student_id = st.session_state.approval_view_student
-        student = _get_student_by_id(student_id)
+        student = _page_data('student')
         
         if not student:
             st.error("Student not found.")
             if st.button("← Back to Queue"):
-                st.session_state.approval_view_student = None
+                _close_review()
                 st.rerun()
         else:
+            # The version being reviewed: fixed when the registration was
+            # opened, so a change made since then is detected on save
+            if st.session_state.get('approval_view_version') is None:
+                st.session_state.approval_view_version = student['version']
+            review_version = st.session_state.approval_view_version
+            
             # Back button
             if st.button("← Back to Queue"):
-                st.session_state.approval_view_student = None
+                _close_review(student)
                 st.rerun()
             
             st.markdown("---")
@@ -206,6 +225,22 @@ if can_approve_registrations(user_role):
             elif status == 'on_hold':
                 st.warning("🟡 **Status: On Hold** - Awaiting additional information")
             
+            # Reviewer claim
+            if _claim_active(student['claimed_by'], student['claimed_until']):
+                st.warning(
+                    f"🔒 {student['claimed_by_name'] or 'Another reviewer'} is reviewing this registration "
+                    f"(claimed until {student['claimed_until'].strftime('%H:%M')} UTC)."
+                )
+            elif student['claimed_by'] == user_id and student['claimed_until']:
+                st.caption(f"🎯 Claimed by you until {student['claimed_until'].strftime('%H:%M')} UTC")
+            
+            # Changed since it was opened
+            if student['version'] != review_version:
+                st.warning("⚠️ This registration has been changed since you opened it.")
+                if st.button("🔄 Review latest version"):
+                    st.session_state.approval_view_version = student['version']
+                    st.rerun()
+            
             # Student profile summary
             st.markdown(f"## {student['first_name']} {student['last_name']}")
             if student['preferred_name']:
@@ -342,47 +377,119 @@ if can_approve_registrations(user_role):
             
             with col_act1:
                 if st.button("✅ Approve", type="primary", use_container_width=True):
-                    if _update_registration_status(student_id, 'approved', internal_notes, parent_notes, user_id):
+                    if _update_registration_status(student_id, 'approved', internal_notes, parent_notes, user_id, review_version):
                         st.success("Registration approved! Student is now active.")
-                        st.session_state.approval_view_student = None
+                        _close_review()
                         st.rerun()
                     else:
-                        st.error("Failed to approve registration.")
+                        st.error(f"Failed to approve registration: {_CONFLICT_MESSAGE}")
             
             with col_act2:
                 if st.button("❌ Deny", type="secondary", use_container_width=True):
-                    if _update_registration_status(student_id, 'denied', internal_notes, parent_notes, user_id):
+                    if _update_registration_status(student_id, 'denied', internal_notes, parent_notes, user_id, review_version):
                         st.warning("Registration denied. Creator can edit and resubmit.")
-                        st.session_state.approval_view_student = None
+                        _close_review()
                         st.rerun()
                     else:
-                        st.error("Failed to deny registration.")
+                        st.error(f"Failed to deny registration: {_CONFLICT_MESSAGE}")
             
             with col_act3:
                 if st.button("⏸️ Withhold", type="secondary", use_container_width=True):
-                    if _update_registration_status(student_id, 'on_hold', internal_notes, parent_notes, user_id):
+                    if _update_registration_status(student_id, 'on_hold', internal_notes, parent_notes, user_id, review_version):
                         st.info("Registration on hold. Creator will be notified to provide more information.")
-                        st.session_state.approval_view_student = None
+                        _close_review()
                         st.rerun()
                     else:
-                        st.error("Failed to put registration on hold.")
+                        st.error(f"Failed to put registration on hold: {_CONFLICT_MESSAGE}")
             
             with col_act4:
                 if st.button("💾 Save Notes Only", use_container_width=True):
-                    if _update_registration_status(student_id, student['registration_status'], internal_notes, parent_notes, user_id):
+                    saved_version = _save_review_notes(student_id, internal_notes, parent_notes, review_version)
+                    if saved_version is not None:
+                        st.session_state.approval_view_version = saved_version
                         st.success("Notes saved.")
                     else:
-                        st.error("Failed to save notes.")
+                        st.error(f"Failed to save notes: {_CONFLICT_MESSAGE}")
     
     else:
         # Show the approval queue list
-        pending = _load_pending_registrations()
+        pending = _page_data('queue')
+        
+        if st.session_state.get('approval_bulk_message'):
+            st.success(st.session_state.pop('approval_bulk_message'))
+        if st.session_state.get('approval_claim_message'):
+            st.info(st.session_state.pop('approval_claim_message'))
         
         if not pending:
             st.success("✅ No registrations pending approval.")
         else:
             st.write(f"**{len(pending)}** registration(s) awaiting review:")
             
+            # Claim next: each reviewer is leased a different registration
+            if st.button("🎯 Claim next registration", type="primary", disabled=not user_id,
+                         help="Open the oldest pending registration nobody else is reviewing, reserved for you for a while."):
+                claimed = claim_next_registration(user_id)
+                if claimed:
+                    _open_review(claimed['student_id'], claimed['version'])
+                else:
+                    st.session_state.approval_claim_message = "No unclaimed registrations are waiting for review."
+                st.rerun()
+            
+            # Bulk actions: one UPDATE for every selected registration
+            with st.expander("⚡ Bulk actions"):
+                with st.form("bulk_review_form"):
+                    queue_labels = {
+                        row['student_id']: f"{row['first_name']} {row['last_name']} ({row['admission_number']})"
+                        for row in pending
+                    }
+                    selected_ids = st.multiselect(
+                        "Registrations",
+                        options=list(queue_labels),
+                        format_func=queue_labels.get,
+                        placeholder="Choose registrations to decide together",
+                    )
+                    col_bulk_notes1, col_bulk_notes2 = st.columns(2)
+                    with col_bulk_notes1:
+                        bulk_internal_notes = st.text_area(
+                            "Internal Notes (Staff Only)",
+                            height=100,
+                            help="Applied to every selected registration. Leave blank to keep each one's own notes.",
+                        )
+                    with col_bulk_notes2:
+                        bulk_parent_notes = st.text_area(
+                            "Parent/Guardian Notes",
+                            height=100,
+                            help="Applied to every selected registration. Leave blank to keep each one's own notes.",
+                        )
+                    col_bulk1, col_bulk2, col_bulk3 = st.columns(3)
+                    with col_bulk1:
+                        bulk_approve = st.form_submit_button("✅ Approve selected", type="primary", use_container_width=True)
+                    with col_bulk2:
+                        bulk_deny = st.form_submit_button("❌ Deny selected", use_container_width=True)
+                    with col_bulk3:
+                        bulk_hold = st.form_submit_button("⏸️ Withhold selected", use_container_width=True)
+                
+                bulk_decision = (
+                    'approved' if bulk_approve else 'denied' if bulk_deny else 'on_hold' if bulk_hold else None
+                )
+                if bulk_decision:
+                    if not selected_ids:
+                        st.warning("Select at least one registration.")
+                    else:
+                        updated = review_registrations(
+                            selected_ids,
+                            bulk_decision,
+                            user_id,
+                            internal_notes=bulk_internal_notes.strip() or None,
+                            parent_notes=bulk_parent_notes.strip() or None,
+                        )
+                        verb = {'approved': 'approved', 'denied': 'denied', 'on_hold': 'put on hold'}[bulk_decision]
+                        message = f"{len(updated)} registration(s) {verb}."
+                        if len(updated) < len(selected_ids):
+                            message += f" {len(selected_ids) - len(updated)} had already been decided by another reviewer."
+                        st.session_state.approval_bulk_message = message
+                        st.rerun()
+            
             for student in pending:
                 with st.container():
                     col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
@@ -400,6 +507,8 @@ if can_approve_registrations(user_role):
                             st.markdown("🔵 Pending Review")
                         elif status == 'on_hold':
                             st.markdown("🟡 On Hold")
+                        if _claim_active(student['claimed_by'], student['claimed_until']):
+                            st.caption("🔒 In review")
                     
                     with col3:
                         st.caption(f"Submitted: {student['created_at'].strftime('%Y-%m-%d') if student['created_at'] else 'N/A'}")
@@ -407,7 +516,7 @@ if can_approve_registrations(user_role):
                     
                     with col4:
                         if st.button("Review", key=f"review_{student['student_id']}"):
-                            st.session_state.approval_view_student = student['student_id']
+                            _open_review(student['student_id'])
                             st.rerun()
                     
                     st.markdown("---")
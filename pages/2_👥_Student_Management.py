@@ -2,14 +2,34 @@
 Student Management page – includes multi-step registration wizard.
 """
 
+import hashlib
+import io
 from datetime import date
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 import streamlit as st
 from sqlalchemy import asc
 
+from src.auth.permissions import can_approve_registrations
+from src.config.settings import get_settings
+from src.database.async_runner import gather_loaders
 from src.database.connection import get_db_session
-from src.database.models import Student, User
+from src.database.models import Student
+from src.services.import_service import (
+    IMPORT_STATUSES,
+    import_students,
+    import_template_csv,
+    read_student_file,
+)
+from src.services.registration_draft import RegistrationDraft
+from src.services.search_service import SEARCH_LIMIT, search_students
+from src.services.student_service import (
+    list_roster,
+    roster_filter_options,
+    student_details,
+)
+from src.services.user_service import list_teachers
+from src.utils.lazy_tabs import fetch_once, lazy_tabs
 
 
 st.set_page_config(page_title="Student Management", page_icon="👥", layout="wide")
@@ -28,7 +48,13 @@ if user_role not in ["admin", "special_educator", "junior_staff"]:
 
 st.title("👥 Student Management")
 
-tab1, tab2, tab3 = st.tabs(["Student List", "Register New Student", "Student Profiles"])
+# Bulk import is for staff who can also approve what it creates
+can_bulk_import = can_approve_registrations(user_role)
+tab_labels = ["Student List", "Register New Student", "Student Profiles"]
+if can_bulk_import:
+    tab_labels.append("Bulk Import")
+# Only the active tab's body runs (and queries) on a rerun
+active_tab = lazy_tabs(tab_labels, key="student_management_tab")
 
 
 def _registration_badge(status: str, step: int) -> str:
@@ -46,117 +72,195 @@ def _registration_badge(status: str, step: int) -> str:
 
 
 def _load_registrations(for_user_id: Optional[int] = None):
-    with get_db_session() as session:
-        q = session.query(Student).order_by(asc(Student.first_name), asc(Student.last_name))
-        if for_user_id is not None:
-            q = q.filter(Student.created_by == for_user_id)
-        return q.all()
-
-
-def _load_teachers(session):
-    """Return simple list of teacher users for dropdowns (name, id)."""
-    teachers = (
-        session.query(User)
-        .filter(User.role.in_(["teacher", "therapist", "special_educator"]))
-        .order_by(User.name)
-        .all()
-    )
-    return teachers
+    def load():
+        with get_db_session(readonly=True) as session:
+            # parent_notes is shown as reviewer feedback in "Your Registrations"
+            q = (
+                session.query(Student)
+                .options(*student_details("notes"))
+                .order_by(asc(Student.first_name), asc(Student.last_name))
+            )
+            if for_user_id is not None:
+                q = q.filter(Student.created_by == for_user_id)
+            return q.all()
 
+    # Sections of one rerun listing the same registrations share one query
+    return fetch_once(("registrations", for_user_id), load)
 
-def _ensure_current_registration() -> Optional[Student]:
-    """Return the Student being edited in the wizard (or None)."""
+
+def _registration_draft() -> Optional[RegistrationDraft]:
+    """Draft buffer for the registration being edited (or None)."""
     reg_id = st.session_state.get("current_registration_id")
-    if not reg_id:
+    draft = st.session_state.get("registration_draft")
+    if draft is not None and draft.student_id != reg_id:
+        # Switched registration (or started a new one): save the old draft first
+        draft.flush()
+        if draft.save_failed:
+            st.warning(
+                f"Unsaved changes to registration #{draft.student_id} were discarded: "
+                "the registration no longer exists."
+            )
+        draft = None
+    if draft is None and reg_id:
+        draft = RegistrationDraft(reg_id, get_settings().registration_autosave_seconds)
+    st.session_state["registration_draft"] = draft
+    return draft
+
+
+def _ensure_current_registration() -> Optional[Student]:
+    """Return the Student being edited in the wizard (or None), including unsaved steps."""
+    draft = _registration_draft()
+    if draft is None:
         return None
-    with get_db_session() as session:
-        student = session.query(Student).filter(Student.student_id == reg_id).first()
-        return student
+    draft.flush_if_due()
+    return draft.student()
+
+
+def _save_step(step: int, merge: Optional[Dict[str, Any]] = None, values: Optional[Dict[str, Any]] = None):
+    """Stage a completed wizard step; it is written with the next draft save."""
+    draft = _registration_draft()
+    if draft is None:
+        return
+    draft.stage(step=step, merge=merge, values=values)
+    draft.flush_if_due()
+
+
+def _draft_status():
+    """Unsaved-changes indicator; also saves the draft once it is due."""
+    draft = st.session_state.get("registration_draft")
+    if draft is None:
+        return
+    draft.flush_if_due()
+    due_in = draft.seconds_until_due()
+    if draft.save_failed:
+        st.error("⚠️ Changes could not be saved: this registration no longer exists.")
+    elif due_in is not None:
+        col_status, col_save = st.columns([3, 1])
+        with col_status:
+            st.caption(f"📝 Unsaved changes · autosaves in {int(due_in) + 1}s")
+        with col_save:
+            if st.button("💾 Save now", key="draft_save_now"):
+                draft.flush()
+                st.rerun()
+    elif draft.last_saved_at:
+        st.caption("✓ All changes saved")
+
+
+if hasattr(st, "fragment"):
+    # Re-run just the indicator on a timer so idle drafts are still saved
+    _draft_status = st.fragment(
+        run_every=min(max(get_settings().registration_autosave_seconds, 5), 15)
+    )(_draft_status)
+
+
+# The wizard only runs while its tab is open; keep autosaving from the others
+if active_tab != "Register New Student" and st.session_state.get("registration_draft") is not None:
+    st.session_state["registration_draft"].flush_if_due()
 
 
 def _create_or_update_student_basic(
     student: Optional[Student], data: Dict[str, Any], step_number: int
 ) -> Student:
-    """Create or update basic student info (step 1)."""
+    """Create (immediately) or update (via the draft buffer) basic student info (step 1)."""
+    if student:
+        _save_step(
+            step_number,
+            values={
+                "first_name": data["first_name"],
+                "last_name": data["last_name"],
+                "preferred_name": data["preferred_name"] or None,
+                "date_of_birth": data["dob"],
+                "gender": data["gender"],
+                "enrollment_date": data["enrollment_date"],
+            },
+        )
+        return student
+
     with get_db_session() as session:
-        if student:
-            db_student = (
-                session.query(Student)
-                .filter(Student.student_id == student.student_id)
-                .first()
-            )
-        else:
-            # Create new student – set ALL required NOT NULL fields before flush
-            db_student = Student()
-            if current_user_id:
-                db_student.created_by = current_user_id
-            db_student.status = "pending"
-            setattr(db_student, "registration_status", "draft")
-            setattr(db_student, "registration_step", 0)
-            session.add(db_student)
-
-        # Set required fields (must happen before flush for new records)
+        # Create new student – set ALL required NOT NULL fields before flush
+        db_student = Student()
+        if current_user_id:
+            db_student.created_by = current_user_id
+        db_student.status = "pending"
+        setattr(db_student, "registration_status", "draft")
         db_student.first_name = data["first_name"]
         db_student.last_name = data["last_name"]
         db_student.preferred_name = data["preferred_name"] or None
         db_student.date_of_birth = data["dob"]
         db_student.gender = data["gender"]
         db_student.enrollment_date = data["enrollment_date"]
+        db_student.registration_step = step_number
+        session.add(db_student)
 
-        # Flush to get student_id for new records
+        # One INSERT ... RETURNING brings back student_id and the
+        # database-assigned admission number
         session.flush()
 
-        # Admission number auto-generation (needs student_id from flush)
-        if not db_student.admission_number and db_student.student_id:
-            year = date.today().year
-            db_student.admission_number = f"S-{year}-{db_student.student_id:04d}"
-
-        # Track highest completed step
-        db_student.registration_step = max(db_student.registration_step or 0, step_number)
-
         st.session_state["current_registration_id"] = db_student.student_id
         return db_student
 
 
-def _update_json_field(student: Student, field_name: str, payload: Dict[str, Any], step: int):
-    """Update one of the JSON fields and registration step."""
-    with get_db_session() as session:
-        db_student = (
-            session.query(Student)
-            .filter(Student.student_id == student.student_id)
-            .first()
-        )
-        if not db_student:
-            return
-        setattr(db_student, field_name, payload)
-        db_student.registration_step = max(db_student.registration_step or 0, step)
-
-
-with tab1:
+if active_tab == "Student List":
     st.subheader("Student List & Registration Status")
 
-    registrations = _load_registrations()
-    if not registrations:
+    filter_options = roster_filter_options()
+    f1, f2, f3 = st.columns(3)
+    with f1:
+        grade_filter = st.selectbox("Grade", ["All"] + filter_options["grades"], key="roster_grade")
+    with f2:
+        section_filter = st.selectbox("Section", ["All"] + filter_options["sections"], key="roster_section")
+    with f3:
+        status_filter = st.selectbox(
+            "Reg. Status",
+            ["All", "draft", "pending_review", "on_hold", "denied", "approved"],
+            key="roster_status",
+        )
+    roster_filters = {
+        "grade": None if grade_filter == "All" else grade_filter,
+        "section": None if section_filter == "All" else section_filter,
+        "registration_status": None if status_filter == "All" else status_filter,
+    }
+
+    # Cursor stack: one keyset cursor per page visited; reset when filters change
+    if st.session_state.get("roster_filters") != roster_filters:
+        st.session_state["roster_filters"] = roster_filters
+        st.session_state["roster_cursors"] = [None]
+    cursors = st.session_state["roster_cursors"]
+
+    page = list_roster(after=cursors[-1], **roster_filters)
+    if not page.rows:
         st.info("No students or registrations found yet.")
     else:
         rows = []
-        for s in registrations:
+        for s in page.rows:
             rows.append(
                 {
-                    "Admission #": s.admission_number or "—",
-                    "Name": f"{s.first_name} {s.last_name}",
-                    "Grade": s.grade or "—",
-                    "Section": s.section or "—",
-                    "Reg. Status": s.registration_status or "draft",
+                    "Admission #": s["admission_number"] or "—",
+                    "Name": f"{s['first_name']} {s['last_name']}",
+                    "Grade": s["grade"] or "—",
+                    "Section": s["section"] or "—",
+                    "Reg. Status": s["registration_status"] or "draft",
                     "Workflow": _registration_badge(
-                        s.registration_status or "draft", s.registration_step or 0
+                        s["registration_status"] or "draft", s["registration_step"] or 0
                     ),
                 }
             )
         st.dataframe(rows, hide_index=True, use_container_width=True)
 
+    nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if st.button("← Previous", disabled=len(cursors) == 1, key="roster_prev"):
+            cursors.pop()
+            st.rerun()
+    with nav_page:
+        st.caption(f"Page {len(cursors)}")
+    with nav_next:
+        if st.button("Next →", disabled=page.next_cursor is None, key="roster_next"):
+            cursors.append(page.next_cursor)
+            st.rerun()
 
-with tab2:
+
+if active_tab == "Register New Student":
     st.subheader("Register New Student")
 
     col_left, col_right = st.columns([2, 3])
@@ -201,6 +305,10 @@ with tab2:
                 f"**Admission #:** `{current_student.admission_number or 'pending'}`  ·  "
                 f"**Status:** {_registration_badge(current_student.registration_status, current_student.registration_step)}"
             )
+            _draft_status()
+        elif st.session_state.get("registration_draft") is not None:
+            # The registration was deleted under an unsaved draft; say so
+            _draft_status()
 
         step_labels = [
             "1. Basic Info",
@@ -411,7 +519,7 @@ with tab2:
                             },
                             "emergency_contacts": emergency_list,
                         }
-                        _update_json_field(current_student, "contact_info", payload, step=2)
+                        _save_step(2, merge={"contact_info": payload})
                         st.success("Step 2 saved.")
                         st.session_state["_pending_step"] = 3
                         st.rerun()
@@ -427,10 +535,7 @@ with tab2:
                 current_enrollment = acad.get("current_enrollment", {})
                 schedule = acad.get("schedule_preferences", {})
 
-                with get_db_session() as session:
-                    teachers = _load_teachers(session)
-
-                teacher_names = [t.name for t in teachers]
+                teacher_names = [t["name"] for t in list_teachers()]
 
                 with st.form("step3_academic_form"):
                     st.markdown("**Current Enrollment**")
@@ -506,17 +611,12 @@ with tab2:
                                 "has_sibling": has_sibling,
                             },
                         }
-                        _update_json_field(current_student, "academic_info", payload, step=3)
-                        # Also keep core grade/section fields in sync
-                        with get_db_session() as session:
-                            db_student = (
-                                session.query(Student)
-                                .filter(Student.student_id == current_student.student_id)
-                                .first()
-                            )
-                            if db_student:
-                                db_student.grade = grade_val
-                                db_student.section = section_val
+                        # Core grade/section columns are kept in sync in the same UPDATE
+                        _save_step(
+                            3,
+                            merge={"academic_info": payload},
+                            values={"grade": grade_val, "section": section_val},
+                        )
                         st.success("Step 3 saved.")
                         st.session_state["_pending_step"] = 4
                         st.rerun()
@@ -651,7 +751,8 @@ with tab2:
                                 "reason": med_reason,
                             }
                         )
-                    _update_json_field(current_student, "medical_info", payload, step=4)
+                    # Replaced, not merged: unticked sections must be removed
+                    _save_step(4, values={"medical_info": payload})
                     st.success("Step 4 saved.")
                     st.session_state["_pending_step"] = 5
                     st.rerun()
@@ -759,7 +860,7 @@ with tab2:
                             "impact_level": impact,
                             "affected_areas": areas,
                         }
-                        _update_json_field(current_student, "learning_profile", payload, step=5)
+                        _save_step(5, merge={"learning_profile": payload})
                         st.success("Step 5 saved.")
                         st.session_state["_pending_step"] = 6
                         st.rerun()
@@ -842,46 +943,50 @@ with tab2:
                             "Please confirm that the information and documents are accurate."
                         )
                     else:
-                        with get_db_session() as session:
-                            db_student = (
-                                session.query(Student)
-                                .filter(Student.student_id == current_student.student_id)
-                                .first()
-                            )
-                            if db_student:
-                                db_student.registration_status = "pending_review"
-                                db_student.registration_step = max(
-                                    db_student.registration_step or 0, 6
-                                )
-                                db_student.status = "pending"
-                                # Clear previous review notes on resubmission
-                                if is_resubmit:
-                                    db_student.internal_notes = None
-                                    db_student.parent_notes = None
-                                    db_student.reviewed_by = None
-                                    db_student.reviewed_at = None
+                        submission = {"registration_status": "pending_review", "status": "pending"}
+                        # Clear previous review notes on resubmission
                         if is_resubmit:
-                            st.success(
-                                "Registration resubmitted and marked as **Pending Review**. "
-                                "The reviewer will be notified of your updates."
+                            submission.update(
+                                internal_notes=None,
+                                parent_notes=None,
+                                reviewed_by=None,
+                                reviewed_at=None,
                             )
+                        # Submission writes every buffered step in the same UPDATE
+                        _save_step(6, values=submission)
+                        draft = _registration_draft()
+                        if draft is not None:
+                            draft.flush()
+                        if draft is None or draft.save_failed:
+                            st.error("❌ Could not submit: this registration no longer exists.")
                         else:
-                            st.success(
-                                "Registration submitted and marked as **Pending Review**. "
-                                "An administrator or HoD can now approve or deny this registration."
-                            )
-                        st.session_state["current_registration_id"] = None
-                        st.session_state["_pending_step"] = 1
-                        st.rerun()
+                            if is_resubmit:
+                                st.success(
+                                    "Registration resubmitted and marked as **Pending Review**. "
+                                    "The reviewer will be notified of your updates."
+                                )
+                            else:
+                                st.success(
+                                    "Registration submitted and marked as **Pending Review**. "
+                                    "An administrator or HoD can now approve or deny this registration."
+                                )
+                            st.session_state["current_registration_id"] = None
+                            st.session_state["_pending_step"] = 1
+                            st.rerun()
 
 
-with tab3:
+if active_tab == "Student Profiles":
     st.subheader("Student Profiles")
     
     # Helper to load full student profile
     def _get_full_student_profile(student_id: int):
-        with get_db_session() as session:
-            s = session.query(Student).filter(Student.student_id == student_id).first()
+        with get_db_session(readonly=True) as session:
+            s = (
+                session.query(Student)
+                .options(*student_details("contact", "academic", "medical", "profile"))
+                .filter(Student.student_id == student_id)
+                .first()
+            )
             if not s:
                 return None
             return {
@@ -902,12 +1007,22 @@ with tab3:
                 'created_at': s.created_at,
             }
     
-    # Load approved students for cards
-    def _load_approved_students():
-        with get_db_session() as session:
-            students = session.query(Student).filter(
+    # Load approved students for cards: the given ids in order, else the first page by name
+    def _load_approved_students(student_ids: Optional[List[int]] = None):
+        if student_ids is not None and not student_ids:
+            return []
+        with get_db_session(readonly=True) as session:
+            # Cards only read guardian and enrollment details
+            q = session.query(Student).options(
+                *student_details("contact", "academic")
+            ).filter(
                 Student.registration_status == 'approved'
-            ).order_by(Student.first_name, Student.last_name).all()
+            )
+            if student_ids is not None:
+                q = q.filter(Student.student_id.in_(student_ids))
+            else:
+                q = q.order_by(Student.first_name, Student.last_name).limit(SEARCH_LIMIT)
+            students = q.all()
             
             result = []
             for s in students:
@@ -930,12 +1045,15 @@ with tab3:
                     'class_teacher': enrollment.get('class_teacher', '—'),
                     'gender': s.gender or '—',
                 })
+            if student_ids is not None:
+                # Keep search ranking order
+                position = {sid: i for i, sid in enumerate(student_ids)}
+                result.sort(key=lambda r: position[r['student_id']])
             return result
     
     # Helper to render inline profile panel
-    def _render_inline_profile(student_id):
+    def _render_inline_profile(student):
         """Render an expandable profile panel for the selected student."""
-        student = _get_full_student_profile(student_id)
         if not student:
             st.error("Student not found.")
             return
@@ -1088,31 +1206,43 @@ with tab3:
         st.info("📚 **IEP Management** and **Session History** coming soon.")
         st.markdown("---")
     
+    # Load the open profile and the cards concurrently; the search box below
+    # keeps its value in session state, so the term is known up front
+    expanded_profile_id = st.session_state.get('expanded_profile_id')
+    search_term = st.session_state.get('profile_search', '')
+    profile_loaders = {
+        # Ranked, limited server-side search; without a term show the first page by name
+        'cards': (
+            (lambda: _load_approved_students(search_students(search_term, statuses=("approved",))))
+            if search_term.strip() else _load_approved_students
+        ),
+    }
+    if expanded_profile_id:
+        profile_loaders['profile'] = lambda: _get_full_student_profile(expanded_profile_id)
+    profile_data = gather_loaders(**profile_loaders)
+    
     # Show expanded profile panel if one is selected
-    if st.session_state.get('expanded_profile_id'):
-        _render_inline_profile(st.session_state['expanded_profile_id'])
+    if expanded_profile_id:
+        _render_inline_profile(profile_data['profile'])
     
     # Always show the student cards grid below
-    approved_students = _load_approved_students()
+    search_term = st.text_input(
+        "🔍 Search students",
+        placeholder="Search by name, admission #, guardian or grade...",
+        key="profile_search",
+    )
+    approved_students = profile_data['cards']
     
     if not approved_students:
-        st.info("No approved students yet. Students will appear here after their registration is approved.")
+        if search_term.strip():
+            st.info("No approved students match your search.")
+        else:
+            st.info("No approved students yet. Students will appear here after their registration is approved.")
     else:
-        # Search/filter
-        search_term = st.text_input("🔍 Search students", placeholder="Search by name, admission # or grade...", key="profile_search")
-        
-        # Filter students based on search
-        if search_term:
-            search_lower = search_term.lower()
-            approved_students = [
-                s for s in approved_students
-                if search_lower in s['first_name'].lower()
-                or search_lower in s['last_name'].lower()
-                or search_lower in s['admission_number'].lower()
-                or search_lower in s['grade'].lower()
-            ]
-        
-        st.caption(f"📌 {len(approved_students)} student(s) · Click avatar to expand profile")
+        if len(approved_students) >= SEARCH_LIMIT:
+            st.caption(f"📌 Showing the first {SEARCH_LIMIT} students · Search to narrow down · Click avatar to expand profile")
+        else:
+            st.caption(f"📌 {len(approved_students)} student(s) · Click avatar to expand profile")
         
         # CSS for student cards with clickable avatar button
         st.markdown("""
@@ -1233,3 +1363,83 @@ with tab3:
                     """
                     st.markdown(card_html, unsafe_allow_html=True)
                     st.markdown("---")
+
+
+def _import_preview(uploaded):
+    """(DataFrame, dry-run ImportResult) for the attached file, validated once per file contents."""
+    data = uploaded.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    preview = st.session_state.get("bulk_import_preview")
+    if preview is None or preview[0] != digest:
+        import_df = read_student_file(io.BytesIO(data), uploaded.name)
+        preview = (digest, import_df, import_students(import_df, dry_run=True))
+        st.session_state["bulk_import_preview"] = preview
+    return preview[1], preview[2]
+
+
+if active_tab == "Bulk Import":
+    st.subheader("Bulk Import")
+    st.caption(
+        "Register a whole intake from a CSV or Excel file. Required columns: "
+        "first_name, last_name, date_of_birth. Optional: preferred_name, gender, "
+        "nationality, grade, section, enrollment_date (defaults to today), "
+        "guardian_name, guardian_relationship, guardian_phone, guardian_email."
+    )
+    st.download_button(
+        "📄 Download template",
+        data=import_template_csv(),
+        file_name="student_import_template.csv",
+        mime="text/csv",
+    )
+
+    uploaded = st.file_uploader("Import file", type=["csv", "xlsx"], key="bulk_import_file")
+    import_status = st.radio(
+        "Imported registrations are",
+        options=list(IMPORT_STATUSES),
+        format_func=lambda s: {
+            "pending_review": "Submitted for review (approval queue)",
+            "draft": "Drafts (to complete in the wizard)",
+        }[s],
+        horizontal=True,
+        key="bulk_import_status",
+    )
+
+    if uploaded is not None:
+        try:
+            import_df, check = _import_preview(uploaded)
+        except ValueError as e:
+            st.error(str(e))
+            import_df = None
+
+        if import_df is not None:
+            col_total, col_valid, col_rejected = st.columns(3)
+            col_total.metric("Rows", check.total_rows)
+            col_valid.metric("Valid", check.valid_rows)
+            col_rejected.metric("With errors", check.rejected_rows)
+
+            if not check.errors.empty:
+                st.warning("Rows with errors are skipped. Fix them and import them in a later file.")
+                st.dataframe(check.errors, hide_index=True, use_container_width=True)
+                st.download_button(
+                    "⬇️ Download error report",
+                    data=check.error_report_csv(),
+                    file_name="student_import_errors.csv",
+                    mime="text/csv",
+                )
+
+            if check.valid_rows and st.button(
+                f"Import {check.valid_rows} student(s)", type="primary", key="bulk_import_run"
+            ):
+                with st.spinner("Importing..."):
+                    result = import_students(
+                        import_df,
+                        created_by=current_user_id,
+                        registration_status=import_status,
+                    )
+                # The file's rows are on record now; validate it afresh next time
+                st.session_state.pop("bulk_import_preview", None)
+                st.success(
+                    f"Imported {len(result.imported)} student(s); "
+                    f"{result.rejected_rows} row(s) skipped."
+                )
+                st.dataframe(result.imported, hide_index=True, use_container_width=True)
@@ -3,14 +3,27 @@ Admin Panel page – includes User Management (create, modify, roles).
 """
 
 import streamlit as st
-from sqlalchemy import desc
 import secrets
 import string
 
 from src.auth.permissions import ROLES, get_role_display_name
 from src.auth.authenticator import get_password_hash
-from src.database.connection import get_db_session
+from src.config.settings import get_settings
+from src.database.connection import get_db_session, get_pool_status
+from src.database.instrumentation import (
+    checkout_stats,
+    clear_query_records,
+    fingerprint_stats,
+    get_query_records,
+    page_stats,
+    slow_queries,
+)
 from src.database.models import User
+from src.services.cache import get_result_cache
+from src.services.invalidation_bus import get_invalidation_bus
+from src.services.user_service import search_users
+from src.utils.diagnostics import run_diagnostics
+from src.utils.lazy_tabs import fetch_once, lazy_tabs
 
 
 st.set_page_config(page_title="Admin Panel", page_icon="⚙️", layout="wide")
@@ -32,33 +45,72 @@ st.caption(
     "System administration tools for user accounts, roles and future configuration."
 )
 
-tab1, tab2, tab3, tab4 = st.tabs(
-    ["User Management", "System Configuration", "Audit Logs", "Backup & Restore"]
+# Only the active tab's body runs (and queries) on a rerun
+active_tab = lazy_tabs(
+    [
+        "User Management",
+        "System Configuration",
+        "Audit Logs",
+        "Backup & Restore",
+        "Performance",
+    ],
+    key="admin_panel_tab",
 )
 
 
-def _load_users():
-    """Fetch all users ordered by creation date."""
+def _load_user_page(key: str, query: str = "", role: str = "(All)"):
+    """
+    Fetch the current page of users for one listing.
+
+    A stack of keyset cursors is kept in session state under ``key``; it
+    resets whenever the search text or role filter changes.
+    """
+    role = None if role == "(All)" else role
+    filters = ((query or "").strip().lower(), role)
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
     try:
-        with get_db_session() as session:
-            users = session.query(User).order_by(desc(User.created_at)).all()
-        return users, None
+        # Listings showing the same page share one query per rerun
+        page = fetch_once(
+            ("search_users", filters, cursors[-1]),
+            lambda: search_users(query=query, role=role, after=cursors[-1]),
+        )
+        return page, None
     except Exception as e:
-        return [], str(e)
-
-
-with tab1:
+        return None, str(e)
+
+
+def _user_page_nav(key: str, page):
+    """Previous / Next controls for a listing loaded with `_load_user_page`."""
+    cursors = st.session_state[f"{key}_cursors"]
+    nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if st.button("← Previous", disabled=len(cursors) == 1, key=f"{key}_prev"):
+            cursors.pop()
+            st.rerun()
+    with nav_page:
+        st.caption(f"Page {len(cursors)}")
+    with nav_next:
+        if st.button("Next →", disabled=page.next_cursor is None, key=f"{key}_next"):
+            cursors.append(page.next_cursor)
+            st.rerun()
+
+
+if active_tab == "User Management":
     st.subheader("User Management")
     st.markdown(
         "Manage **user accounts**, update details, and control **roles & activation**."
     )
 
-    user_tab_create, user_tab_edit, user_tab_roles = st.tabs(
-        ["Create User", "Modify User", "Roles Management"]
+    user_tab = lazy_tabs(
+        ["Create User", "Modify User", "Roles Management"],
+        key="admin_user_tab",
     )
 
     # --------- Create User ---------
-    with user_tab_create:
+    if user_tab == "Create User":
         st.markdown("#### Create New User Account")
 
         with st.form("create_user_form", clear_on_submit=True):
@@ -132,134 +184,138 @@ with tab1:
                     st.error(f"Error creating user: `{e}`")
 
     # --------- Modify User ---------
-    with user_tab_edit:
+    if user_tab == "Modify User":
         st.markdown("#### Modify Existing User")
 
-        search_query = st.text_input(
-            "Search by name or email",
-            help="Type part of a name or email address to filter users.",
-        )
+        col_search, col_role = st.columns([3, 1])
+        with col_search:
+            search_query = st.text_input(
+                "Search by name or email",
+                help="Type the start of a name or email address to filter users.",
+            )
+        with col_role:
+            edit_role_filter = st.selectbox(
+                "Role",
+                options=["(All)"] + list(ROLES.keys()),
+                format_func=lambda r: "(All roles)"
+                if r == "(All)"
+                else get_role_display_name(r),
+                key="edit_user_role_filter",
+            )
 
-        users, load_err = _load_users()
+        page, load_err = _load_user_page("edit_users", search_query, edit_role_filter)
         if load_err:
             st.error(f"Could not load users: `{load_err}`")
-        elif not users:
-            st.info("No users found yet. Create a user in the **Create User** tab.")
-        else:
-            if search_query:
-                q = search_query.lower()
-                users = [
-                    u
-                    for u in users
-                    if q in (u.name or "").lower() or q in (u.email or "").lower()
-                ]
-
-            if not users:
+        elif not page.rows:
+            if search_query.strip() or edit_role_filter != "(All)":
                 st.info("No users match your search.")
             else:
-                # Map for selection
-                user_options = {
-                    f"{u.name} ({u.email}) [{get_role_display_name(u.role)}]": u
-                    for u in users
-                }
-
-                selected_label = st.selectbox(
-                    "Select user to edit",
-                    options=list(user_options.keys()),
+                st.info("No users found yet. Create a user in the **Create User** tab.")
+        else:
+            users = page.rows
+            # Map for selection
+            user_options = {
+                f"{u['name']} ({u['email']}) [{get_role_display_name(u['role'])}]": u
+                for u in users
+            }
+
+            selected_label = st.selectbox(
+                "Select user to edit",
+                options=list(user_options.keys()),
+            )
+            selected_user = user_options[selected_label]
+
+            # Quick random password reset
+            col_reset_btn, col_reset_help = st.columns([1, 3])
+            with col_reset_btn:
+                gen_reset = st.button(
+                    "Generate random password",
+                    key=f"gen_pw_{selected_user['user_id']}",
+                    help="Sets a new strong password and shows it once.",
+                )
+            with col_reset_help:
+                st.caption(
+                    "Use this when a user is locked out or forgot their password. "
+                    "Share the new password with them securely."
                 )
-                selected_user = user_options[selected_label]
-
-                # Quick random password reset
-                col_reset_btn, col_reset_help = st.columns([1, 3])
-                with col_reset_btn:
-                    gen_reset = st.button(
-                        "Generate random password",
-                        key=f"gen_pw_{selected_user.user_id}",
-                        help="Sets a new strong password and shows it once.",
-                    )
-                with col_reset_help:
-                    st.caption(
-                        "Use this when a user is locked out or forgot their password. "
-                        "Share the new password with them securely."
-                    )
 
-                if gen_reset:
-                    alphabet = string.ascii_letters + string.digits
-                    new_pw = "".join(secrets.choice(alphabet) for _ in range(12))
-                    try:
-                        with get_db_session() as session:
-                            db_user = (
-                                session.query(User)
-                                .filter(User.user_id == selected_user.user_id)
-                                .first()
+            if gen_reset:
+                alphabet = string.ascii_letters + string.digits
+                new_pw = "".join(secrets.choice(alphabet) for _ in range(12))
+                try:
+                    with get_db_session() as session:
+                        db_user = (
+                            session.query(User)
+                            .filter(User.user_id == selected_user["user_id"])
+                            .first()
+                        )
+                        if not db_user:
+                            st.error("User no longer exists in the database.")
+                        else:
+                            db_user.password_hash = get_password_hash(new_pw)
+                            st.success(
+                                f"Generated a new password for **{db_user.name}**."
                             )
-                            if not db_user:
-                                st.error("User no longer exists in the database.")
-                            else:
-                                db_user.password_hash = get_password_hash(new_pw)
-                                st.success(
-                                    f"Generated a new password for **{db_user.name}**."
-                                )
-                                st.info(
-                                    "Share this password with the user and ask them to change it after login:"
-                                )
-                                st.code(new_pw, language=None)
-                    except Exception as e:
-                        st.error(f"Error generating new password: `{e}`")
-
-                with st.form("edit_user_form"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        edit_name = st.text_input("Full Name", value=selected_user.name)
-                        edit_email = (
-                            st.text_input(
-                                "Email Address",
-                                value=selected_user.email,
-                                help="Must remain unique.",
+                            st.info(
+                                "Share this password with the user and ask them to change it after login:"
                             )
-                            .strip()
-                            .lower()
-                        )
-                    with col2:
-                        edit_role = st.selectbox(
-                            "Role",
-                            options=list(ROLES.keys()),
-                            index=list(ROLES.keys()).index(selected_user.role)
-                            if selected_user.role in ROLES
-                            else 0,
-                            format_func=lambda r: get_role_display_name(r),
-                        )
-                        edit_active = st.checkbox(
-                            "Active",
-                            value=bool(selected_user.is_active),
-                            help="Uncheck to disable login for this user.",
+                            st.code(new_pw, language=None)
+                except Exception as e:
+                    st.error(f"Error generating new password: `{e}`")
+
+            with st.form("edit_user_form"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    edit_name = st.text_input("Full Name", value=selected_user["name"])
+                    edit_email = (
+                        st.text_input(
+                            "Email Address",
+                            value=selected_user["email"],
+                            help="Must remain unique.",
                         )
+                        .strip()
+                        .lower()
+                    )
+                with col2:
+                    edit_role = st.selectbox(
+                        "Role",
+                        options=list(ROLES.keys()),
+                        index=list(ROLES.keys()).index(selected_user["role"])
+                        if selected_user["role"] in ROLES
+                        else 0,
+                        format_func=lambda r: get_role_display_name(r),
+                    )
+                    edit_active = st.checkbox(
+                        "Active",
+                        value=bool(selected_user["is_active"]),
+                        help="Uncheck to disable login for this user.",
+                    )
 
-                    st.markdown("**Reset Password (optional)**")
-                    colnp1, colnp2 = st.columns(2)
-                    with colnp1:
-                        new_password = st.text_input(
-                            "New Password",
-                            type="password",
-                            help="Leave blank to keep current password.",
-                        )
-                    with colnp2:
-                        new_password_confirm = st.text_input(
-                            "Confirm New Password",
-                            type="password",
-                        )
+                st.markdown("**Reset Password (optional)**")
+                colnp1, colnp2 = st.columns(2)
+                with colnp1:
+                    new_password = st.text_input(
+                        "New Password",
+                        type="password",
+                        help="Leave blank to keep current password.",
+                    )
+                with colnp2:
+                    new_password_confirm = st.text_input(
+                        "Confirm New Password",
+                        type="password",
+                    )
 
-                    submitted_edit = st.form_submit_button("Save Changes", type="primary")
+                submitted_edit = st.form_submit_button("Save Changes", type="primary")
 
             if submitted_edit:
                 # Self-protection: avoid locking out current admin
-                if selected_user.user_id == current_user_id and not edit_active:
+                if selected_user["user_id"] == current_user_id and not edit_active:
                     st.error(
                         "You cannot **deactivate your own account** while logged in."
                     )
                 elif (
-                    selected_user.user_id == current_user_id
-                    and selected_user.role == "admin"
+                    selected_user["user_id"] == current_user_id
+                    and selected_user["role"] == "admin"
                     and edit_role != "admin"
                 ):
                     st.error(
@@ -275,7 +331,7 @@ with tab1:
                         with get_db_session() as session:
                             db_user = (
                                 session.query(User)
-                                .filter(User.user_id == selected_user.user_id)
+                                .filter(User.user_id == selected_user["user_id"])
                                 .first()
                             )
                             if not db_user:
@@ -311,23 +367,25 @@ with tab1:
                         st.error(f"Error updating user: `{e}`")
 
             # Summary table
-            with st.expander("View all users", expanded=False):
+            with st.expander("View users on this page", expanded=False):
                 data = [
                     {
-                        "ID": u.user_id,
-                        "Name": u.name,
-                        "Email": u.email,
-                        "Role": get_role_display_name(u.role),
-                        "Active": "Yes" if u.is_active else "No",
-                        "Created": u.created_at,
-                        "Last Login": u.last_login,
+                        "ID": u["user_id"],
+                        "Name": u["name"],
+                        "Email": u["email"],
+                        "Role": get_role_display_name(u["role"]),
+                        "Active": "Yes" if u["is_active"] else "No",
+                        "Created": u["created_at"],
+                        "Last Login": u["last_login"],
                     }
                     for u in users
                 ]
                 st.dataframe(data, hide_index=True, use_container_width=True)
 
+            _user_page_nav("edit_users", page)
+
     # --------- Roles Management (overview & quick actions) ---------
-    with user_tab_roles:
+    if user_tab == "Roles Management":
         st.markdown("#### Roles Management")
         st.write(
             "Review available roles and quickly filter users by role to adjust assignments."
@@ -345,51 +403,258 @@ with tab1:
 
         st.markdown("---")
 
-        users, load_err = _load_users()
+        role_filter = st.selectbox(
+            "Filter users by role",
+            options=["(All)"] + list(ROLES.keys()),
+            format_func=lambda r: "(All roles)"
+            if r == "(All)"
+            else get_role_display_name(r),
+        )
+
+        page, load_err = _load_user_page("role_users", role=role_filter)
         if load_err:
             st.error(f"Could not load users: `{load_err}`")
-        elif not users:
-            st.info("No users found yet.")
         else:
-            role_filter = st.selectbox(
-                "Filter users by role",
-                options=["(All)"] + list(ROLES.keys()),
-                format_func=lambda r: "(All roles)"
-                if r == "(All)"
-                else get_role_display_name(r),
-            )
-
-            filtered = (
-                [u for u in users if u.role == role_filter]
-                if role_filter != "(All)"
-                else users
-            )
-
             st.markdown("**Users Matching Filter**")
-            if not filtered:
+            if not page.rows:
                 st.info("No users match this role filter.")
             else:
-                for u in filtered:
+                for u in page.rows:
                     cols = st.columns([3, 3, 2])
                     with cols[0]:
-                        st.write(f"**{u.name}**")
-                        st.caption(f"`{u.email}`")
+                        st.write(f"**{u['name']}**")
+                        st.caption(f"`{u['email']}`")
                     with cols[1]:
-                        st.write(f"Role: {get_role_display_name(u.role)}")
+                        st.write(f"Role: {get_role_display_name(u['role'])}")
                     with cols[2]:
-                        st.write(f"Active: {'✅' if u.is_active else '⛔'}")
+                        st.write(f"Active: {'✅' if u['is_active'] else '⛔'}")
+                _user_page_nav("role_users", page)
 
 
-with tab2:
+if active_tab == "System Configuration":
     st.subheader("System Configuration")
     st.write("System parameters and settings will be configured here.")
 
-with tab3:
+if active_tab == "Audit Logs":
     st.subheader("Audit Logs")
     st.write("System activity and audit logs will be displayed here.")
 
-with tab4:
+if active_tab == "Backup & Restore":
     st.subheader("Backup & Restore")
     st.write("Database backup and restoration will be managed here.")
 
+if active_tab == "Performance":
+    st.subheader("Performance")
+    st.caption(
+        "Recent SQL statements recorded by this app process. "
+        "Statements are grouped by fingerprint (literals and parameters removed)."
+    )
+
+    health = run_diagnostics()
+    st.markdown("**Database health** (background checks)")
+    col_h1, col_h2, col_h3, col_h4 = st.columns(4)
+    with col_h1:
+        st.metric("Status", "✅ Up" if health["connection_ok"] else "❌ Down")
+    with col_h2:
+        st.metric("Connect (ms)", health["latency"].get("connect_ms", "—"))
+    with col_h3:
+        st.metric("Pool checkout (ms)", health["latency"].get("checkout_ms", "—"))
+    with col_h4:
+        st.metric("Query RTT (ms)", health["latency"].get("query_ms", "—"))
+    st.caption(f"Last checked {health['age_seconds']:.0f}s ago ({health['checked_at']} UTC)")
+    warmup = health.get("pool_warmup")
+    if warmup and warmup["running"]:
+        st.caption(
+            f"Pool warm-up: **{warmup['state']}** · "
+            f"{warmup['connections']} / {warmup['target']} connection(s) · "
+            f"startup {warmup['startup_ms'] if warmup['startup_ms'] is not None else '—'} ms · "
+            f"last {warmup['last_reason'] or '—'} "
+            f"{warmup['last_warm_ms'] if warmup['last_warm_ms'] is not None else '—'} ms · "
+            f"{warmup['refills']} refill(s), {warmup['keepalives']} keepalive(s)"
+            + (f" · last error: {warmup['last_error']}" if warmup["last_error"] else "")
+        )
+    if len(health["latency_history"]) > 1:
+        st.line_chart(
+            [
+                {k: v for k, v in sample.items() if k.endswith("_ms")}
+                for sample in health["latency_history"]
+            ]
+        )
+
+    st.markdown("---")
+    st.markdown("**Connection pools** (this process)")
+    pools = get_pool_status()
+    waits = {s["engine"]: s for s in checkout_stats()}
+    if not pools:
+        st.caption("No database engine created yet.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Engine": name,
+                    "Profile": pool["profile"],
+                    "Pool": pool["pool"],
+                    "Size": pool["size"],
+                    "In use": pool["checked_out"],
+                    "Idle": pool["idle"],
+                    "Overflow": (
+                        f"{pool['overflow']} / {pool['max_overflow']}"
+                        if pool["overflow"] is not None else None
+                    ),
+                    "Recycle (s)": pool["recycle_s"],
+                    "LIFO": pool["lifo"],
+                    "Pre-ping": pool["pre_ping"],
+                    "Prepared stmts": pool["prepared_statements"],
+                    "Checkouts": waits.get(name, {}).get("checkouts", 0),
+                    "Wait p50 (ms)": round(waits[name]["p50_ms"], 2) if name in waits else None,
+                    "Wait p95 (ms)": round(waits[name]["p95_ms"], 2) if name in waits else None,
+                    "Wait max (ms)": round(waits[name]["max_ms"], 1) if name in waits else None,
+                }
+                for name, pool in pools.items()
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption(
+            "Checkout wait is the time a session waited for its connection: queueing for the pool, "
+            "plus connecting when none was idle (always, with the transaction pooler's NullPool)."
+        )
 
+    st.markdown("---")
+    cache = get_result_cache()
+    cache_stats = cache.stats()
+    lookups = cache_stats.hits + cache_stats.misses
+    st.markdown("**Result cache** (this process)")
+    col_c1, col_c2, col_c3, col_c4, col_c5 = st.columns(5)
+    with col_c1:
+        st.metric(
+            "Hit ratio",
+            f"{cache_stats.hits / lookups:.0%}" if lookups else "—",
+        )
+    with col_c2:
+        st.metric("Entries", f"{cache_stats.entries} / {cache_stats.max_entries}")
+    with col_c3:
+        st.metric(
+            "Memory (MB)",
+            f"{cache_stats.bytes / 1048576:.1f} / {cache_stats.max_bytes / 1048576:.0f}",
+        )
+    with col_c4:
+        st.metric("Evictions", cache_stats.evictions)
+    with col_c5:
+        st.metric("Invalidations", cache_stats.invalidations)
+    bus = get_invalidation_bus().snapshot()
+    if bus["mode"] == "off":
+        st.caption("Cross-process invalidation: off (single process)")
+    else:
+        st.caption(
+            f"Cross-process invalidation: **{bus['mode']}** · "
+            f"{'connected' if bus['connected'] else 'disconnected'} · "
+            f"{bus['applied']} applied / {bus['received']} received · "
+            f"{bus['reconnects']} reconnect(s)"
+            + (f" · last error: {bus['last_error']}" if bus["last_error"] else "")
+        )
+    if cache_stats.by_namespace:
+        st.dataframe(
+            [
+                {
+                    "Read model": namespace,
+                    "Hits": counts.get("hits", 0),
+                    "Misses": counts.get("misses", 0),
+                    "Expired": counts.get("expirations", 0),
+                    "Evicted": counts.get("evictions", 0),
+                    "Invalidated": counts.get("invalidations", 0),
+                    "Stale loads": counts.get("stale_loads", 0),
+                    "Rewritten": counts.get("rewrites", 0),
+                }
+                for namespace, counts in sorted(cache_stats.by_namespace.items())
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+    col_cache_reset, col_cache_clear, _ = st.columns([1, 1, 4])
+    with col_cache_reset:
+        if st.button("Reset counters", key="cache_reset_stats"):
+            cache.reset_stats()
+            st.rerun()
+    with col_cache_clear:
+        if st.button("Clear cache", key="cache_clear"):
+            cache.clear()
+            st.rerun()
+
+    st.markdown("---")
+    records = get_query_records()
+
+    col_thr, col_info, col_clear = st.columns([2, 3, 1])
+    with col_thr:
+        slow_threshold = st.number_input(
+            "Slow query threshold (ms)",
+            min_value=0.0,
+            value=get_settings().slow_query_ms,
+            step=50.0,
+        )
+    with col_info:
+        st.metric("Recorded statements", len(records))
+    with col_clear:
+        if st.button("Clear log", key="perf_clear"):
+            clear_query_records()
+            st.rerun()
+
+    if not records:
+        st.info("No queries recorded yet. Browse other pages to collect data.")
+    else:
+        st.markdown("**Latency by statement**")
+        st.dataframe(
+            [
+                {
+                    "Statement": s["fingerprint"],
+                    "Calls": s["calls"],
+                    "p50 (ms)": round(s["p50_ms"], 2),
+                    "p95 (ms)": round(s["p95_ms"], 2),
+                    "p99 (ms)": round(s["p99_ms"], 2),
+                    "Max (ms)": round(s["max_ms"], 2),
+                    "Total (ms)": round(s["total_ms"], 1),
+                    "Avg rows": round(s["avg_rows"], 1) if s["avg_rows"] is not None else None,
+                }
+                for s in fingerprint_stats(records)
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+        st.markdown("**Queries per page rerun**")
+        st.dataframe(
+            [
+                {
+                    "Page": p["page"],
+                    "Reruns": p["reruns"],
+                    "Queries": p["queries"],
+                    "Avg queries / rerun": round(p["avg_queries_per_rerun"], 1),
+                    "Max queries / rerun": p["max_queries_per_rerun"],
+                    "Avg DB time / rerun (ms)": round(p["avg_db_ms_per_rerun"], 1),
+                }
+                for p in page_stats(records)
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+        slow = slow_queries(slow_threshold, records)
+        st.markdown(f"**Slow query log** (≥ {slow_threshold:g} ms)")
+        if not slow:
+            st.success("No queries above the threshold.")
+        else:
+            st.dataframe(
+                [
+                    {
+                        "Executed (UTC)": r.executed_at.strftime("%Y-%m-%d %H:%M:%S"),
+                        "Page": r.page,
+                        "Duration (ms)": round(r.duration_ms, 1),
+                        "Rows": r.row_count,
+                        "Engine": r.engine,
+                        "Statement": r.statement,
+                    }
+                    for r in slow
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
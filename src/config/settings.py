@@ -1,71 +1,189 @@
 """
 Application configuration and settings
+
+Settings are resolved once per process into an immutable `Settings` object
+(see `get_settings()`). Call `reload_settings()` after changing secrets or
+environment variables; registered reload hooks (e.g. the database engine)
+are notified so they can rebuild themselves.
 """
 
 import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional
+
 import streamlit as st
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
+
+# Variables supplied by .env rather than the real environment; only these
+# are refreshed from .env by reload_settings()
+_dotenv_keys = set(dotenv_values()) - set(os.environ)
 
 # Load environment variables (for local development)
 load_dotenv()
 
-def load_config():
-    """Load application configuration from environment variables or Streamlit secrets"""
-    
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable application settings"""
+
+    database_url: Optional[str]
+    # Optional read replica; read-only sessions fall back to the primary
+    database_read_url: Optional[str]
+    secret_key: str
+    config_source: str  # Debug info: where DATABASE_URL came from
+    debug: bool
+    log_level: str
+
+    # Connection circuit breaker and read retries
+    db_breaker_failure_threshold: int
+    db_breaker_base_delay: float
+    db_breaker_max_delay: float
+    db_read_retries: int
+
+    # Connection pooling (src/database/connection_profiles.py); None keeps
+    # the profile's value
+    db_connection_profile: str  # auto, session_pooler, transaction_pooler or direct
+    db_pool_size: Optional[int]
+    db_max_overflow: Optional[int]
+    db_pool_timeout: Optional[float]
+    db_pool_recycle_seconds: Optional[int]
+    db_pool_use_lifo: Optional[bool]
+    db_pool_pre_ping: Optional[bool]
+    # Background pool warm-up (src/database/pool_warmer.py); 0 disables
+    db_pool_warm_connections: int
+    db_pool_keepalive_seconds: float
+
+    # Background database health checks (src/utils/diagnostics.py)
+    diagnostics_interval_seconds: float
+    diagnostics_history_size: int
+
+    # Query instrumentation (Admin Panel → Performance)
+    query_log_size: int
+    slow_query_ms: float
+
+    # Read-model caching (src/services/cache.py)
+    cache_max_entries: int
+    cache_max_bytes: int
+    cache_ttl_seconds: float
+    dashboard_metrics_ttl_seconds: float
+
+    # Cross-process cache invalidation (src/services/invalidation_bus.py)
+    cache_bus_mode: str  # auto, listen, poll or off
+    cache_bus_poll_seconds: float
+
+    # Registration wizard draft buffer (src/services/registration_draft.py)
+    registration_autosave_seconds: float  # 0 saves every step immediately
+
+    # Reviewer "claim next registration" lease (src/services/student_service.py)
+    review_claim_lease_seconds: float
+
+    # AWS S3 Configuration (optional)
+    aws_access_key_id: Optional[str]
+    aws_secret_access_key: Optional[str]
+    aws_s3_bucket: str
+    aws_region: str
+
+    # Email Configuration (optional)
+    email_api_key: Optional[str]
+    email_from: str
+
+    # SMS Configuration (optional)
+    sms_api_key: Optional[str]
+    sms_from: Optional[str]
+
+    def as_dict(self) -> dict:
+        """Legacy dictionary form returned by `load_config()`"""
+        config = asdict(self)
+        config['_config_source'] = config.pop('config_source')
+        return config
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+_reload_hooks: List[Callable[[Settings, Settings], None]] = []
+
+
+def _read_streamlit_secrets():
+    """
+    Read database and security settings from Streamlit secrets
+
+    Returns:
+        (database_url, database_read_url, secret_key), each None if unavailable
+    """
     database_url = None
+    database_read_url = None
     secret_key = None
-    source = "none"
-    
-    # Try to get from Streamlit secrets first (for Streamlit Cloud)
+
     try:
         # Check if we're in a Streamlit context and secrets are available
         if hasattr(st, 'secrets'):
             try:
                 # Try different ways to access secrets (Streamlit versions vary)
-                secrets_dict = None
-                
-                # Method 1: Direct access as dict
-                if isinstance(st.secrets, dict):
-                    secrets_dict = st.secrets
-                # Method 2: Access via get method
-                elif hasattr(st.secrets, 'get'):
-                    # Try to get all secrets to see structure
+                # Method 1: Access via mapping interface
+                if isinstance(st.secrets, dict) or hasattr(st.secrets, 'get'):
                     try:
                         if 'DATABASE_URL' in st.secrets:
                             database_url = st.secrets['DATABASE_URL']
-                            source = "streamlit_secrets"
                     except:
                         pass
-                # Method 3: Try accessing as attribute
+                # Method 2: Try accessing as attribute
                 if not database_url:
                     try:
                         if hasattr(st.secrets, 'DATABASE_URL'):
                             database_url = getattr(st.secrets, 'DATABASE_URL')
-                            source = "streamlit_secrets"
                     except:
                         pass
-                        
+
                 # Also try SECRET_KEY
-                if not secret_key:
-                    try:
-                        if 'SECRET_KEY' in st.secrets:
-                            secret_key = st.secrets['SECRET_KEY']
-                        elif hasattr(st.secrets, 'SECRET_KEY'):
-                            secret_key = getattr(st.secrets, 'SECRET_KEY')
-                    except:
-                        pass
-            except (AttributeError, KeyError, TypeError, RuntimeError) as e:
+                try:
+                    if 'SECRET_KEY' in st.secrets:
+                        secret_key = st.secrets['SECRET_KEY']
+                    elif hasattr(st.secrets, 'SECRET_KEY'):
+                        secret_key = getattr(st.secrets, 'SECRET_KEY')
+                except:
+                    pass
+
+                # Optional read replica
+                try:
+                    if 'DATABASE_READ_URL' in st.secrets:
+                        database_read_url = st.secrets['DATABASE_READ_URL']
+                except:
+                    pass
+            except (AttributeError, KeyError, TypeError, RuntimeError):
                 # Secrets might not be available yet or in wrong format
                 pass
     except (RuntimeError, AttributeError):
         # Not in Streamlit context (e.g., during import or testing)
         pass
-    
+
+    return database_url, database_read_url, secret_key
+
+
+def _optional_env(name: str, cast: Callable):
+    """Environment variable converted with ``cast``, or None when unset/blank"""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return None
+    if cast is bool:
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return cast(value)
+
+
+def _build_settings() -> Settings:
+    """Resolve settings from Streamlit secrets and environment variables"""
+
+    # Try to get from Streamlit secrets first (for Streamlit Cloud)
+    database_url, database_read_url, secret_key = _read_streamlit_secrets()
+    source = "streamlit_secrets" if database_url else "none"
+
     # Fall back to environment variables (for local development)
     if not database_url:
         database_url = os.getenv('DATABASE_URL')
         if database_url:
             source = "environment_variable"
+    if not database_read_url:
+        database_read_url = os.getenv('DATABASE_READ_URL') or None
     if not secret_key:
         secret_key = os.getenv('SECRET_KEY')
 
@@ -73,28 +191,109 @@ def load_config():
     # If DATABASE_URL is not set via Streamlit secrets or environment
     # variables, the rest of the app will surface a clear configuration
     # error instead of trying to connect to localhost.
-    
-    config = {
-        'database_url': database_url,
-        'secret_key': secret_key or 'change-this-secret-key',
-        '_config_source': source,  # Debug info
-        'debug': os.getenv('DEBUG', 'False').lower() == 'true',
-        'log_level': os.getenv('LOG_LEVEL', 'INFO'),
-        
-        # AWS S3 Configuration (optional)
-        'aws_access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
-        'aws_secret_access_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
-        'aws_s3_bucket': os.getenv('AWS_S3_BUCKET', 'seims-files'),
-        'aws_region': os.getenv('AWS_REGION', 'us-east-1'),
-        
-        # Email Configuration (optional)
-        'email_api_key': os.getenv('EMAIL_API_KEY'),
-        'email_from': os.getenv('EMAIL_FROM', 'noreply@seims.edu'),
-        
-        # SMS Configuration (optional)
-        'sms_api_key': os.getenv('SMS_API_KEY'),
-        'sms_from': os.getenv('SMS_FROM'),
-    }
-    
-    return config
 
+    return Settings(
+        database_url=database_url,
+        database_read_url=database_read_url,
+        secret_key=secret_key or 'change-this-secret-key',
+        config_source=source,
+        debug=os.getenv('DEBUG', 'False').lower() == 'true',
+        log_level=os.getenv('LOG_LEVEL', 'INFO'),
+
+        db_breaker_failure_threshold=int(os.getenv('DB_BREAKER_FAILURE_THRESHOLD', '3')),
+        db_breaker_base_delay=float(os.getenv('DB_BREAKER_BASE_DELAY', '2')),
+        db_breaker_max_delay=float(os.getenv('DB_BREAKER_MAX_DELAY', '60')),
+        db_read_retries=int(os.getenv('DB_READ_RETRIES', '2')),
+
+        db_connection_profile=os.getenv('DB_CONNECTION_PROFILE', 'auto').lower(),
+        db_pool_size=_optional_env('DB_POOL_SIZE', int),
+        db_max_overflow=_optional_env('DB_MAX_OVERFLOW', int),
+        db_pool_timeout=_optional_env('DB_POOL_TIMEOUT', float),
+        db_pool_recycle_seconds=_optional_env('DB_POOL_RECYCLE_SECONDS', int),
+        db_pool_use_lifo=_optional_env('DB_POOL_USE_LIFO', bool),
+        db_pool_pre_ping=_optional_env('DB_POOL_PRE_PING', bool),
+        db_pool_warm_connections=int(os.getenv('DB_POOL_WARM_CONNECTIONS', '3')),
+        db_pool_keepalive_seconds=float(os.getenv('DB_POOL_KEEPALIVE_SECONDS', '60')),
+
+        diagnostics_interval_seconds=float(os.getenv('DIAGNOSTICS_INTERVAL_SECONDS', '60')),
+        diagnostics_history_size=int(os.getenv('DIAGNOSTICS_HISTORY_SIZE', '60')),
+
+        query_log_size=int(os.getenv('QUERY_LOG_SIZE', '5000')),
+        slow_query_ms=float(os.getenv('SLOW_QUERY_MS', '500')),
+
+        cache_max_entries=int(os.getenv('CACHE_MAX_ENTRIES', '512')),
+        cache_max_bytes=int(float(os.getenv('CACHE_MAX_MB', '64')) * 1024 * 1024),
+        cache_ttl_seconds=float(os.getenv('CACHE_TTL_SECONDS', '60')),
+        dashboard_metrics_ttl_seconds=float(os.getenv('DASHBOARD_METRICS_TTL_SECONDS', '30')),
+
+        cache_bus_mode=os.getenv('CACHE_BUS_MODE', 'auto').lower(),
+        cache_bus_poll_seconds=float(os.getenv('CACHE_BUS_POLL_SECONDS', '5')),
+
+        registration_autosave_seconds=float(os.getenv('REGISTRATION_AUTOSAVE_SECONDS', '5')),
+
+        review_claim_lease_seconds=float(os.getenv('REVIEW_CLAIM_LEASE_SECONDS', '900')),
+
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        aws_s3_bucket=os.getenv('AWS_S3_BUCKET', 'seims-files'),
+        aws_region=os.getenv('AWS_REGION', 'us-east-1'),
+
+        email_api_key=os.getenv('EMAIL_API_KEY'),
+        email_from=os.getenv('EMAIL_FROM', 'noreply@seims.edu'),
+
+        sms_api_key=os.getenv('SMS_API_KEY'),
+        sms_from=os.getenv('SMS_FROM'),
+    )
+
+
+def get_settings() -> Settings:
+    """Get the process-wide settings, building them on first use"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = _build_settings()
+    return _settings
+
+
+def _reload_dotenv():
+    """Re-apply .env without overriding variables set by the real environment"""
+    for key, value in dotenv_values().items():
+        if value is not None and (key in _dotenv_keys or key not in os.environ):
+            _dotenv_keys.add(key)
+            os.environ[key] = value
+
+
+def on_settings_reload(hook: Callable[[Settings, Settings], None]):
+    """Register ``hook(old, new)`` to run after `reload_settings()`"""
+    if hook not in _reload_hooks:
+        _reload_hooks.append(hook)
+
+
+def reload_settings() -> Settings:
+    """
+    Re-read secrets and environment variables
+
+    Reload hooks run with the old and new settings, e.g. so the database
+    engine is rebuilt when DATABASE_URL changes.
+    """
+    global _settings
+    _reload_dotenv()
+    with _settings_lock:
+        old = _settings
+        _settings = _build_settings()
+        new = _settings
+
+    if old is not None:
+        for hook in list(_reload_hooks):
+            hook(old, new)
+    return new
+
+
+def load_config():
+    """
+    Load application configuration from environment variables or Streamlit secrets
+
+    Compatibility shim: returns a fresh dict copy of `get_settings()`.
+    """
+    return get_settings().as_dict()
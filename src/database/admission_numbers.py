@@ -0,0 +1,94 @@
+"""
+Admission number assignment
+
+Admission numbers look like ``S-<year>-<n>``, where n counts up per
+calendar year.
+
+- PostgreSQL: n comes from a sequence per year (admission_numbers_<year>,
+  created on first use by admission_number_sequence() in
+  database_setup.sql). The assign_students_admission_number trigger fills
+  the number in during the INSERT, and ``Student.admission_number`` comes
+  back in the INSERT's RETURNING clause. Sequences don't hold locks until
+  commit, so concurrent registrations and imports never wait for each
+  other; a rolled-back insert leaves a gap in the year's numbers.
+- Other databases (SQLite for local runs) have no trigger or sequences; a
+  ``before_insert`` hook reserves the number from the admission_counters
+  table. SQLite allows one writer at a time anyway, so the counter row
+  adds no waiting, and numbers there are gap-free.
+- Bulk loads reserve a whole block of numbers with one statement
+  (``reserve_admission_numbers``) and insert them explicitly.
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import Integer, cast, event, func, select, text
+from sqlalchemy.dialects import sqlite
+
+from src.database.models import AdmissionCounter, Student
+
+
+def format_admission_number(year: int, number: int) -> str:
+    """'S-2026-0042'; at least four digits, never truncated"""
+    return f"S-{year}-{number:04d}"
+
+
+def _issued_before_counters(year: int):
+    """Highest n already issued for ``year``, for databases set up before the counters existed"""
+    prefix = f"S-{year}-"
+    return (
+        select(func.coalesce(func.max(cast(func.substr(Student.admission_number, len(prefix) + 1), Integer)), 0))
+        .where(Student.admission_number.like(f"{prefix}%"))
+        .scalar_subquery()
+    )
+
+
+def reserve_admission_numbers(connection, count: int, year: Optional[int] = None) -> List[str]:
+    """
+    Reserve ``count`` admission numbers in one statement
+
+    Numbers are never issued twice and come back in ascending order. On
+    PostgreSQL they are drawn from the year's sequence: a concurrent
+    registration can take numbers in between, and a rolled-back
+    transaction leaves its numbers unused. On SQLite the counter row stays
+    locked until the caller's transaction ends, so the block is consecutive
+    and a rollback releases it.
+
+    Args:
+        connection: Connection of the transaction that will insert the students
+        count: Numbers to reserve
+        year: Admission year (defaults to the current year)
+
+    Returns:
+        The reserved admission numbers, in order
+    """
+    if count <= 0:
+        return []
+    year = year or date.today().year
+    if connection.dialect.name == 'postgresql':
+        numbers = connection.execute(
+            text(
+                "SELECT nextval(seq) AS number "
+                "FROM admission_number_sequence(:year) AS seq, generate_series(1, :count) "
+                "ORDER BY number"
+            ),
+            {'year': year, 'count': count},
+        ).scalars()
+        return [format_admission_number(year, number) for number in numbers]
+
+    counters = AdmissionCounter.__table__
+    stmt = sqlite.insert(counters).values(year=year, last_number=_issued_before_counters(year) + count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[counters.c.year],
+        set_={'last_number': counters.c.last_number + count},
+    ).returning(counters.c.last_number)
+
+    last = connection.execute(stmt).scalar_one()
+    return [format_admission_number(year, number) for number in range(last - count + 1, last + 1)]
+
+
+@event.listens_for(Student, 'before_insert')
+def _assign_admission_number(mapper, connection, target):
+    # PostgreSQL assigns it in the INSERT itself (trigger + RETURNING)
+    if target.admission_number is None and connection.dialect.name != 'postgresql':
+        target.admission_number = reserve_admission_numbers(connection, 1)[0]
@@ -0,0 +1,157 @@
+"""
+Background event loop for async database work
+
+Streamlit runs each page script synchronously on its own thread, so pages
+can't ``await``. One daemon thread per process runs an asyncio event loop;
+pages hand it coroutines and block until they finish. The async engine
+(``async_db_session`` in src/database/connection.py) lives on this loop:
+asyncpg connections belong to the loop that opened them.
+
+``gather_loaders`` fans a page's independent loaders out concurrently, so
+the page waits for its slowest query rather than the sum of all of them::
+
+    data = gather_loaders(
+        metrics=load_dashboard_metrics_async,
+        queue=list_approval_queue_async,
+    )
+
+Async functions run on the loop; plain functions (existing sync loaders)
+run on a dedicated loader thread pool sized to the primary engine's
+connection pool, rather than the loop's shared default executor, so they
+don't queue behind other thread work and don't start more blocking
+queries than there are connections. Either way loaders must not call
+Streamlit, and their queries are attributed to the calling page in the
+query log.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.utils.script_run import attributed_to, current_script_run
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+# Loader threads when the engine has no app-side pool to size them from
+NULL_POOL_LOADER_THREADS = 8
+
+_loader_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide background loop, started on first use"""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _thread is None or not _thread.is_alive():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="seims-async-loop", daemon=True)
+            thread.start()
+            _loop, _thread = loop, thread
+        return _loop
+
+
+def loop_is_running() -> bool:
+    """Whether the background loop has been started (without starting it)"""
+    return _thread is not None and _thread.is_alive()
+
+
+async def _attributed(awaitable: Awaitable, run):
+    with attributed_to(run):
+        return await awaitable
+
+
+def run_async(awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the background loop and wait for its result
+
+    Args:
+        awaitable: Coroutine to run
+        timeout: Seconds to wait before cancelling it (None waits indefinitely)
+
+    Raises:
+        Whatever the coroutine raises; TimeoutError when ``timeout`` elapses
+    """
+    loop = get_event_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run_async() called on the async loop itself; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(_attributed(awaitable, current_script_run()), loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Async work did not finish within {timeout}s") from None
+
+
+def loader_threads() -> int:
+    """Threads for sync loaders: as many as the primary engine has connections"""
+    from src.config.settings import get_settings
+    from src.database.connection_profiles import resolve_profile
+
+    config = get_settings()
+    profile = resolve_profile(config.database_url, config)
+    if profile.null_pool:
+        return NULL_POOL_LOADER_THREADS
+    return max(profile.pool_size + profile.max_overflow, 1)
+
+
+def _get_loader_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _loader_executor
+    with _lock:
+        if _loader_executor is None:
+            _loader_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=loader_threads(), thread_name_prefix="seims-loader"
+            )
+        return _loader_executor
+
+
+async def _call(loader: Callable[[], Any]) -> Any:
+    if inspect.iscoroutinefunction(loader):
+        return await loader()
+    # Like asyncio.to_thread, but on the loader pool; the copied context
+    # carries the page attribution
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_loader_executor(), functools.partial(context.run, loader)
+    )
+
+
+async def _gather(loaders: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    results = await asyncio.gather(*(_call(loader) for loader in loaders.values()), return_exceptions=True)
+    return dict(zip(loaders, results))
+
+
+def gather_loaders(
+    return_exceptions: bool = False,
+    timeout: Optional[float] = None,
+    **loaders: Callable[[], Any],
+) -> Dict[str, Any]:
+    """
+    Run independent page loaders concurrently and collect their results
+
+    Args:
+        return_exceptions: Put a failed loader's exception in its result
+            slot instead of raising it, so the page can degrade per section
+        timeout: Seconds to wait for all loaders
+        **loaders: name -> zero-argument async or plain function
+
+    Returns:
+        name -> loader result, in argument order
+
+    Raises:
+        The first failed loader's exception (after all have finished),
+        unless ``return_exceptions``
+    """
+    if not loaders:
+        return {}
+    results = run_async(_gather(loaders), timeout=timeout)
+    if not return_exceptions:
+        for result in results.values():
+            if isinstance(result, BaseException):
+                raise result
+    return results
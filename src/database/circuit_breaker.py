@@ -0,0 +1,136 @@
+"""
+Connection circuit breaker
+
+Stops every Streamlit rerun from waiting out the full connect timeout when
+the database is paused or unreachable. After ``failure_threshold``
+consecutive connection failures the breaker opens and sessions fail fast.
+Once the backoff delay has elapsed a single probe session is let through
+(half-open); success closes the breaker, failure re-opens it with a longer,
+jittered delay.
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# A probe that never reports back (e.g. its thread died) is abandoned after this
+PROBE_TIMEOUT_SECONDS = 30.0
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of connecting while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure circuit breaker with exponential backoff"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        jitter: float = 0.2,
+    ):
+        self.name = name
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._open_count = 0  # consecutive trips without a successful probe
+        self._retry_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._last_error: Optional[str] = None
+        self._last_failure_at: Optional[float] = None
+        self._last_state_change = time.time()
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            self._state = state
+            self._last_state_change = time.time()
+
+    def _backoff_delay(self) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** max(self._open_count - 1, 0)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a new session may try to connect
+
+        While open, only one caller is admitted (as the half-open probe) once
+        the backoff delay has elapsed; everyone else fails fast.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == OPEN and now >= self._retry_at:
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN and (
+                not self._probe_in_flight or now - self._probe_started > PROBE_TIMEOUT_SECONDS
+            ):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            return False
+
+    def record_success(self):
+        """A connection was established; close the breaker"""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._open_count = 0
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        """A connection attempt failed with an OperationalError"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_failure_at = time.time()
+            if error is not None:
+                message = str(error).strip()
+                self._last_error = message.splitlines()[0][:300] if message else type(error).__name__
+
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._open_count += 1
+                self._retry_at = time.monotonic() + self._backoff_delay()
+                self._probe_in_flight = False
+                self._set_state(OPEN)
+
+    def retry_in(self) -> float:
+        """Seconds until the next half-open probe is allowed (0 when not open)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(self._retry_at - time.monotonic(), 0.0)
+
+    def snapshot(self) -> dict:
+        """Current breaker state for diagnostics"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'trips': self._open_count,
+                'retry_in_seconds': round(max(self._retry_at - time.monotonic(), 0.0), 1)
+                if self._state == OPEN else 0.0,
+                'last_error': self._last_error,
+                'last_failure_at': self._last_failure_at,
+                'last_state_change': self._last_state_change,
+            }
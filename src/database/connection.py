@@ -2,81 +2,418 @@
 Database connection and session management
 """
 
-from contextlib import contextmanager
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import OperationalError
-from src.config.settings import load_config
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.config.settings import get_settings, on_settings_reload
+from src.database.circuit_breaker import HALF_OPEN, CircuitBreaker, CircuitOpenError
+from src.database.connection_profiles import asyncpg_connect_args, engine_options, resolve_profile
+from src.database.instrumentation import instrument_engine, record_checkout, set_buffer_size
 
 # Initialize engine and session factory lazily
 _engine = None
 _SessionLocal = None
+_read_engine = None
+_ReadSessionLocal = None
 _config = None
 
+# Async engines (asyncpg / aiosqlite) by name ("primary", "replica"), each
+# with its session factory; used on the background loop (async_runner.py)
+_async_engines = {}
+
+# Async drivers for the sync URLs' backends
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# One circuit breaker per engine ("primary", "replica")
+_breakers = {}
+
+# Connection profile each engine was created with, by engine name
+_profiles = {}
+
+# Settings that require new engines when a reload changes them
+_ENGINE_SETTINGS = (
+    "database_url",
+    "database_read_url",
+    "db_connection_profile",
+    "db_pool_size",
+    "db_max_overflow",
+    "db_pool_timeout",
+    "db_pool_recycle_seconds",
+    "db_pool_use_lifo",
+    "db_pool_pre_ping",
+)
+
+# OperationalError messages worth retrying for idempotent (read-only) sessions
+_TRANSIENT_ERROR_MARKERS = (
+    "could not connect",
+    "connection refused",
+    "connection reset",
+    "server closed the connection",
+    "terminating connection",
+    "timeout expired",
+    "connection timed out",
+    "ssl syscall error",
+    "the database system is starting up",
+)
+
+def _get_connect_args(database_url: str) -> dict:
+    """DBAPI connect() arguments for the given URL"""
+    # Basic connect args; SSL is already specified in the URL for Supabase
+    connect_args = {}
+    if database_url.startswith("postgresql"):
+        connect_args["connect_timeout"] = 10
+    return connect_args
+
+def _is_in_memory_sqlite(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def _create_engine(database_url: str, engine_name: str = "primary"):
+    """Create an engine with its connection profile's pool settings and query instrumentation"""
+    profile = resolve_profile(database_url, _config or get_settings())
+    connect_args = _get_connect_args(database_url)
+    options = engine_options(profile)
+    if _is_in_memory_sqlite(database_url):
+        # Every new connection would be a separate empty database, so all
+        # sessions (on any thread) share one connection instead of a pool
+        connect_args["check_same_thread"] = False
+        options = {"poolclass": StaticPool}
+    db_engine = create_engine(database_url, connect_args=connect_args, **options)
+    instrument_engine(db_engine, engine_name)
+    _profiles[engine_name] = profile
+    return db_engine
+
+def _create_session_factory(db_engine):
+    """Create a session factory bound to the given engine"""
+    # expire_on_commit=False so objects can be safely read after the
+    # context manager commits/closes the session (e.g. in Streamlit UI).
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=db_engine,
+    )
+
 def _get_engine():
     """Get or create database engine (lazy initialization)"""
     global _engine, _SessionLocal, _config
     
     if _engine is None:
         # Load config when actually needed (not at import time)
-        _config = load_config()
+        config = _config = get_settings()
         
         try:
-            # Always use the DATABASE_URL provided by load_config()
-            database_url = _config['database_url']
-
-            # Basic connect args; SSL is already specified in the URL for Supabase
-            connect_args = {"connect_timeout": 10}
-
-            _engine = create_engine(
-                database_url,
-                pool_pre_ping=True,
-                pool_size=10,
-                max_overflow=20,
-                connect_args=connect_args,
-            )
+            # Always use the DATABASE_URL provided by get_settings()
+            database_url = config.database_url
+
+            set_buffer_size(config.query_log_size)
+            _engine = _create_engine(database_url)
             # Create session factory
-            # expire_on_commit=False so objects can be safely read after the
-            # context manager commits/closes the session (e.g. in Streamlit UI).
-            _SessionLocal = sessionmaker(
-                autocommit=False,
-                autoflush=False,
-                expire_on_commit=False,
-                bind=_engine,
-            )
+            _SessionLocal = _create_session_factory(_engine)
         except Exception as e:
             _engine = None
             _SessionLocal = None
             print(f"Warning: Could not create database engine: {e}")
+        else:
+            # Open pool connections in the background before users need them
+            from src.database.pool_warmer import get_pool_warmer
+            get_pool_warmer().start()
     
     return _engine, _SessionLocal
 
-@contextmanager
-def get_db_session():
-    """Get database session context manager"""
+def _get_read_engine():
+    """
+    Get or create the read-replica engine (lazy initialization).
+
+    Falls back to the primary engine when DATABASE_READ_URL is not set
+    or the replica engine cannot be created.
+    """
+    global _read_engine, _ReadSessionLocal
+
     db_engine, db_session_local = _get_engine()
+
+    if _read_engine is None:
+        config = _config
+        read_url = config.database_read_url if config else None
+        if not read_url or db_engine is None:
+            return db_engine, db_session_local
+
+        try:
+            # Separate pool so replica traffic never queues behind writes
+            _read_engine = _create_engine(read_url, engine_name="replica")
+            _ReadSessionLocal = _create_session_factory(_read_engine)
+        except Exception as e:
+            _read_engine = None
+            _ReadSessionLocal = None
+            print(f"Warning: Could not create read replica engine, using primary: {e}")
+            return db_engine, db_session_local
+
+    return _read_engine, _ReadSessionLocal
+
+def _async_database_url(database_url: str):
+    """The same database with its async driver (psycopg2 -> asyncpg, pysqlite -> aiosqlite)"""
+    url = make_url(database_url)
+    drivername = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    query = dict(url.query)
+    # libpq spellings asyncpg doesn't accept; connect_timeout becomes timeout below
+    query.pop("connect_timeout", None)
+    if drivername == "postgresql+asyncpg" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername=drivername, query=query)
+
+def _get_async_connect_args(async_url, profile) -> dict:
+    """asyncpg connect() arguments matching _get_connect_args"""
+    if async_url.get_backend_name() == "postgresql":
+        return {"timeout": 10, **asyncpg_connect_args(profile)}
+    return {}
+
+def _get_async_engine(readonly: bool = False):
+    """
+    Get or create the async engine (lazy initialization)
+
+    Mirrors the sync engines: read-only sessions use the replica when
+    DATABASE_READ_URL is set. Must be called on the background loop.
+    """
+    _get_engine()
+    config = _config
+    read_url = config.database_read_url if config else None
+    name = "replica" if readonly and read_url else "primary"
+    if name not in _async_engines:
+        database_url = read_url if name == "replica" else (config.database_url if config else None)
+        if not database_url:
+            return None, None
+        try:
+            profile = resolve_profile(database_url, config)
+            async_url = _async_database_url(database_url)
+            db_engine = create_async_engine(
+                async_url,
+                connect_args=_get_async_connect_args(async_url, profile),
+                **engine_options(profile),
+            )
+        except Exception as e:
+            print(f"Warning: Could not create async database engine: {e}")
+            return None, None
+        instrument_engine(db_engine.sync_engine, f"{name} (async)")
+        _profiles[f"{name} (async)"] = profile
+        _async_engines[name] = (
+            db_engine,
+            async_sessionmaker(db_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False),
+        )
+    return _async_engines[name]
+
+def _dispose_async_engines():
+    """Close the async pools on the loop that owns their connections"""
+    engines = [db_engine for db_engine, _ in _async_engines.values()]
+    _async_engines.clear()
+    if not engines:
+        return
+    from src.database import async_runner
+    if async_runner.loop_is_running():
+        for db_engine in engines:
+            try:
+                async_runner.run_async(db_engine.dispose(), timeout=10)
+            except Exception as e:
+                print(f"Warning: Could not dispose async database engine: {e}")
+
+def dispose_engines():
+    """Dispose all engines and circuit breakers; the next session rebuilds them"""
+    global _engine, _SessionLocal, _read_engine, _ReadSessionLocal, _config
+
+    for db_engine in (_engine, _read_engine):
+        if db_engine is not None:
+            db_engine.dispose()
+    _dispose_async_engines()
+    _engine = None
+    _SessionLocal = None
+    _read_engine = None
+    _ReadSessionLocal = None
+    _config = None
+    _breakers.clear()
+    _profiles.clear()
+
+def _on_settings_reload(old, new):
+    """Rebuild the engines when a reload changes the database URLs or pool settings"""
+    global _config
+    if any(getattr(old, name) != getattr(new, name) for name in _ENGINE_SETTINGS):
+        dispose_engines()
+    elif _config is not None:
+        _config = new
+
+on_settings_reload(_on_settings_reload)
+
+def get_circuit_breaker(name: str = "primary") -> CircuitBreaker:
+    """Get the circuit breaker guarding the named engine"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        config = get_settings()
+        breaker = _breakers.setdefault(name, CircuitBreaker(
+            name,
+            failure_threshold=config.db_breaker_failure_threshold,
+            base_delay=config.db_breaker_base_delay,
+            max_delay=config.db_breaker_max_delay,
+        ))
+    return breaker
+
+def get_circuit_breaker_states() -> dict:
+    """Snapshot of every circuit breaker created so far"""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
+
+def _is_transient_error(error: OperationalError) -> bool:
+    """Whether an OperationalError looks like a dropped/unavailable connection"""
+    if getattr(error, "connection_invalidated", False):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in _TRANSIENT_ERROR_MARKERS)
+
+def get_pool_status() -> dict:
+    """
+    Profile and current pool occupancy of every engine created so far
+
+    Returns:
+        engine name -> dict with the profile name, pool class, pool size,
+        checked out / idle / overflow connections and the pool timeout
+    """
+    engines = {"primary": _engine, "replica": _read_engine}
+    engines.update({f"{name} (async)": db_engine.sync_engine for name, (db_engine, _) in _async_engines.items()})
+    status = {}
+    for name, db_engine in engines.items():
+        if db_engine is None or name not in _profiles:
+            continue
+        pool = db_engine.pool
+        profile = _profiles[name]
+        queue_pool = hasattr(pool, "checkedout")
+        status[name] = {
+            "profile": profile.name,
+            "pool": type(pool).__name__,
+            "size": pool.size() if queue_pool else None,
+            "checked_out": pool.checkedout() if queue_pool else None,
+            "idle": pool.checkedin() if queue_pool else None,
+            "overflow": max(pool.overflow(), 0) if queue_pool else None,
+            "max_overflow": profile.max_overflow if queue_pool else None,
+            "timeout_s": profile.pool_timeout if queue_pool else None,
+            "recycle_s": profile.pool_recycle if queue_pool else None,
+            "lifo": profile.pool_use_lifo if queue_pool else None,
+            "pre_ping": profile.pool_pre_ping,
+            "prepared_statements": profile.prepared_statements,
+        }
+    return status
+
+def _begin_session(session, retries: int, engine_name: str = "primary"):
+    """
+    Check out the session's connection up front
+
+    Connection failures then surface here, where they can be counted by the
+    circuit breaker and, for idempotent read-only sessions, retried with
+    jittered exponential backoff before any caller code has run. The time
+    spent waiting for the connection is recorded for the Performance tab.
+    """
+    attempt = 0
+    while True:
+        try:
+            start = time.perf_counter()
+            session.connection()
+            record_checkout(engine_name, (time.perf_counter() - start) * 1000)
+            return
+        except OperationalError as e:
+            if attempt >= retries or not _is_transient_error(e):
+                raise
+            session.rollback()
+            time.sleep(min(0.25 * (2 ** attempt), 2.0) * random.uniform(0.5, 1.5))
+            attempt += 1
+
+def _release_probe(breaker: CircuitBreaker, connected: bool, error: Exception):
+    """
+    Report a non-OperationalError failure while connecting to a half-open breaker
+
+    The probe session must always report back; otherwise the breaker stays
+    half-open, failing everyone else fast, until the probe times out. Outside
+    half-open such errors (e.g. a pool timeout) say nothing about the
+    database and are not counted.
+    """
+    if not connected and breaker.state == HALF_OPEN:
+        breaker.record_failure(error)
+
+def _engine_not_initialized_error() -> ConnectionError:
+    return ConnectionError(
+        f"Database engine not initialized.\n\n"
+        f"Current DATABASE_URL: {get_settings().database_url or 'Not set'}\n\n"
+        f"Please check your DATABASE_URL configuration:\n"
+        f"- For Streamlit Cloud: Verify secrets are set correctly\n"
+        f"- For local development: Create a .env file with DATABASE_URL\n\n"
+        f"See DATABASE_SETUP.md for setup instructions."
+    )
+
+def _circuit_open_error(breaker: CircuitBreaker) -> CircuitOpenError:
+    return CircuitOpenError(
+        f"❌ Database temporarily unavailable.\n\n"
+        f"Recent connection attempts failed "
+        f"({breaker.snapshot()['last_error'] or 'OperationalError'}). "
+        f"Retrying automatically in {breaker.retry_in():.0f}s.\n\n"
+        f"If this persists, check whether your Supabase project is paused. "
+        f"See TROUBLESHOOTING_CONNECTION.md for detailed help."
+    )
+
+@contextmanager
+def get_db_session(readonly: bool = False):
+    """
+    Get database session context manager
+
+    Args:
+        readonly: Route the session to the read replica (DATABASE_READ_URL)
+            when one is configured. Read-only sessions are never committed,
+            so use the default primary session for writes and for reads
+            that must see the caller's own writes. Read-only sessions
+            also retry transient connection errors before yielding.
+
+    Raises:
+        CircuitOpenError: The database has been failing and the circuit
+            breaker is open; raised immediately instead of connecting.
+    """
+    if readonly:
+        db_engine, db_session_local = _get_read_engine()
+    else:
+        db_engine, db_session_local = _get_engine()
     
     if db_engine is None or db_session_local is None:
-        config = load_config()
-        raise ConnectionError(
-            f"Database engine not initialized.\n\n"
-            f"Current DATABASE_URL: {config.get('database_url', 'Not set')}\n\n"
-            f"Please check your DATABASE_URL configuration:\n"
-            f"- For Streamlit Cloud: Verify secrets are set correctly\n"
-            f"- For local development: Create a .env file with DATABASE_URL\n\n"
-            f"See DATABASE_SETUP.md for setup instructions."
-        )
+        raise _engine_not_initialized_error()
     
+    engine_name = "replica" if db_engine is _read_engine else "primary"
+    breaker = get_circuit_breaker(engine_name)
+    if not breaker.allow_request():
+        raise _circuit_open_error(breaker)
+
+    # Local snapshot: a settings reload can reset the module's _config meanwhile
+    config = get_settings()
     session = db_session_local()
+    session.info['readonly'] = readonly
+    connected = False
     try:
+        _begin_session(session, config.db_read_retries if readonly else 0, engine_name)
+        connected = True
+        breaker.record_success()
         yield session
-        session.commit()
+        if not readonly:
+            session.commit()
     except OperationalError as e:
+        # Query-level errors (e.g. lock timeouts) on a live connection don't count
+        if not connected or _is_transient_error(e):
+            breaker.record_failure(e)
         session.rollback()
         error_msg = str(e)
         # Get the actual config to show what URL was used
-        config = load_config()
-        db_url = config.get('database_url', 'Not set')
+        db_url = get_settings().database_url or 'Not set'
         # Mask password in URL for display
         if '@' in db_url and db_url != 'Not set':
             try:
@@ -111,26 +448,112 @@ def get_db_session():
                 f"See TROUBLESHOOTING_CONNECTION.md for detailed help."
             ) from e
         raise
-    except Exception:
+    except Exception as e:
+        _release_probe(breaker, connected, e)
         session.rollback()
         raise
     finally:
         session.close()
 
+async def _begin_async_session(session: AsyncSession, retries: int, engine_name: str = "primary (async)"):
+    """_begin_session for async sessions"""
+    attempt = 0
+    while True:
+        try:
+            start = time.perf_counter()
+            await session.connection()
+            record_checkout(engine_name, (time.perf_counter() - start) * 1000)
+            return
+        except OperationalError as e:
+            if attempt >= retries or not _is_transient_error(e):
+                raise
+            await session.rollback()
+            await asyncio.sleep(min(0.25 * (2 ** attempt), 2.0) * random.uniform(0.5, 1.5))
+            attempt += 1
+
+@asynccontextmanager
+async def async_db_session(readonly: bool = False):
+    """
+    Async counterpart of get_db_session (asyncpg on PostgreSQL)
+
+    Same read-replica routing, circuit breaker, retries and commit
+    behaviour. Only use it on the background loop, i.e. in coroutines run
+    through src/database/async_runner.py (``gather_loaders``/``run_async``).
+
+    Usage:
+        async with async_db_session(readonly=True) as session:
+            rows = (await session.execute(stmt)).all()
+
+    Raises:
+        CircuitOpenError: The database has been failing and the circuit
+            breaker is open; raised immediately instead of connecting.
+    """
+    db_engine, db_session_local = _get_async_engine(readonly)
+    if db_engine is None or db_session_local is None:
+        raise _engine_not_initialized_error()
+
+    is_replica = readonly and _async_engines.get("replica", (None,))[0] is db_engine
+    breaker = get_circuit_breaker("replica" if is_replica else "primary")
+    if not breaker.allow_request():
+        raise _circuit_open_error(breaker)
+
+    config = get_settings()
+    session = db_session_local()
+    session.sync_session.info['readonly'] = readonly
+    connected = False
+    try:
+        await _begin_async_session(
+            session,
+            config.db_read_retries if readonly else 0,
+            f"{'replica' if is_replica else 'primary'} (async)",
+        )
+        connected = True
+        breaker.record_success()
+        yield session
+        if not readonly:
+            await session.commit()
+    except OperationalError as e:
+        if not connected or _is_transient_error(e):
+            breaker.record_failure(e)
+        await session.rollback()
+        raise
+    except Exception as e:
+        _release_probe(breaker, connected, e)
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+def connect_outside_pool(db_engine):
+    """
+    Open a brand-new DBAPI connection that is not managed by the pool
+
+    For long-lived or one-off connections (LISTEN, latency probes); the
+    caller is responsible for closing it.
+    """
+    cargs, cparams = db_engine.dialect.create_connect_args(db_engine.url)
+    cparams.update(_get_connect_args(str(db_engine.url)))
+    return db_engine.dialect.connect(*cargs, **cparams)
+
+def measure_connect_time(db_engine) -> float:
+    """
+    Open (and close) a brand-new DBAPI connection outside the pool
+
+    Returns:
+        Seconds taken to connect, including TLS handshake and authentication
+    """
+    start = time.perf_counter()
+    dbapi_connection = connect_outside_pool(db_engine)
+    elapsed = time.perf_counter() - start
+    dbapi_connection.close()
+    return elapsed
+
 def get_db() -> Session:
     """Get database session (for dependency injection)"""
     db_engine, db_session_local = _get_engine()
     
     if db_engine is None or db_session_local is None:
-        config = load_config()
-        raise ConnectionError(
-            f"Database engine not initialized.\n\n"
-            f"Current DATABASE_URL: {config.get('database_url', 'Not set')}\n\n"
-            f"Please check your DATABASE_URL configuration:\n"
-            f"- For Streamlit Cloud: Verify secrets are set correctly\n"
-            f"- For local development: Create a .env file with DATABASE_URL\n\n"
-            f"See DATABASE_SETUP.md for setup instructions."
-        )
+        raise _engine_not_initialized_error()
     
     db = db_session_local()
     try:
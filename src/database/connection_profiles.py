@@ -0,0 +1,171 @@
+"""
+Connection profiles
+
+How the app's engines pool connections depends on what DATABASE_URL
+points at (DB_CONNECTION_PROFILE, default ``auto``):
+
+- ``session_pooler``: Supabase Session Pooler (Supavisor session mode,
+  port 5432). Every app-side pooled connection pins one pooler client
+  slot, so each replica keeps a small QueuePool. LIFO checkout keeps the
+  few hot connections busy and lets the rest idle out; ``pool_recycle``
+  replaces connections before the pooler's idle timeout drops them. With
+  a recycle time safely below that timeout, DB_POOL_PRE_PING=false saves
+  the pre-ping round trip on every checkout.
+- ``transaction_pooler``: Supabase Transaction Pooler / PgBouncer in
+  transaction mode (port 6543). The pooler multiplexes many clients onto
+  few server connections, so the app keeps none of its own (``NullPool``)
+  and never relies on session state: server-side prepared statements are
+  disabled (asyncpg's statement cache; psycopg2 doesn't prepare) and
+  LISTEN/NOTIFY is replaced by polling (src/services/invalidation_bus.py).
+  Capacity is bounded by the pooler, not by the app.
+- ``direct``: straight to Postgres (``db.<project>.supabase.co``, local
+  servers). Server connections are the scarce resource, so pools are
+  smaller and recycled less often.
+
+``auto`` picks ``transaction_pooler`` for port 6543, ``direct`` for
+Supabase ``db.*`` hosts, local sockets and localhost, and
+``session_pooler`` otherwise. DB_POOL_* variables override single fields
+of the chosen profile.
+"""
+
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+# Transaction-mode pooler port (Supabase / PgBouncer convention)
+TRANSACTION_POOLER_PORT = 6543
+
+PROFILE_NAMES = ('session_pooler', 'transaction_pooler', 'direct')
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """Engine pool settings for one way of reaching the database"""
+    name: str
+    null_pool: bool          # no app-side pool; every session opens a connection
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float      # seconds to wait for a free connection before failing
+    pool_recycle: int        # replace connections older than this many seconds (-1: never)
+    pool_use_lifo: bool
+    pool_pre_ping: bool
+    prepared_statements: bool
+
+
+PROFILES = {
+    'session_pooler': ConnectionProfile(
+        name='session_pooler',
+        null_pool=False,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=10.0,
+        pool_recycle=300,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        prepared_statements=True,
+    ),
+    'transaction_pooler': ConnectionProfile(
+        name='transaction_pooler',
+        null_pool=True,
+        pool_size=0,
+        max_overflow=0,
+        pool_timeout=10.0,
+        pool_recycle=-1,
+        pool_use_lifo=False,
+        pool_pre_ping=False,  # every checkout is a fresh connection
+        prepared_statements=False,
+    ),
+    'direct': ConnectionProfile(
+        name='direct',
+        null_pool=False,
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=10.0,
+        pool_recycle=1800,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        prepared_statements=True,
+    ),
+}
+
+
+@lru_cache(maxsize=16)
+def detect_profile(database_url: Optional[str]) -> str:
+    """Profile name ``auto`` resolves to for a URL"""
+    if not database_url:
+        return 'session_pooler'
+    url = make_url(database_url)
+    if url.get_backend_name() != 'postgresql':
+        return 'direct'
+    if url.port == TRANSACTION_POOLER_PORT:
+        return 'transaction_pooler'
+    host = url.host or url.query.get('host') or ''
+    if not host or host.startswith('/') or host in ('localhost', '127.0.0.1') or host.startswith('db.'):
+        return 'direct'
+    return 'session_pooler'
+
+
+def resolve_profile(database_url: Optional[str], config=None) -> ConnectionProfile:
+    """
+    The connection profile for a URL, with DB_POOL_* overrides applied
+
+    Args:
+        database_url: URL the engine connects to
+        config: Settings (defaults to get_settings())
+    """
+    if config is None:
+        from src.config.settings import get_settings
+        config = get_settings()
+    name = config.db_connection_profile
+    if name == 'auto':
+        name = detect_profile(database_url)
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown DB_CONNECTION_PROFILE '{name}'; choose auto or one of {', '.join(PROFILE_NAMES)}"
+        )
+    overrides = {
+        field: value
+        for field, value in (
+            ('pool_size', config.db_pool_size),
+            ('max_overflow', config.db_max_overflow),
+            ('pool_timeout', config.db_pool_timeout),
+            ('pool_recycle', config.db_pool_recycle_seconds),
+            ('pool_use_lifo', config.db_pool_use_lifo),
+            ('pool_pre_ping', config.db_pool_pre_ping),
+        )
+        if value is not None
+    }
+    return replace(PROFILES[name], **overrides)
+
+
+def engine_options(profile: ConnectionProfile) -> dict:
+    """Pool keyword arguments for create_engine()/create_async_engine()"""
+    if profile.null_pool:
+        options = {'poolclass': NullPool}
+    else:
+        options = {
+            'pool_size': profile.pool_size,
+            'max_overflow': profile.max_overflow,
+            'pool_timeout': profile.pool_timeout,
+            'pool_recycle': profile.pool_recycle,
+            'pool_use_lifo': profile.pool_use_lifo,
+        }
+    options['pool_pre_ping'] = profile.pool_pre_ping
+    return options
+
+
+def asyncpg_connect_args(profile: ConnectionProfile) -> dict:
+    """asyncpg connect() arguments that turn off prepared statements for transaction poolers"""
+    if profile.prepared_statements:
+        return {}
+    return {
+        # No asyncpg statement cache, no SQLAlchemy prepared statement cache,
+        # and unique names so a reused server connection never clashes
+        'statement_cache_size': 0,
+        'prepared_statement_cache_size': 0,
+        'prepared_statement_name_func': lambda: f"__asyncpg_{uuid4()}__",
+    }
@@ -0,0 +1,252 @@
+"""
+SQL query instrumentation
+
+Engine event listeners record every statement (fingerprint, duration,
+row count and the page script that issued it) into a bounded in-memory
+ring buffer. Sessions also record how long they waited to check out a
+connection (pool wait, plus connect time when the pool had none idle).
+The Admin Panel "Performance" tab summarises both buffers.
+"""
+
+import math
+import re
+import time
+from collections import deque, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from src.utils.script_run import current_script_run
+
+# Keep the most recent queries only; older records are dropped
+DEFAULT_BUFFER_SIZE = 5000
+
+_START_TIMES_KEY = "query_start_times"
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    """A single executed statement"""
+    fingerprint: str
+    statement: str
+    duration_ms: float
+    row_count: Optional[int]
+    page: str
+    run_id: Optional[int]
+    engine: str
+    executed_at: datetime
+
+
+@dataclass(frozen=True)
+class CheckoutRecord:
+    """Time one session waited for its connection"""
+    engine: str
+    wait_ms: float
+    page: str
+    checked_out_at: datetime
+
+
+_records: deque = deque(maxlen=DEFAULT_BUFFER_SIZE)
+_checkouts: deque = deque(maxlen=DEFAULT_BUFFER_SIZE)
+
+
+def set_buffer_size(size: int):
+    """Resize the ring buffers, keeping the most recent records"""
+    global _records, _checkouts
+    _records = deque(_records, maxlen=max(int(size), 1))
+    _checkouts = deque(_checkouts, maxlen=max(int(size), 1))
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\([^)]+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """
+    Normalise a SQL statement so executions with different parameters group together
+
+    Literals and bind parameters become ``?`` and IN-lists collapse to ``(...)``.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _make_after_cursor_execute(engine_name: str):
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get(_START_TIMES_KEY)
+        if not start_times:
+            return
+        duration_ms = (time.perf_counter() - start_times.pop()) * 1000
+
+        row_count = getattr(cursor, "rowcount", -1)
+        run = current_script_run()
+        _records.append(QueryRecord(
+            fingerprint=fingerprint(statement),
+            statement=statement,
+            duration_ms=duration_ms,
+            row_count=row_count if row_count is not None and row_count >= 0 else None,
+            page=run.page if run else "(background)",
+            run_id=run.run_id if run else None,
+            engine=engine_name,
+            executed_at=datetime.utcnow(),
+        ))
+
+    return _after_cursor_execute
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None:
+        start_times = conn.info.get(_START_TIMES_KEY)
+        if start_times:
+            start_times.pop()
+
+
+def instrument_engine(engine, engine_name: str = "primary"):
+    """Attach query recording listeners to an engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _make_after_cursor_execute(engine_name))
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def get_query_records() -> List[QueryRecord]:
+    """Snapshot of the ring buffer, oldest first"""
+    return list(_records)
+
+
+def clear_query_records():
+    """Empty the query and checkout ring buffers"""
+    _records.clear()
+    _checkouts.clear()
+
+
+def record_checkout(engine_name: str, wait_ms: float):
+    """Record how long a session waited for its connection"""
+    run = current_script_run()
+    _checkouts.append(CheckoutRecord(
+        engine=engine_name,
+        wait_ms=wait_ms,
+        page=run.page if run else "(background)",
+        checked_out_at=datetime.utcnow(),
+    ))
+
+
+def get_checkout_records() -> List[CheckoutRecord]:
+    """Snapshot of the checkout ring buffer, oldest first"""
+    return list(_checkouts)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def fingerprint_stats(records: Optional[List[QueryRecord]] = None) -> List[Dict]:
+    """
+    Latency percentiles per statement fingerprint
+
+    Returns:
+        List of dicts sorted by total time spent, slowest first
+    """
+    records = get_query_records() if records is None else records
+    grouped = defaultdict(list)
+    for record in records:
+        grouped[record.fingerprint].append(record)
+
+    stats = []
+    for fp, group in grouped.items():
+        durations = sorted(r.duration_ms for r in group)
+        rows = [r.row_count for r in group if r.row_count is not None]
+        stats.append({
+            'fingerprint': fp,
+            'calls': len(group),
+            'p50_ms': _percentile(durations, 50),
+            'p95_ms': _percentile(durations, 95),
+            'p99_ms': _percentile(durations, 99),
+            'max_ms': durations[-1],
+            'total_ms': sum(durations),
+            'avg_rows': sum(rows) / len(rows) if rows else None,
+        })
+    stats.sort(key=lambda s: s['total_ms'], reverse=True)
+    return stats
+
+
+def page_stats(records: Optional[List[QueryRecord]] = None) -> List[Dict]:
+    """
+    Query counts and time per page rerun
+
+    Returns:
+        One dict per page with rerun count, average/max queries per rerun
+        and average database time per rerun
+    """
+    records = get_query_records() if records is None else records
+    runs = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+    for record in records:
+        run = runs[record.page][record.run_id]
+        run[0] += 1
+        run[1] += record.duration_ms
+
+    stats = []
+    for page, page_runs in runs.items():
+        counts = [r[0] for r in page_runs.values()]
+        times = [r[1] for r in page_runs.values()]
+        stats.append({
+            'page': page,
+            'reruns': len(page_runs),
+            'queries': sum(counts),
+            'avg_queries_per_rerun': sum(counts) / len(counts),
+            'max_queries_per_rerun': max(counts),
+            'avg_db_ms_per_rerun': sum(times) / len(times),
+        })
+    stats.sort(key=lambda s: s['avg_db_ms_per_rerun'], reverse=True)
+    return stats
+
+
+def slow_queries(threshold_ms: float, records: Optional[List[QueryRecord]] = None) -> List[QueryRecord]:
+    """Records at or above the threshold, most recent first"""
+    records = get_query_records() if records is None else records
+    return [r for r in reversed(records) if r.duration_ms >= threshold_ms]
+
+
+def checkout_stats(records: Optional[List[CheckoutRecord]] = None) -> List[Dict]:
+    """
+    Connection checkout wait percentiles per engine
+
+    Returns:
+        List of dicts sorted by engine name
+    """
+    records = get_checkout_records() if records is None else records
+    grouped = defaultdict(list)
+    for record in records:
+        grouped[record.engine].append(record.wait_ms)
+
+    stats = []
+    for engine_name, waits in sorted(grouped.items()):
+        waits.sort()
+        stats.append({
+            'engine': engine_name,
+            'checkouts': len(waits),
+            'p50_ms': _percentile(waits, 50),
+            'p95_ms': _percentile(waits, 95),
+            'p99_ms': _percentile(waits, 99),
+            'max_ms': waits[-1],
+        })
+    return stats
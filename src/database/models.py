@@ -2,9 +2,9 @@
 SQLAlchemy database models
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, Date, Time
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, Date, Time, Index, FetchedValue, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 
 Base = declarative_base()
@@ -20,6 +20,7 @@ class User(Base):
     role = Column(String(50), nullable=False, index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
     
     # Relationships
@@ -32,7 +33,8 @@ class Student(Base):
     __tablename__ = "students"
     
     student_id = Column(Integer, primary_key=True, index=True)
-    admission_number = Column(String(50), unique=True, index=True)
+    # Assigned on INSERT (see src/database/admission_numbers.py)
+    admission_number = Column(String(50), unique=True, index=True, server_default=FetchedValue())
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     preferred_name = Column(String(100), nullable=True)
@@ -51,17 +53,24 @@ class Student(Base):
     )
     registration_step = Column(Integer, default=0)  # highest completed step (0–6)
 
-    # JSON blobs for wizard steps beyond basic student fields
-    contact_info = Column(JSON, nullable=True)      # guardians, address, emergency contacts
-    academic_info = Column(JSON, nullable=True)     # grade/section, teachers, schedule prefs
-    medical_info = Column(JSON, nullable=True)      # conditions, allergies, medications
-    learning_profile = Column(JSON, nullable=True)  # diagnosis, impact areas, documents
+    # JSON blobs for wizard steps beyond basic student fields.
+    # Deferred: not loaded by list queries; detail views undefer the groups
+    # they render (see src/services/student_service.student_details).
+    contact_info = deferred(Column(JSON, nullable=True), group="contact")       # guardians, address, emergency contacts
+    academic_info = deferred(Column(JSON, nullable=True), group="academic")     # grade/section, teachers, schedule prefs
+    medical_info = deferred(Column(JSON, nullable=True), group="medical")       # conditions, allergies, medications
+    learning_profile = deferred(Column(JSON, nullable=True), group="profile")   # diagnosis, impact areas, documents
 
     # Approval workflow
-    internal_notes = Column(Text, nullable=True)  # Staff/department comments (not visible to parents)
-    parent_notes = Column(Text, nullable=True)    # Comments visible to parents/guardians
+    internal_notes = deferred(Column(Text, nullable=True), group="notes")  # Staff/department comments (not visible to parents)
+    parent_notes = deferred(Column(Text, nullable=True), group="notes")    # Comments visible to parents/guardians
     reviewed_by = Column(Integer, ForeignKey("users.user_id"), nullable=True)
     reviewed_at = Column(DateTime, nullable=True)
+    # Reviewer lease from "claim next" (src/services/student_service.claim_next_registration)
+    claimed_by = Column(Integer, ForeignKey("users.user_id"), nullable=True)
+    claimed_until = Column(DateTime, nullable=True)
+    # Optimistic concurrency: bumped by every update, checked by reviews
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     created_by = Column(Integer, ForeignKey("users.user_id"))
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -70,11 +79,38 @@ class Student(Base):
     # Relationships
     created_by_user = relationship("User", back_populates="created_students", foreign_keys=[created_by])
     reviewed_by_user = relationship("User", foreign_keys=[reviewed_by])
+    claimed_by_user = relationship("User", foreign_keys=[claimed_by])
     learning_difficulties = relationship("LearningDifficulty", back_populates="student")
     ieps = relationship("IEP", back_populates="student")
     sessions = relationship("Session", back_populates="student")
     assessments = relationship("Assessment", back_populates="student")
 
+    __table_args__ = (
+        # Roster sort order / keyset pagination cursor
+        Index("idx_students_roster", "first_name", "last_name", "student_id"),
+        # "Claim next registration": oldest pending first, and a reviewer's own claim
+        Index(
+            "idx_students_review_queue", "created_at", "student_id",
+            postgresql_where=text("registration_status = 'pending_review'"),
+            sqlite_where=text("registration_status = 'pending_review'"),
+        ),
+        Index(
+            "idx_students_claimed_by", "claimed_by",
+            postgresql_where=text("claimed_by IS NOT NULL"),
+            sqlite_where=text("claimed_by IS NOT NULL"),
+        ),
+    )
+    # Fetch the trigger-assigned admission number in the INSERT's RETURNING;
+    # ORM flushes check and bump version like the Core updates in student_service
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version}
+
+class AdmissionCounter(Base):
+    """Last admission number issued per calendar year (SQLite; PostgreSQL uses a sequence per year)"""
+    __tablename__ = "admission_counters"
+
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    last_number = Column(Integer, nullable=False)
+
 class LearningDifficulty(Base):
     """Learning difficulty model"""
     __tablename__ = "learning_difficulties"
@@ -182,3 +218,7 @@ class Assessment(Base):
     # Relationships
     student = relationship("Student", back_populates="assessments")
 
+
+# Imported last: registers the admission number hook and the SQLite search index on Student
+from src.database import admission_numbers  # noqa: E402
+from src.database import search_index  # noqa: E402
@@ -0,0 +1,249 @@
+"""
+Connection pool warm-up
+
+Pools open connections lazily, so after a deploy or a Supabase wake-up the
+first users each pay a TLS handshake and authentication. A daemon thread
+per process keeps DB_POOL_WARM_CONNECTIONS connections open in each
+engine's pool instead:
+
+- startup: as soon as an engine is created, the connections are opened
+  concurrently in the background.
+- keepalive: every DB_POOL_KEEPALIVE_SECONDS the idle connections are
+  checked out and pinged, so pooler idle timeouts don't drop them and
+  connections past ``pool_recycle`` are replaced here rather than on a
+  user's checkout.
+- refill: when a circuit breaker closes again after an outage (or the
+  engines are rebuilt), the pool is refilled straight away.
+
+Connections the app is using count towards the target, so the warmer never
+competes with sessions for pool slots. Pools without idle connections
+(``NullPool``, the transaction pooler profile) are not warmed. Warm-up
+times are reported in the diagnostics snapshot.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.exc import OperationalError
+
+from src.config.settings import get_settings
+from src.database.circuit_breaker import CLOSED
+
+# How often the thread checks for breaker recovery between keepalives
+_TICK_SECONDS = 2.0
+
+
+def _open_and_ping(db_engine):
+    connection = db_engine.connect()
+    try:
+        connection.exec_driver_sql("SELECT 1")
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+
+def warm_engine(db_engine, target: int) -> int:
+    """
+    Make sure ``target`` connections are open in an engine's pool
+
+    Checks out (opening where needed) and pings enough connections to
+    bring the pool to ``target``, concurrently, then returns them.
+
+    Returns:
+        Connections open in the pool afterwards (idle and in use)
+    """
+    pool = db_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return 0
+    needed = min(target, pool.size()) - pool.checkedout()
+    if needed <= 0:
+        return pool.checkedout()
+    connections = []
+    errors = []
+    with ThreadPoolExecutor(max_workers=needed, thread_name_prefix="seims-pool-warmup") as executor:
+        for future in [executor.submit(_open_and_ping, db_engine) for _ in range(needed)]:
+            try:
+                connections.append(future.result())
+            except Exception as e:
+                errors.append(e)
+    for connection in connections:
+        connection.close()
+    if errors:
+        raise errors[0]
+    return pool.checkedin() + pool.checkedout()
+
+
+class PoolWarmer:
+    """Per-process thread that pre-opens and keeps alive pooled connections"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refill_requested = True
+        self._breaker_states: Dict[str, str] = {}
+        self._next_keepalive = 0.0
+        self._failures = 0
+        self._stats = {
+            'state': 'idle',
+            'target': 0,
+            'connections': 0,
+            'startup_ms': None,
+            'last_warm_ms': None,
+            'last_warm_at': None,
+            'last_reason': None,
+            'refills': 0,
+            'keepalives': 0,
+            'failures': 0,
+            'last_error': None,
+        }
+
+    def start(self):
+        """Start the background thread, or warm right away if it is running"""
+        with self._lock:
+            self._refill_requested = True
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="seims-pool-warmer", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        """Ask the background thread to exit"""
+        self._stop.set()
+        self._wake.set()
+
+    def snapshot(self) -> dict:
+        """Warm-up state for diagnostics"""
+        with self._lock:
+            result = dict(self._stats)
+            result['running'] = self._thread is not None and self._thread.is_alive()
+            return result
+
+    def _engines(self) -> dict:
+        from src.database.connection import _get_engine, _get_read_engine
+        engines = {}
+        db_engine, _ = _get_engine()
+        if db_engine is not None:
+            engines['primary'] = db_engine
+            read_engine, _ = _get_read_engine()
+            if read_engine is not db_engine:
+                engines['replica'] = read_engine
+        return engines
+
+    def warm(self, reason: str) -> int:
+        """
+        Warm every engine's pool now
+
+        Args:
+            reason: 'startup', 'refill' or 'keepalive' (for diagnostics)
+
+        Returns:
+            Connections open across all warmed pools
+        """
+        from src.database.connection import _is_transient_error, get_circuit_breaker
+        target = get_settings().db_pool_warm_connections
+        engines = {
+            name: db_engine for name, db_engine in self._engines().items()
+            if hasattr(db_engine.pool, "checkedout")
+        }
+        if not engines:
+            with self._lock:
+                self._stats['state'] = 'not pooled'
+            return 0
+        started = time.perf_counter()
+        total = 0
+        error = None
+        for name, db_engine in engines.items():
+            try:
+                total += warm_engine(db_engine, target)
+            except OperationalError as e:
+                if _is_transient_error(e):
+                    get_circuit_breaker(name).record_failure(e)
+                error = e
+            except Exception as e:
+                error = e
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        with self._lock:
+            stats = self._stats
+            stats['target'] = target
+            stats['last_reason'] = reason
+            if error is not None:
+                message = str(error).strip()
+                stats['state'] = 'failed'
+                stats['failures'] += 1
+                stats['last_error'] = message.splitlines()[0][:300] if message else type(error).__name__
+                self._failures += 1
+                return total
+            self._failures = 0
+            stats['state'] = 'warm'
+            stats['connections'] = total
+            stats['last_warm_ms'] = elapsed_ms
+            stats['last_warm_at'] = datetime.utcnow().isoformat(timespec='seconds')
+            if stats['startup_ms'] is None:
+                stats['startup_ms'] = elapsed_ms
+            elif reason == 'refill':
+                stats['refills'] += 1
+            else:
+                stats['keepalives'] += 1
+        return total
+
+    def _breakers_recovered(self) -> bool:
+        """Whether any breaker closed since the last tick; False while one is not closed"""
+        from src.database.connection import get_circuit_breaker_states
+        states = {name: state['state'] for name, state in get_circuit_breaker_states().items()}
+        recovered = any(
+            state == CLOSED and self._breaker_states.get(name, CLOSED) != CLOSED
+            for name, state in states.items()
+        )
+        self._breaker_states = states
+        if any(state != CLOSED for state in states.values()):
+            with self._lock:
+                self._stats['state'] = 'waiting for database'
+            return False
+        return recovered
+
+    def _run(self):
+        while not self._stop.is_set():
+            config = get_settings()
+            if config.db_pool_warm_connections > 0:
+                recovered = self._breakers_recovered()
+                all_closed = all(state == CLOSED for state in self._breaker_states.values())
+                with self._lock:
+                    refill = self._refill_requested
+                    self._refill_requested = False
+                now = time.monotonic()
+                if all_closed and (refill or recovered or self._failures or now >= self._next_keepalive):
+                    if self._stats['startup_ms'] is None:
+                        reason = 'startup'
+                    elif refill or recovered or self._failures:
+                        reason = 'refill'
+                    else:
+                        reason = 'keepalive'
+                    self.warm(reason)
+                    self._next_keepalive = now + config.db_pool_keepalive_seconds
+                    if self._failures:
+                        # Back off while warm-ups keep failing
+                        self._stop.wait(min(2 ** self._failures, config.db_pool_keepalive_seconds))
+            self._wake.wait(_TICK_SECONDS)
+            self._wake.clear()
+
+
+_warmer: Optional[PoolWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_pool_warmer() -> PoolWarmer:
+    """Get the process-wide pool warmer (not started)"""
+    global _warmer
+    if _warmer is None:
+        with _warmer_lock:
+            if _warmer is None:
+                _warmer = PoolWarmer()
+    return _warmer
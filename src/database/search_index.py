@@ -0,0 +1,69 @@
+"""
+SQLite full-text index for student search
+
+PostgreSQL gets idx_students_search from database_setup.sql. SQLite (local
+and test runs) has no setup script, so the FTS5 table and the triggers that
+keep it in sync with ``students`` are created together with the students
+table by ``Base.metadata.create_all``. Databases created before this hook
+existed can run ``create_sqlite_search_index`` once; until then search
+falls back to a LIKE scan (src/services/search_service.py).
+"""
+
+from sqlalchemy import event, text
+
+from src.database.models import Student
+
+SQLITE_FTS_TABLE = "students_fts"
+
+# FTS5 table keyed by student_id (rowid)
+SQLITE_FTS_COLUMNS = "first_name, last_name, admission_number, preferred_name, guardian_name, grade"
+_SQLITE_FTS_VALUES = (
+    "{row}.first_name, {row}.last_name, {row}.admission_number, {row}.preferred_name, "
+    "json_extract({row}.contact_info, '$.primary_guardian.full_name'), {row}.grade"
+)
+_SQLITE_SETUP = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5({SQLITE_FTS_COLUMNS})",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE} (rowid, {SQLITE_FTS_COLUMNS})
+        VALUES (new.student_id, {_SQLITE_FTS_VALUES.format(row='new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE ON students BEGIN
+        DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = old.student_id;
+        INSERT INTO {SQLITE_FTS_TABLE} (rowid, {SQLITE_FTS_COLUMNS})
+        VALUES (new.student_id, {_SQLITE_FTS_VALUES.format(row='new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+        DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = old.student_id;
+    END""",
+]
+
+
+def sqlite_search_index_exists(connection) -> bool:
+    """Whether the FTS5 table has been created in this SQLite database"""
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': SQLITE_FTS_TABLE},
+    ).first() is not None
+
+
+def create_sqlite_search_index(connection):
+    """
+    Create the FTS5 table and its sync triggers, indexing existing students
+
+    Args:
+        connection: Connection in the caller's (committing) transaction
+    """
+    if sqlite_search_index_exists(connection):
+        return
+    for statement in _SQLITE_SETUP:
+        connection.execute(text(statement))
+    connection.execute(text(
+        f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, {SQLITE_FTS_COLUMNS}) "
+        f"SELECT students.student_id, {_SQLITE_FTS_VALUES.format(row='students')} FROM students"
+    ))
+
+
+@event.listens_for(Student.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        create_sqlite_search_index(connection)
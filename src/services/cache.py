@@ -0,0 +1,463 @@
+"""
+Process-wide read-model cache
+
+Hot read models (dashboard counters, roster pages, approval queue, user and
+teacher lists) are cached in memory with LRU + TTL eviction and an
+approximate memory bound. Every entry is tagged with what it was built
+from: whole tables (``students``), columns (``students.status``) or single
+rows (``students#42``, ``students.medical_info#42``). When a session
+commits, the rows and columns it changed are collected by SQLAlchemy
+events and only the entries whose tags they touch are dropped:
+
+- ORM unit-of-work writes are captured in ``after_flush`` (column-level,
+  from attribute history).
+- ORM-enabled bulk ``update()`` / ``delete()`` / ``insert()`` statements
+  are captured in ``do_orm_execute`` (table-level).
+- Raw SQL writes must call ``touch(session, 'table', ...)``.
+
+A writer that knows exactly how its change affects a cached value can
+register a ``rewrite_on_commit`` so the entry is updated in place rather
+than dropped and reloaded.
+
+Other app processes are told about committed changes through the
+invalidation bus (src/services/invalidation_bus.py).
+
+Loaders read from the primary, not the read replica: invalidation happens
+when the primary commits, and a lagging replica would hand the loader the
+rows from before the write, to be cached until the next change or TTL.
+
+Cached values are shared between reruns and users; treat them as read-only.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from src.config.settings import get_settings, on_settings_reload
+
+# A change or tag: (table, column, primary key); None means "any"
+Change = Tuple[str, Optional[str], Optional[str]]
+
+_CHANGES_KEY = 'cache_pending_changes'
+_REWRITES_KEY = 'cache_pending_rewrites'
+
+
+def parse_tag(tag: str) -> Change:
+    """
+    Parse a cache tag
+
+    'students' -> ('students', None, None)
+    'students.status' -> ('students', 'status', None)
+    'students#42' -> ('students', None, '42')
+    """
+    tag, _, pk = tag.partition('#')
+    table, _, column = tag.partition('.')
+    return table, column or None, pk or None
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep size in bytes of a cached value"""
+    size = sys.getsizeof(value)
+    if _depth >= 8:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, _depth + 1) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += _estimate_size(vars(value), _depth + 1)
+    return size
+
+
+def _rewritten_size(old_value: Any, old_size: int, new_value: Any) -> int:
+    """Size of a rewritten value; lists of similar rows are scaled rather than re-walked under the lock"""
+    if isinstance(old_value, list) and isinstance(new_value, list) and old_value:
+        items = old_size - sys.getsizeof(old_value)
+        return sys.getsizeof(new_value) + items * len(new_value) // len(old_value)
+    return _estimate_size(new_value)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    tags: FrozenSet[Change]
+    expires_at: float
+    size: int
+
+
+@dataclass
+class CacheStats:
+    """Counters for tuning cache sizes"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0       # dropped to stay within entry/memory bounds
+    expirations: int = 0     # dropped because the TTL elapsed
+    invalidations: int = 0   # dropped because a write touched their tags
+    stale_loads: int = 0     # loads not stored because a write raced them
+    rewrites: int = 0        # updated in place by the writer instead of dropped
+    entries: int = 0
+    bytes: int = 0
+    max_entries: int = 0
+    max_bytes: int = 0
+    by_namespace: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache with table/column tag invalidation"""
+
+    def __init__(self, max_entries: int, max_bytes: int, default_ttl: float):
+        self.max_entries = max(int(max_entries), 1)
+        self.max_bytes = max(int(max_bytes), 1)
+        self.default_ttl = default_ttl
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._by_table: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._table_versions: Dict[str, int] = defaultdict(int)
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._namespace_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    @staticmethod
+    def _namespace(key: Hashable) -> str:
+        return str(key[0] if isinstance(key, tuple) and key else key)
+
+    def _count(self, key: Hashable, counter: str):
+        setattr(self._stats, counter, getattr(self._stats, counter) + 1)
+        self._namespace_stats[self._namespace(key)][counter] += 1
+
+    def _remove(self, key: Hashable, counter: Optional[str] = None):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for table, _, _ in entry.tags:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+        if counter:
+            self._count(key, counter)
+
+    def _enforce_bounds(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest, 'evictions')
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        tags: Iterable[str],
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for ``key``, calling ``loader()`` on a miss
+
+        Args:
+            key: Hashable cache key; tuples are grouped in stats by their first item
+            tags: 'table', 'table.column' or 'table#pk' names the value is derived from
+            loader: Builds the value (runs outside the cache lock)
+            ttl: Seconds to keep the value (defaults to the cache TTL)
+        """
+        hit, value, pending = self._lookup(key, tags)
+        if hit:
+            return value
+        return self._store(key, pending, loader(), ttl)
+
+    async def get_or_load_async(
+        self,
+        key: Hashable,
+        tags: Iterable[str],
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """get_or_load with an async loader (awaited outside the cache lock)"""
+        hit, value, pending = self._lookup(key, tags)
+        if hit:
+            return value
+        return self._store(key, pending, await loader(), ttl)
+
+    def _lookup(self, key: Hashable, tags: Iterable[str]):
+        """(True, value, None) on a hit; (False, None, (tags, table versions)) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._entries.move_to_end(key)
+                    self._count(key, 'hits')
+                    return True, entry.value, None
+                self._remove(key, 'expirations')
+            self._count(key, 'misses')
+            parsed_tags = frozenset(parse_tag(tag) for tag in tags)
+            versions = {tag[0]: self._table_versions[tag[0]] for tag in parsed_tags}
+        return False, None, (parsed_tags, versions)
+
+    def _store(self, key: Hashable, pending, value: Any, ttl: Optional[float]) -> Any:
+        """Cache a freshly loaded value unless a write raced the load"""
+        parsed_tags, versions = pending
+        size = _estimate_size(value)
+        with self._lock:
+            # Don't cache a result that a concurrent write has already invalidated
+            if any(self._table_versions[table] != version for table, version in versions.items()):
+                self._count(key, 'stale_loads')
+                return value
+            if size > self.max_bytes:
+                return value
+            self._remove(key)
+            ttl = self.default_ttl if ttl is None else ttl
+            self._entries[key] = _Entry(value, parsed_tags, time.monotonic() + ttl, size)
+            self._bytes += size
+            for table, _, _ in parsed_tags:
+                self._by_table[table].add(key)
+            self._enforce_bounds()
+        return value
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        with self._lock:
+            self._remove(key, 'invalidations')
+
+    def invalidate_changes(
+        self,
+        changes: Iterable[Change],
+        rewrites: Optional[Dict[Hashable, Callable[[Any], Any]]] = None,
+    ):
+        """
+        Drop every entry whose tags overlap the given changes
+
+        A change and a tag overlap when they name the same table and agree on
+        column and primary key wherever both specify one, e.g. a change to
+        ('students', 'status', '42') drops entries tagged 'students',
+        'students.status' or 'students#42', but not 'students.grade'.
+
+        Args:
+            changes: (table, column, pk) changes
+            rewrites: Cache key -> function from the old value to the new one,
+                for entries the writer can bring up to date itself; they are
+                replaced instead of dropped (only if still cached)
+        """
+        rewrites = rewrites or {}
+        rewritten = set()
+        # table -> primary key (None = any row) -> changed columns (None = any column)
+        by_table: Dict[str, Dict[Optional[str], Set[Optional[str]]]] = defaultdict(lambda: defaultdict(set))
+        for table, column, pk in changes:
+            by_table[table][pk].add(column)
+
+        with self._lock:
+            for table, columns_by_pk in by_table.items():
+                self._table_versions[table] += 1
+                any_row = columns_by_pk.get(None, set())
+                all_columns = set().union(*columns_by_pk.values())
+
+                def overlaps(tag: Change) -> bool:
+                    _, column, pk = tag
+                    changed = all_columns if pk is None else any_row | columns_by_pk.get(pk, set())
+                    return bool(changed) and (column is None or None in changed or column in changed)
+
+                for key in list(self._by_table.get(table, ())):
+                    entry = self._entries.get(key)
+                    if entry is None or key in rewritten or not any(tag[0] == table and overlaps(tag) for tag in entry.tags):
+                        continue
+                    if key in rewrites:
+                        value = rewrites[key](entry.value)
+                        size = _rewritten_size(entry.value, entry.size, value)
+                        self._bytes += size - entry.size
+                        entry.value, entry.size = value, size
+                        rewritten.add(key)
+                        self._count(key, 'rewrites')
+                    else:
+                        self._remove(key, 'invalidations')
+
+    def invalidate_tables(self, *tables: str):
+        """Drop every entry derived from any of these tables"""
+        self.invalidate_changes((table, None, None) for table in tables)
+
+    def clear(self):
+        """Drop everything (not counted as evictions)"""
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def resize(self, max_entries: int, max_bytes: int, default_ttl: float):
+        """Apply new bounds, evicting as needed"""
+        with self._lock:
+            self.max_entries = max(int(max_entries), 1)
+            self.max_bytes = max(int(max_bytes), 1)
+            self.default_ttl = default_ttl
+            self._enforce_bounds()
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the counters"""
+        with self._lock:
+            snapshot = CacheStats(**{
+                name: getattr(self._stats, name)
+                for name in ('hits', 'misses', 'evictions', 'expirations', 'invalidations', 'stale_loads', 'rewrites')
+            })
+            snapshot.entries = len(self._entries)
+            snapshot.bytes = self._bytes
+            snapshot.max_entries = self.max_entries
+            snapshot.max_bytes = self.max_bytes
+            snapshot.by_namespace = {ns: dict(counts) for ns, counts in self._namespace_stats.items()}
+            return snapshot
+
+    def reset_stats(self):
+        """Zero the counters"""
+        with self._lock:
+            self._stats = CacheStats()
+            self._namespace_stats.clear()
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = get_settings()
+                _cache = ResultCache(
+                    max_entries=config.cache_max_entries,
+                    max_bytes=config.cache_max_bytes,
+                    default_ttl=config.cache_ttl_seconds,
+                )
+                # Start hearing about other processes' writes
+                invalidation_bus.get_invalidation_bus()
+    return _cache
+
+
+def _on_settings_reload(old, new):
+    if _cache is not None:
+        _cache.resize(new.cache_max_entries, new.cache_max_bytes, new.cache_ttl_seconds)
+
+
+on_settings_reload(_on_settings_reload)
+
+
+def cached(key: Hashable, tags: Iterable[str], loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+    """Shortcut for ``get_result_cache().get_or_load(...)``"""
+    return get_result_cache().get_or_load(key, tags, loader, ttl=ttl)
+
+
+async def cached_async(
+    key: Hashable,
+    tags: Iterable[str],
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[float] = None,
+) -> Any:
+    """Shortcut for ``get_result_cache().get_or_load_async(...)``; shares entries with ``cached``"""
+    return await get_result_cache().get_or_load_async(key, tags, loader, ttl=ttl)
+
+
+# ---------------------------------------------------------------------------
+# Write tracking
+# ---------------------------------------------------------------------------
+
+def _pending_changes(session) -> Set[Change]:
+    return session.info.setdefault(_CHANGES_KEY, set())
+
+
+def pending_changes(session) -> Set[Change]:
+    """Changes ``session`` has made so far in its current transaction"""
+    return set(session.info.get(_CHANGES_KEY, ()))
+
+
+def rewrite_on_commit(session, key: Hashable, rewrite: Callable[[Any], Any]):
+    """
+    Update cached ``key`` in place when ``session`` commits, instead of dropping it
+
+    For writers that already know how their change affects a cached read
+    model (e.g. from an UPDATE ... RETURNING); the next reader gets the
+    rewritten value without a reload. ``rewrite`` receives the cached value
+    and must return a new one rather than mutate it. Entries that are no
+    longer cached, or are invalidated by another writer first, are simply
+    reloaded as usual.
+    """
+    session.info.setdefault(_REWRITES_KEY, {})[key] = rewrite
+
+
+def touch(session, *tags: str):
+    """
+    Mark tables/columns as changed by ``session``
+
+    For writes the ORM cannot see (``text()`` SQL, Core statements on
+    tables); cache entries are invalidated when the session commits. Tags
+    use the same 'table', 'table.column', 'table#pk' forms as cache tags.
+    """
+    _pending_changes(session).update(parse_tag(tag) for tag in tags)
+
+
+def _primary_key(state) -> Optional[str]:
+    pk = state.mapper.primary_key_from_instance(state.obj())
+    if any(value is None for value in pk):
+        return None
+    return ','.join(str(value) for value in pk)
+
+
+def _flushed_changes(session) -> Set[Change]:
+    changes = set()
+    for obj in list(session.new) + list(session.deleted):
+        state = inspect(obj)
+        pk = _primary_key(state)
+        for table in state.mapper.tables:
+            changes.add((table.name, None, pk))
+    for obj in session.dirty:
+        state = inspect(obj)
+        pk = _primary_key(state)
+        for prop in state.mapper.column_attrs:
+            if state.attrs[prop.key].history.has_changes():
+                for column in prop.columns:
+                    changes.add((column.table.name, column.name, pk))
+    return changes
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_writes(session, flush_context):
+    # Collections and attribute history still show the pre-flush state here
+    changes = _flushed_changes(session)
+    if changes:
+        _pending_changes(session).update(changes)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None and getattr(table, 'name', None):
+            _pending_changes(orm_execute_state.session).add((table.name, None, None))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    rewrites = session.info.pop(_REWRITES_KEY, None)
+    if changes and _cache is not None:
+        _cache.invalidate_changes(changes, rewrites)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_CHANGES_KEY, None)
+    session.info.pop(_REWRITES_KEY, None)
+
+
+# Imported last: the bus registers its publish hook on import and depends on
+# the names above
+from src.services import invalidation_bus  # noqa: E402
@@ -0,0 +1,83 @@
+"""
+Dashboard read models
+
+Dashboard counters are computed in a single aggregate statement and served
+from the process-wide result cache (src/services/cache.py). The entry
+expires after a short TTL and is invalidated as soon as a committed write
+touches one of the columns the counters depend on, so steady-state
+dashboard renders issue no queries.
+"""
+
+from sqlalchemy import func, select
+
+from src.config.settings import get_settings
+from src.database.connection import async_db_session, get_db_session
+from src.database.models import Student, User
+from src.services.cache import cached, cached_async, get_result_cache
+
+EMPTY_METRICS = {'total_users': 0, 'active_students': 0, 'pending_approvals': 0, 'on_hold': 0}
+
+_CACHE_KEY = ('dashboard_metrics',)
+
+# Columns whose changes affect the counters
+_CACHE_TAGS = ('students.status', 'students.registration_status', 'users.is_active')
+
+
+def _dashboard_metrics_stmt():
+    """All dashboard counters in one round trip"""
+    active_users = (
+        select(func.count())
+        .select_from(User)
+        .where(User.is_active == True)
+        .scalar_subquery()
+    )
+    return select(
+        active_users.label('total_users'),
+        func.count().filter(Student.status == 'active').label('active_students'),
+        func.count().filter(Student.registration_status == 'pending_review').label('pending_approvals'),
+        func.count().filter(Student.registration_status == 'on_hold').label('on_hold'),
+    ).select_from(Student)
+
+
+def _load_dashboard_metrics() -> dict:
+    # Primary, not replica: a write invalidates the cached counters on commit,
+    # and a replica lagging behind it would put the old counts back
+    with get_db_session() as session:
+        return dict(session.execute(_dashboard_metrics_stmt()).one()._mapping)
+
+
+async def _load_dashboard_metrics_async() -> dict:
+    async with async_db_session() as session:
+        return dict((await session.execute(_dashboard_metrics_stmt())).one()._mapping)
+
+
+def load_dashboard_metrics() -> dict:
+    """
+    Dashboard counters, served from the process-wide cache when fresh
+
+    Returns:
+        dict with total_users, active_students, pending_approvals and on_hold
+    """
+    metrics = cached(
+        _CACHE_KEY,
+        _CACHE_TAGS,
+        _load_dashboard_metrics,
+        ttl=get_settings().dashboard_metrics_ttl_seconds,
+    )
+    return dict(metrics)
+
+
+async def load_dashboard_metrics_async() -> dict:
+    """load_dashboard_metrics for gather_loaders (same cache entry, asyncpg on a miss)"""
+    metrics = await cached_async(
+        _CACHE_KEY,
+        _CACHE_TAGS,
+        _load_dashboard_metrics_async,
+        ttl=get_settings().dashboard_metrics_ttl_seconds,
+    )
+    return dict(metrics)
+
+
+def invalidate_dashboard_metrics():
+    """Drop the cached counters; the next dashboard render re-queries"""
+    get_result_cache().invalidate(_CACHE_KEY)
@@ -0,0 +1,275 @@
+"""
+Streaming data export
+
+Nightly district exports of students, sessions and assessments. Rows are
+read in fixed-size batches through a server-side cursor (``yield_per``,
+which turns on ``stream_results``) and written as they arrive, so memory
+use depends on the batch size, not the table size.
+
+Formats: CSV, JSON Lines and Parquet (requires ``pyarrow``). JSON columns
+such as ``contact_info`` or ``progress_ratings`` can be flattened into one
+column per nested key (``contact_info.primary_guardian.full_name``). CSV
+and Parquet need every column up front, so flattening them reads the JSON
+columns in an extra streamed pass to collect the keys first. Both passes
+run in one REPEATABLE READ transaction on PostgreSQL, so they see the same
+rows. Flattened keys are string columns in Parquet; their values are
+written as text whatever their JSON type.
+
+Exports to a path are written to ``<path>.partial`` and renamed
+into place once complete, so a failed export never leaves a truncated file.
+"""
+
+import csv
+import io
+import json
+import os
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from typing import Any, BinaryIO, Dict, Iterator, List, Union
+
+from sqlalchemy import JSON, Boolean, Date, DateTime, Integer, Time, select, text
+
+from src.database.connection import get_db_session
+from src.database.models import Assessment, Session, Student
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_TABLES = {
+    'students': Student.__table__,
+    'sessions': Session.__table__,
+    'assessments': Assessment.__table__,
+}
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Rows fetched per round trip (and per Parquet row group)
+EXPORT_BATCH_SIZE = 1000
+
+# Separator between a JSON column and its nested keys when flattening
+FLATTEN_SEPARATOR = '.'
+
+
+def _json_columns(table) -> List[str]:
+    return [column.name for column in table.columns if isinstance(column.type, JSON)]
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, Any]):
+    """Nested dicts become prefix.key columns; lists and scalars are leaves"""
+    if isinstance(value, dict) and value:
+        for key, item in value.items():
+            _flatten(f"{prefix}{FLATTEN_SEPARATOR}{key}", item, out)
+    else:
+        out[prefix] = value
+
+
+def flatten_record(record: Dict[str, Any], json_columns: List[str]) -> Dict[str, Any]:
+    """Copy of ``record`` with each JSON column expanded into one column per nested key"""
+    flat = {}
+    for name, value in record.items():
+        if name in json_columns and isinstance(value, dict):
+            _flatten(name, value, flat)
+        elif name in json_columns and value is None:
+            continue
+        else:
+            flat[name] = value
+    return flat
+
+
+@contextmanager
+def _snapshot_session():
+    """Read-only session whose queries all see one snapshot of the database"""
+    with get_db_session(readonly=True) as session:
+        if session.get_bind().dialect.name == 'postgresql':
+            session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+        yield session
+
+
+def _stream(session, table, columns, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Batches of row dicts from a server-side cursor, in primary key order"""
+    stmt = (
+        select(*columns)
+        .order_by(*table.primary_key.columns)
+        .execution_options(yield_per=batch_size)
+    )
+    result = session.execute(stmt).mappings()
+    for partition in result.partitions():
+        yield [dict(row) for row in partition]
+
+
+def _batches(session, table, flatten: bool, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    json_columns = _json_columns(table)
+    for batch in _stream(session, table, table.columns, batch_size):
+        yield [flatten_record(row, json_columns) for row in batch] if flatten else batch
+
+
+def iter_batches(
+    table_name: str,
+    flatten: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Stream a table as batches of row dicts
+
+    Args:
+        table_name: One of EXPORT_TABLES
+        flatten: Expand JSON columns into one column per nested key
+        batch_size: Rows per batch (and per database round trip)
+
+    Yields:
+        Lists of at most ``batch_size`` dicts
+    """
+    table = _export_table(table_name)
+    with get_db_session(readonly=True) as session:
+        yield from _batches(session, table, flatten, batch_size)
+
+
+def _flattened_columns(session, table, batch_size: int) -> List[str]:
+    """Output columns after flattening: table columns with JSON columns replaced by their keys"""
+    json_columns = _json_columns(table)
+    keys = {name: {} for name in json_columns}  # dicts keep first-seen order
+    if json_columns:
+        for batch in _stream(session, table, [table.c[name] for name in json_columns], batch_size):
+            for row in batch:
+                for name in json_columns:
+                    if isinstance(row[name], dict):
+                        flat = {}
+                        _flatten(name, row[name], flat)
+                        keys[name].update(dict.fromkeys(flat))
+                    elif row[name] is not None:
+                        keys[name][name] = None
+    columns = []
+    for column in table.columns:
+        columns.extend(keys[column.name] if column.name in keys else [column.name])
+    return columns
+
+
+def _export_table(table_name: str):
+    try:
+        return EXPORT_TABLES[table_name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown export table '{table_name}'; choose from {', '.join(EXPORT_TABLES)}"
+        ) from None
+
+
+def _text_value(value: Any) -> Any:
+    """Value as written to CSV / Parquet string columns (None stays None)"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list, bool)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _write_csv(batches, columns: List[str], out: BinaryIO) -> int:
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+    writer = csv.DictWriter(text, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    rows = 0
+    for batch in batches:
+        writer.writerows({key: _text_value(value) for key, value in row.items()} for row in batch)
+        rows += len(batch)
+    text.flush()
+    text.detach()  # leave ``out`` open for the caller
+    return rows
+
+
+def _write_jsonl(batches, out: BinaryIO) -> int:
+    rows = 0
+    for batch in batches:
+        out.write(''.join(json.dumps(row, default=_text_value) + '\n' for row in batch).encode('utf-8'))
+        rows += len(batch)
+    return rows
+
+
+def _arrow_type(column):
+    if column is None or isinstance(column.type, JSON):
+        return pa.string()  # JSON documents and flattened keys
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, Time):
+        return pa.time64('us')
+    return pa.string()
+
+
+def _write_parquet(batches, table, columns: List[str], out: BinaryIO) -> int:
+    schema = pa.schema([(name, _arrow_type(table.c.get(name))) for name in columns])
+    string_columns = [field.name for field in schema if field.type == pa.string()]
+    rows = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for batch in batches:
+            for row in batch:
+                for name in string_columns:
+                    if name in row:
+                        row[name] = _text_value(row[name])
+            # One row group per batch
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            rows += len(batch)
+    return rows
+
+
+def export_table(
+    table_name: str,
+    fmt: str,
+    out: Union[str, BinaryIO],
+    flatten: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> int:
+    """
+    Stream one table to a file in constant memory
+
+    Args:
+        table_name: One of EXPORT_TABLES
+        fmt: One of EXPORT_FORMATS
+        out: Path or binary file object to write to
+        flatten: Expand JSON columns into one column per nested key
+        batch_size: Rows per database round trip
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ValueError: Unknown table or format
+        RuntimeError: Parquet requested but pyarrow isn't installed
+    """
+    table = _export_table(table_name)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'; choose from {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'parquet' and pa is None:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    if isinstance(out, str):
+        partial = f"{out}.partial"
+        try:
+            with open(partial, 'wb') as f:
+                rows = export_table(table_name, fmt, f, flatten=flatten, batch_size=batch_size)
+            os.replace(partial, out)
+        except BaseException:
+            os.unlink(partial)
+            raise
+        return rows
+
+    with _snapshot_session() as session:
+        batches = _batches(session, table, flatten, batch_size)
+        if fmt == 'jsonl':
+            return _write_jsonl(batches, out)
+
+        columns = (
+            _flattened_columns(session, table, batch_size) if flatten
+            else [column.name for column in table.columns]
+        )
+        if fmt == 'csv':
+            return _write_csv(batches, columns, out)
+        return _write_parquet(batches, table, columns, out)
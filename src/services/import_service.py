@@ -0,0 +1,453 @@
+"""
+Bulk student import
+
+Onboards a whole intake from one CSV/XLSX file instead of one wizard run
+per child:
+
+- The file is read with pandas and every row is validated at once with
+  vectorized checks (required fields, dates, gender, email, lengths,
+  duplicates within the file and against existing students). Dates must be
+  ISO (YYYY-MM-DD) text or real Excel date cells; day/month orders such as
+  04/05/2016 are ambiguous and rejected.
+- Valid rows are loaded in a single transaction. On PostgreSQL they are
+  COPYed into a temporary staging table and moved into ``students`` with
+  one INSERT ... SELECT; elsewhere they are inserted in executemany
+  batches. Admission numbers are reserved for the whole file with one
+  statement, never per row.
+- The load transaction checks again for students already on record, since
+  another import may have added them after validation. On PostgreSQL
+  imports hold an advisory lock for that check and the load, so two files
+  can't both add the same child.
+- Invalid rows are skipped and listed in a per-row error report.
+"""
+
+import io
+import json
+import re
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+from sqlalchemy import insert, select, text
+
+from src.database.admission_numbers import reserve_admission_numbers
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.services.cache import touch
+
+# Columns understood in an import file
+REQUIRED_COLUMNS = ('first_name', 'last_name', 'date_of_birth')
+OPTIONAL_COLUMNS = (
+    'preferred_name', 'gender', 'nationality', 'grade', 'section', 'enrollment_date',
+    'guardian_name', 'guardian_relationship', 'guardian_phone', 'guardian_email',
+)
+IMPORT_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+# Alternative header spellings accepted in files
+_COLUMN_ALIASES = {
+    'dob': 'date_of_birth',
+    'birth_date': 'date_of_birth',
+    'first': 'first_name',
+    'last': 'last_name',
+    'surname': 'last_name',
+    'class': 'grade',
+}
+
+# Same choices as the registration wizard
+GENDERS = ('Male', 'Female', 'Other', 'Prefer not to say')
+RELATIONSHIPS = ('Mother', 'Father', 'Guardian', 'Other')
+
+# Registration statuses an import may create
+IMPORT_STATUSES = ('pending_review', 'draft')
+
+# Column length limits (src/database/models.py)
+_MAX_LENGTHS = {
+    'first_name': 100, 'last_name': 100, 'preferred_name': 100, 'nationality': 100,
+    'grade': 20, 'section': 20,
+}
+
+_EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+_ISO_DATE_PATTERN = r'\d{4}-\d{2}-\d{2}'
+
+# pg_advisory_xact_lock key held while an import checks for duplicates and loads
+_IMPORT_LOCK_KEY = 0x5E1_1A9
+
+# Rows per executemany batch on non-PostgreSQL databases
+_BATCH_SIZE = 1000
+
+# Staging table columns, in COPY order
+_STAGING_COLUMNS = (
+    'row_number', 'admission_number', 'first_name', 'last_name', 'preferred_name', 'date_of_birth',
+    'gender', 'nationality', 'grade', 'section', 'enrollment_date', 'registration_step',
+    'contact_info', 'academic_info',
+)
+_PG_STAGING_DDL = """
+    CREATE TEMPORARY TABLE student_import (
+        row_number INTEGER, admission_number TEXT, first_name TEXT, last_name TEXT,
+        preferred_name TEXT, date_of_birth DATE, gender TEXT, nationality TEXT, grade TEXT,
+        section TEXT, enrollment_date DATE, registration_step INTEGER, contact_info JSONB,
+        academic_info JSONB
+    ) ON COMMIT DROP
+"""
+_PG_INSERT = """
+    INSERT INTO students (
+        admission_number, first_name, last_name, preferred_name, date_of_birth, gender,
+        nationality, grade, section, enrollment_date, status, registration_status,
+        registration_step, contact_info, academic_info, created_by, created_at, updated_at
+    )
+    SELECT
+        admission_number, first_name, last_name, preferred_name, date_of_birth, gender,
+        nationality, grade, section, enrollment_date, 'pending', :registration_status,
+        registration_step, contact_info, academic_info, :created_by, :now, :now
+    FROM student_import
+    ORDER BY row_number
+    RETURNING student_id, admission_number
+"""
+
+
+@dataclass
+class ImportResult:
+    """Outcome of validating (and optionally loading) an import file"""
+    total_rows: int
+    valid_rows: int
+    imported: pd.DataFrame  # row, student_id, admission_number, first_name, last_name
+    errors: pd.DataFrame    # row, column, value, error
+
+    @property
+    def rejected_rows(self) -> int:
+        """Number of file rows with at least one error"""
+        return int(self.errors['row'].nunique()) if not self.errors.empty else 0
+
+    def error_report_csv(self) -> bytes:
+        """Per-row error report as CSV bytes"""
+        return self.errors.to_csv(index=False).encode('utf-8')
+
+
+def import_template_csv() -> bytes:
+    """Header row (plus one example row) for a blank import file"""
+    example = {
+        'first_name': 'Asha', 'last_name': 'Rao', 'date_of_birth': '2016-04-21',
+        'preferred_name': '', 'gender': 'Female', 'nationality': '', 'grade': '3',
+        'section': 'A', 'enrollment_date': date.today().isoformat(),
+        'guardian_name': 'Meera Rao', 'guardian_relationship': 'Mother',
+        'guardian_phone': '555-0100', 'guardian_email': 'meera@example.com',
+    }
+    return pd.DataFrame([example], columns=IMPORT_COLUMNS).to_csv(index=False).encode('utf-8')
+
+
+def read_student_file(source: Union[str, BinaryIO], filename: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a CSV or Excel import file into a DataFrame of strings / dates
+
+    Args:
+        source: Path or file-like object (e.g. a Streamlit UploadedFile)
+        filename: Name used to detect the format when ``source`` is a file object
+
+    Returns:
+        DataFrame with normalized column names (lower_snake_case, aliases resolved)
+
+    Raises:
+        ValueError: If the format is unsupported or required columns are missing
+    """
+    name = (filename or getattr(source, 'name', None) or str(source)).lower()
+    if name.endswith(('.xlsx', '.xls')):
+        try:
+            df = pd.read_excel(source, dtype=object)
+        except ImportError as e:
+            raise ValueError("Reading Excel files requires openpyxl (pip install openpyxl)") from e
+    elif name.endswith('.csv'):
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError("Unsupported file type; upload a .csv or .xlsx file")
+
+    df.columns = [
+        _COLUMN_ALIASES.get(key, key)
+        for key in (re.sub(r'[^0-9a-z]+', '_', str(column).strip().lower()).strip('_') for column in df.columns)
+    ]
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return df
+
+
+def _text(series: pd.Series) -> pd.Series:
+    """Stripped strings with blanks (and NaN) as ''"""
+    return series.fillna('').astype(str).str.strip()
+
+
+def _dates(series: pd.Series, raw: pd.Series) -> pd.Series:
+    """Parse ISO (YYYY-MM-DD) strings and Excel date cells; anything else becomes NaT"""
+    is_cell = series.map(lambda value: isinstance(value, (date, datetime)))
+    parsed = pd.to_datetime(
+        raw.where(~is_cell & raw.str.fullmatch(_ISO_DATE_PATTERN)), errors='coerce', format='%Y-%m-%d'
+    )
+    if is_cell.any():
+        parsed[is_cell] = pd.to_datetime(series[is_cell].astype(object), errors='coerce')
+    return parsed.dt.normalize()
+
+
+def _existing_students(dates_of_birth: Sequence[date], session=None) -> pd.DataFrame:
+    """Existing students born on any of these dates, with lower-cased names"""
+    if not dates_of_birth:
+        return pd.DataFrame(columns=['first_key', 'last_key', 'date_of_birth'])
+    with (nullcontext(session) if session is not None else get_db_session(readonly=True)) as session:
+        rows = session.execute(
+            select(Student.first_name, Student.last_name, Student.date_of_birth)
+            .where(Student.date_of_birth.in_(list(dates_of_birth)))
+        ).all()
+    existing = pd.DataFrame(rows, columns=['first_name', 'last_name', 'date_of_birth'])
+    return pd.DataFrame({
+        'first_key': existing['first_name'].str.lower(),
+        'last_key': existing['last_name'].str.lower(),
+        'date_of_birth': pd.to_datetime(existing['date_of_birth']),
+    })
+
+
+def _on_record(rows: pd.DataFrame, session=None) -> pd.Series:
+    """Mask of rows whose name and date of birth match an existing student"""
+    keys = pd.DataFrame({
+        'first_key': rows['first_name'].str.lower(),
+        'last_key': rows['last_name'].str.lower(),
+        'date_of_birth': rows['date_of_birth'],
+    })
+    has_identity = (keys['first_key'] != '') & (keys['last_key'] != '') & keys['date_of_birth'].notna()
+    existing = _existing_students(sorted({d.date() for d in keys.loc[has_identity, 'date_of_birth']}), session)
+    matched = keys.merge(existing.drop_duplicates(), on=list(keys.columns), how='left', indicator=True)['_merge']
+    return has_identity & (matched == 'both').values
+
+
+_ON_RECORD_ERROR = "A student with this name and date of birth already exists"
+
+
+def validate_students(df: pd.DataFrame, today: Optional[date] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validate every row of an import file at once
+
+    Args:
+        df: Output of ``read_student_file()``
+        today: Reference date for future-date checks (defaults to today)
+
+    Returns:
+        (valid, errors): ``valid`` holds the cleaned rows that passed every
+        check (with a ``row`` column of spreadsheet row numbers); ``errors``
+        has one line per problem with row, column, value and error.
+    """
+    today = pd.Timestamp(today or date.today())
+    rows = pd.DataFrame({'row': df.index + 2})  # spreadsheet row: header is row 1
+    for column in IMPORT_COLUMNS:
+        if column in ('date_of_birth', 'enrollment_date'):
+            continue
+        rows[column] = _text(df[column]) if column in df.columns else ''
+    raw_dob = _text(df['date_of_birth'])
+    raw_enrollment = _text(df['enrollment_date']) if 'enrollment_date' in df.columns else pd.Series('', index=df.index)
+    rows['date_of_birth'] = _dates(df['date_of_birth'], raw_dob)
+    # Enrollment date is optional and defaults to today
+    enrollment = _dates(df.get('enrollment_date', raw_enrollment), raw_enrollment)
+    rows['enrollment_date'] = enrollment.fillna(today)
+
+    problems: List[pd.DataFrame] = []
+
+    def flag(mask: pd.Series, column: str, message: str, values: Optional[pd.Series] = None):
+        if mask.any():
+            shown = (values if values is not None else rows[column]).astype(str)
+            problems.append(pd.DataFrame({
+                'row': rows.loc[mask, 'row'],
+                'column': column,
+                'value': shown[mask],
+                'error': message,
+            }))
+
+    for column in ('first_name', 'last_name'):
+        flag(rows[column] == '', column, "Required")
+    flag(raw_dob == '', 'date_of_birth', "Required", raw_dob)
+    flag((raw_dob != '') & rows['date_of_birth'].isna(), 'date_of_birth', "Not a valid date (use YYYY-MM-DD)", raw_dob)
+    flag(rows['date_of_birth'] > today, 'date_of_birth', "Date of birth is in the future", raw_dob)
+    flag((raw_enrollment != '') & enrollment.isna(), 'enrollment_date',
+         "Not a valid date (use YYYY-MM-DD)", raw_enrollment)
+    flag(rows['date_of_birth'] >= rows['enrollment_date'], 'date_of_birth',
+         "Date of birth must be before the enrollment date", raw_dob)
+
+    genders = {gender.lower(): gender for gender in GENDERS}
+    gender_key = rows['gender'].str.lower()
+    flag((gender_key != '') & ~gender_key.isin(genders), 'gender', f"Must be one of: {', '.join(GENDERS)}")
+    rows['gender'] = gender_key.map(genders).fillna('Prefer not to say')
+
+    relationships = {relationship.lower(): relationship for relationship in RELATIONSHIPS}
+    relationship_key = rows['guardian_relationship'].str.lower()
+    flag((relationship_key != '') & ~relationship_key.isin(relationships), 'guardian_relationship',
+         f"Must be one of: {', '.join(RELATIONSHIPS)}")
+    rows['guardian_relationship'] = relationship_key.map(relationships).fillna('Guardian')
+
+    email = rows['guardian_email']
+    flag((email != '') & ~email.str.match(_EMAIL_PATTERN), 'guardian_email', "Not a valid email address")
+    for column, limit in _MAX_LENGTHS.items():
+        flag(rows[column].str.len() > limit, column, f"Longer than {limit} characters")
+
+    # Duplicates: same name and date of birth within the file or already on record
+    rows['first_key'] = rows['first_name'].str.lower()
+    rows['last_key'] = rows['last_name'].str.lower()
+    identity = ['first_key', 'last_key', 'date_of_birth']
+    has_identity = (rows['first_key'] != '') & (rows['last_key'] != '') & rows['date_of_birth'].notna()
+    flag(has_identity & rows.duplicated(identity, keep='first'), 'first_name',
+         "Duplicate of an earlier row (same name and date of birth)")
+    flag(_on_record(rows), 'first_name', _ON_RECORD_ERROR)
+
+    errors = (
+        pd.concat(problems, ignore_index=True).sort_values('row', kind='stable').reset_index(drop=True)
+        if problems else pd.DataFrame(columns=['row', 'column', 'value', 'error'])
+    )
+    valid = rows[~rows['row'].isin(errors['row'])].drop(columns=['first_key', 'last_key'])
+    return valid.reset_index(drop=True), errors
+
+
+def _student_records(valid: pd.DataFrame) -> pd.DataFrame:
+    """Students table values for validated rows (JSON blobs and wizard step)"""
+    records = pd.DataFrame({
+        'row_number': valid['row'],
+        'first_name': valid['first_name'],
+        'last_name': valid['last_name'],
+        'preferred_name': valid['preferred_name'].replace('', None),
+        'date_of_birth': valid['date_of_birth'].dt.date,
+        'gender': valid['gender'],
+        'nationality': valid['nationality'].replace('', None),
+        'grade': valid['grade'].replace('', None),
+        'section': valid['section'].replace('', None),
+        'enrollment_date': valid['enrollment_date'].dt.date,
+    })
+
+    # Highest wizard step the file completes: 1 basic, 2 contact, 3 academic
+    has_contact = (valid['guardian_name'] != '') & (valid['guardian_phone'] != '')
+    has_grade = valid['grade'] != ''
+    records['registration_step'] = 1 + has_contact.astype(int) + (has_contact & has_grade).astype(int)
+
+    guardians = valid[['guardian_relationship', 'guardian_name', 'guardian_phone', 'guardian_email']]
+    records['contact_info'] = [
+        {'primary_guardian': {'relationship': rel, 'full_name': name, 'phone': phone, 'email': email}}
+        if name else None
+        for rel, name, phone, email in guardians.itertuples(index=False)
+    ]
+    records['academic_info'] = [
+        {'current_enrollment': {'grade': grade, 'section': section}} if grade else None
+        for grade, section in valid[['grade', 'section']].itertuples(index=False)
+    ]
+    return records
+
+
+def _load_postgresql(session, records: pd.DataFrame, registration_status, created_by) -> pd.DataFrame:
+    """COPY into a staging table, then one INSERT ... SELECT"""
+    session.execute(text(_PG_STAGING_DDL))
+    staged = records[list(_STAGING_COLUMNS)].copy()
+    for column in ('contact_info', 'academic_info'):
+        staged[column] = [json.dumps(value) if value else None for value in staged[column]]
+    buffer = io.StringIO()
+    staged.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY student_import ({', '.join(_STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+    result = session.execute(
+        text(_PG_INSERT),
+        {'registration_status': registration_status, 'created_by': created_by, 'now': datetime.utcnow()},
+    )
+    return pd.DataFrame(result.all(), columns=['student_id', 'admission_number'])
+
+
+def _load_batches(session, records: pd.DataFrame, registration_status, created_by) -> pd.DataFrame:
+    """executemany INSERT batches, each followed by a SELECT of the new ids"""
+    table = Student.__table__
+    now = datetime.utcnow()
+    rows = records.drop(columns=['row_number']).astype(object).where(records.notna(), None).to_dict('records')
+    for row in rows:
+        row.update(
+            status='pending',
+            registration_status=registration_status,
+            created_by=created_by,
+            created_at=now,
+            updated_at=now,
+        )
+
+    # executemany can't return ids on every backend, so match them back
+    # through the (unique) admission numbers
+    connection = session.connection()
+    loaded = []
+    for start in range(0, len(rows), _BATCH_SIZE):
+        batch = rows[start:start + _BATCH_SIZE]
+        connection.execute(insert(table), batch)
+        loaded.extend(connection.execute(
+            select(table.c.student_id, table.c.admission_number)
+            .where(table.c.admission_number.in_([row['admission_number'] for row in batch]))
+        ).all())
+    return pd.DataFrame(loaded, columns=['student_id', 'admission_number'])
+
+
+def import_students(
+    df: pd.DataFrame,
+    created_by: Optional[int] = None,
+    registration_status: str = 'pending_review',
+    dry_run: bool = False,
+) -> ImportResult:
+    """
+    Validate an import file and load its valid rows
+
+    Args:
+        df: Output of ``read_student_file()``
+        created_by: user_id recorded as the registering user
+        registration_status: 'pending_review' (straight to the approval
+            queue) or 'draft' (to be completed in the wizard)
+        dry_run: Validate only; nothing is written
+
+    Returns:
+        ImportResult with the imported students and the error report
+    """
+    if registration_status not in IMPORT_STATUSES:
+        raise ValueError(f"registration_status must be one of: {', '.join(IMPORT_STATUSES)}")
+
+    valid, errors = validate_students(df)
+    imported = pd.DataFrame(columns=['row', 'student_id', 'admission_number', 'first_name', 'last_name'])
+    if not dry_run and not valid.empty:
+        with get_db_session() as session:
+            postgresql = session.get_bind().dialect.name == 'postgresql'
+            if postgresql:
+                session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': _IMPORT_LOCK_KEY})
+            # Validation read outside this transaction; skip students added since
+            added_since = _on_record(valid, session)
+            if added_since.any():
+                errors = pd.concat([errors, pd.DataFrame({
+                    'row': valid.loc[added_since, 'row'],
+                    'column': 'first_name',
+                    'value': valid.loc[added_since, 'first_name'],
+                    'error': _ON_RECORD_ERROR,
+                })], ignore_index=True).sort_values('row', kind='stable').reset_index(drop=True)
+                valid = valid[~added_since].reset_index(drop=True)
+
+            if not valid.empty:
+                records = _student_records(valid)
+                # One block of numbers for the whole file, in file order
+                records['admission_number'] = reserve_admission_numbers(session.connection(), len(records))
+                if postgresql:
+                    loaded = _load_postgresql(session, records, registration_status, created_by)
+                else:
+                    loaded = _load_batches(session, records, registration_status, created_by)
+                # Core/raw SQL writes: tell the result cache
+                touch(session, 'students')
+                imported = (
+                    records[['row_number', 'admission_number', 'first_name', 'last_name']]
+                    .rename(columns={'row_number': 'row'})
+                    .merge(loaded, on='admission_number')
+                    [['row', 'student_id', 'admission_number', 'first_name', 'last_name']]
+                )
+
+    return ImportResult(
+        total_rows=len(df),
+        valid_rows=len(valid),
+        imported=imported,
+        errors=errors,
+    )
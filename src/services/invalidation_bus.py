@@ -0,0 +1,296 @@
+"""
+Cross-process cache invalidation
+
+Several Streamlit processes can run behind a load balancer, each with its
+own result cache (src/services/cache.py). Writes committed by one process
+must evict the matching entries everywhere:
+
+- Publish: before a session commits, the tables / columns / primary keys
+  it changed are sent with ``pg_notify``. NOTIFY is transactional, so
+  other processes only hear about changes that actually committed.
+- listen mode: a daemon thread per process holds a dedicated connection,
+  LISTENs on the channel and evicts matching entries. Its own
+  notifications are skipped. After a reconnect the whole cache is cleared,
+  since notifications may have been missed.
+- poll mode: for poolers that don't support LISTEN (transaction-mode
+  PgBouncer / Supabase port 6543), the thread instead polls
+  ``count(*)`` and ``max(updated_at)`` per table and evicts a table's
+  entries when its watermark moves. Both are read from indexes
+  (the primary key and idx_*_updated_at) and take no locks, so polling
+  never blocks writers. A transaction that commits after a newer one with
+  an earlier ``updated_at`` leaves the watermark unchanged; entries it
+  touched are refreshed when their TTL expires.
+
+``CACHE_BUS_MODE=auto`` picks listen on PostgreSQL, poll when the
+connection profile is ``transaction_pooler`` (src/database/connection_profiles.py),
+and off for other databases.
+"""
+
+import json
+import os
+import select
+import socket
+import threading
+import uuid
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from src.config.settings import get_settings
+from src.database.connection import _get_engine, connect_outside_pool, get_db_session
+from src.database.connection_profiles import resolve_profile
+from src.services.cache import Change, get_result_cache, pending_changes
+
+CHANNEL = 'seims_cache_invalidation'
+
+# pg_notify payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+
+# Tables with an updated_at column that cached read models depend on
+WATERMARK_TABLES = ('students', 'users')
+
+# Identifies this process in notifications so it can skip its own
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def resolve_mode(database_url: Optional[str], mode: str = 'auto') -> str:
+    """Effective bus mode ('listen', 'poll' or 'off') for a database URL"""
+    if mode in ('listen', 'poll', 'off'):
+        return mode
+    if not database_url:
+        return 'off'
+    url = make_url(database_url)
+    if url.get_backend_name() != 'postgresql':
+        return 'off'
+    if resolve_profile(database_url).name == 'transaction_pooler':
+        return 'poll'
+    return 'listen'
+
+
+def encode_changes(changes: Iterable[Change]) -> str:
+    """
+    Notification payload for a set of changes
+
+    Falls back to column-level, then table-level changes when the full list
+    of primary keys doesn't fit in a notification.
+    """
+    changes = set(changes)
+    for coarsen in (
+        lambda c: c,
+        lambda c: (c[0], c[1], None),
+        lambda c: (c[0], None, None),
+    ):
+        changes = {coarsen(change) for change in changes}
+        payload = json.dumps(
+            {'origin': ORIGIN, 'changes': sorted(changes, key=lambda c: tuple(x or '' for x in c))},
+            separators=(',', ':'),
+        )
+        if len(payload.encode('utf-8')) <= MAX_PAYLOAD_BYTES:
+            return payload
+    # Too many tables to list: tell everyone to drop everything
+    return json.dumps({'origin': ORIGIN, 'changes': None}, separators=(',', ':'))
+
+
+def decode_changes(payload: str) -> Tuple[Optional[str], Optional[Set[Change]]]:
+    """(origin, changes) from a payload; changes None means 'everything'"""
+    message = json.loads(payload)
+    changes = message.get('changes')
+    if changes is None:
+        return message.get('origin'), None
+    return message.get('origin'), {tuple(change) for change in changes}
+
+
+@event.listens_for(Session, 'before_commit')
+def _publish_changes(session):
+    bind = session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if resolve_mode(str(bind.url), get_settings().cache_bus_mode) == 'off':
+        return
+    # Flush now so the cache's after_flush hook has seen every change
+    session.flush()
+    changes = pending_changes(session)
+    if changes:
+        session.connection().execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {'channel': CHANNEL, 'payload': encode_changes(changes)},
+        )
+
+
+def _apply(changes: Optional[Set[Change]]):
+    cache = get_result_cache()
+    if changes is None:
+        cache.clear()
+    else:
+        cache.invalidate_changes(changes)
+
+
+class InvalidationBus:
+    """Per-process listener (or poller) that applies other processes' writes"""
+
+    def __init__(self, mode: str, poll_interval: float = 5.0):
+        self.mode = mode
+        self.poll_interval = max(float(poll_interval), 0.5)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connected = False
+        self._received = 0
+        self._applied = 0
+        self._reconnects = 0
+        self._last_error: Optional[str] = None
+        self._watermarks: Dict[str, tuple] = {}
+
+    def start(self):
+        """Start the background thread (no-op if off or already running)"""
+        if self.mode == 'off':
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            target = self._listen if self.mode == 'listen' else self._poll
+            self._thread = threading.Thread(
+                target=target, name=f"seims-cache-bus-{self.mode}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Ask the background thread to exit"""
+        self._stop.set()
+
+    def snapshot(self) -> dict:
+        """Bus state for diagnostics"""
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'origin': ORIGIN,
+                'running': self._thread is not None and self._thread.is_alive(),
+                'connected': self._connected,
+                'received': self._received,
+                'applied': self._applied,
+                'reconnects': self._reconnects,
+                'last_error': self._last_error,
+            }
+
+    def _record_error(self, error: Exception):
+        message = str(error).strip()
+        with self._lock:
+            self._connected = False
+            self._last_error = message.splitlines()[0][:300] if message else type(error).__name__
+
+    # ----- listen mode -----
+
+    def handle_notification(self, payload: str):
+        """Apply one notification payload unless this process sent it"""
+        origin, changes = decode_changes(payload)
+        with self._lock:
+            self._received += 1
+        if origin == ORIGIN:
+            return
+        _apply(changes)
+        with self._lock:
+            self._applied += 1
+
+    def _listen(self):
+        failures = 0
+        first_connect = True
+        while not self._stop.is_set():
+            connection = None
+            try:
+                db_engine, _ = _get_engine()
+                if db_engine is None:
+                    raise ConnectionError("Database engine not initialized")
+                connection = connect_outside_pool(db_engine)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                if not first_connect:
+                    # Anything committed while we were disconnected was missed
+                    get_result_cache().clear()
+                    with self._lock:
+                        self._reconnects += 1
+                first_connect = False
+                failures = 0
+                with self._lock:
+                    self._connected = True
+
+                while not self._stop.is_set():
+                    readable, _, _ = select.select([connection], [], [], 5.0)
+                    if not readable:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        try:
+                            self.handle_notification(notification.payload)
+                        except (ValueError, TypeError) as e:
+                            print(f"Warning: ignoring malformed cache notification: {e}")
+            except Exception as e:
+                self._record_error(e)
+                failures += 1
+                self._stop.wait(min(2 ** failures, 60))
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    # ----- poll mode -----
+
+    def poll_once(self) -> Set[str]:
+        """Compare table watermarks with the last poll; evict tables that moved"""
+        columns = ", ".join(
+            f"(SELECT count(*) FROM {table}) AS {table}_count, "
+            f"(SELECT max(updated_at) FROM {table}) AS {table}_updated_at"
+            for table in WATERMARK_TABLES
+        )
+        with get_db_session() as session:
+            row = session.execute(text(f"SELECT {columns}")).one()._mapping
+
+        moved = set()
+        for table in WATERMARK_TABLES:
+            watermark = (row[f"{table}_count"], row[f"{table}_updated_at"])
+            previous = self._watermarks.get(table)
+            if previous is not None and previous != watermark:
+                moved.add(table)
+            self._watermarks[table] = watermark
+        if moved:
+            get_result_cache().invalidate_tables(*moved)
+        with self._lock:
+            self._connected = True
+            self._received += 1
+            self._applied += len(moved)
+        return moved
+
+    def _poll(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                self._record_error(e)
+            self._stop.wait(self.poll_interval)
+
+
+_bus: Optional[InvalidationBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Get the process-wide invalidation bus, starting it on first use"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                config = get_settings()
+                _bus = InvalidationBus(
+                    mode=resolve_mode(config.database_url, config.cache_bus_mode),
+                    poll_interval=config.cache_bus_poll_seconds,
+                )
+    _bus.start()
+    return _bus
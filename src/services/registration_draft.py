@@ -0,0 +1,136 @@
+"""
+Registration wizard draft buffer
+
+Data entry staff click through the six wizard steps in quick succession.
+Instead of committing every "Save & Next", the wizard stages step data in
+a per-session ``RegistrationDraft`` (kept in ``st.session_state``) and
+writes it with one ``patch_registration()`` UPDATE when:
+
+- the oldest unsaved change is ``REGISTRATION_AUTOSAVE_SECONDS`` old
+  (checked on every rerun and by the page's autosave timer),
+- the registration is submitted, or
+- the user switches to another registration.
+
+Staged changes live only in the Streamlit session, so closing the tab or
+restarting the process loses whatever has not been written yet. The
+default autosave age is therefore a few seconds: long enough to coalesce
+a burst of "Save & Next" clicks, short enough that at most a few seconds
+of typing are at risk. Raise it to trade durability for fewer writes.
+
+The current registration is read through the result cache (row-tagged, so
+a reviewer's decision still shows up) with the unsaved changes overlaid,
+rather than queried on every rerun.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from src.database.models import Student
+from src.services.student_service import REGISTRATION_JSON_COLUMNS, load_registration, patch_registration
+
+
+class RegistrationDraft:
+    """Unsaved wizard changes for one registration, coalesced into one UPDATE"""
+
+    def __init__(self, student_id: int, autosave_seconds: float = 5.0):
+        self.student_id = student_id
+        self.autosave_seconds = max(float(autosave_seconds), 0.0)
+        self.step = 0
+        self._merge: Dict[str, Dict[str, Any]] = {}
+        self._values: Dict[str, Any] = {}
+        self._first_staged_at: Optional[float] = None
+        self.last_saved_at: Optional[float] = None
+        self.save_failed = False  # last flush found no registration to update
+        self.saves = 0
+        self.staged = 0
+
+    @property
+    def dirty(self) -> bool:
+        """True if there are changes not yet written to the database"""
+        return bool(self.step or self._merge or self._values)
+
+    def stage(
+        self,
+        step: Optional[int] = None,
+        merge: Optional[Dict[str, Dict[str, Any]]] = None,
+        values: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Buffer step data; same arguments as ``patch_registration()``
+
+        Later calls win: a merge into a column staged for replacement updates
+        the replacement, and a replacement discards earlier merges.
+        """
+        unknown = set(merge or {}) - set(REGISTRATION_JSON_COLUMNS)
+        if unknown:
+            raise ValueError(f"Not a mergeable JSON column: {', '.join(sorted(unknown))}")
+        for column, patch in (merge or {}).items():
+            if column in self._values:
+                self._values[column] = {**(self._values[column] or {}), **patch}
+            else:
+                self._merge[column] = {**self._merge.get(column, {}), **patch}
+        for column, value in (values or {}).items():
+            self._merge.pop(column, None)
+            self._values[column] = value
+        if step:
+            self.step = max(self.step, step)
+        if self._first_staged_at is None:
+            self._first_staged_at = time.monotonic()
+        self.staged += 1
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Seconds until the buffer should be saved (None when clean)"""
+        if not self.dirty:
+            return None
+        age = time.monotonic() - self._first_staged_at
+        return max(self.autosave_seconds - age, 0.0)
+
+    def flush(self) -> bool:
+        """
+        Write buffered changes now
+
+        The buffer is only cleared once the UPDATE succeeds, so a failed
+        save is retried on the next flush. If the UPDATE matches no row (the
+        registration was deleted), the changes stay buffered and
+        ``save_failed`` is set for the page to report.
+
+        Returns:
+            True if the buffered changes were saved
+        """
+        if not self.dirty:
+            return False
+        if not patch_registration(self.student_id, step=self.step or None, merge=self._merge, values=self._values):
+            self.save_failed = True
+            return False
+        self.save_failed = False
+        self.step = 0
+        self._merge = {}
+        self._values = {}
+        self._first_staged_at = None
+        self.last_saved_at = time.time()
+        self.saves += 1
+        return True
+
+    def flush_if_due(self) -> bool:
+        """Flush when the oldest unsaved change has reached the autosave age"""
+        if self.seconds_until_due() == 0.0:
+            return self.flush()
+        return False
+
+    def student(self) -> Optional[Student]:
+        """
+        The registration as the wizard should show it: saved row plus unsaved changes
+
+        Returns:
+            A transient Student (never add it to a session), or None if the
+            registration no longer exists
+        """
+        saved = load_registration(self.student_id)
+        if saved is None:
+            return None
+        fields = dict(saved)
+        for column, patch in self._merge.items():
+            fields[column] = {**(fields[column] or {}), **patch}
+        fields.update(self._values)
+        fields['registration_step'] = max(fields['registration_step'] or 0, self.step)
+        return Student(**fields)
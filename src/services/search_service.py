@@ -0,0 +1,138 @@
+"""
+Student search
+
+PostgreSQL: a weighted ``tsvector`` over names, admission number, guardian
+name and grade, matched with prefix ``tsquery`` terms and served by the
+idx_students_search GIN expression index (database_setup.sql).
+
+SQLite (local/test runs): an FTS5 table kept in sync with ``students`` by
+triggers, created with the students table (src/database/search_index.py).
+
+Both paths rank matches and return at most ``limit`` ids, so search cost
+tracks the number of matches rather than the size of the roster. Other
+databases, and SQLite databases without the FTS table, fall back to an
+unranked case-insensitive substring match ordered by name.
+"""
+
+import re
+from typing import List, Optional, Sequence
+
+from sqlalchemy import and_, or_, select, text
+
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.database.search_index import SQLITE_FTS_TABLE, sqlite_search_index_exists
+
+SEARCH_LIMIT = 50
+
+# Keep in sync with idx_students_search in database_setup.sql: the planner
+# only uses the index when the query repeats this expression exactly.
+# Punctuation is folded to spaces so "S-2026-0012" and "Mary-Jane" index as
+# separate words, matching how search terms are tokenized below.
+_PG_SEARCH_DOCUMENT = """(
+    setweight(to_tsvector('simple', regexp_replace(
+        coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(admission_number, ''),
+        '[^[:alnum:]]+', ' ', 'g')), 'A') ||
+    setweight(to_tsvector('simple', regexp_replace(
+        coalesce(preferred_name, ''), '[^[:alnum:]]+', ' ', 'g')), 'B') ||
+    setweight(to_tsvector('simple', regexp_replace(
+        coalesce(contact_info -> 'primary_guardian' ->> 'full_name', ''), '[^[:alnum:]]+', ' ', 'g')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(grade, '')), 'D')
+)"""
+
+# bm25() column weights, in SQLITE_FTS_COLUMNS order (mirrors the PG weights)
+_SQLITE_BM25_WEIGHTS = "10.0, 10.0, 10.0, 4.0, 2.0, 1.0"
+
+
+def search_terms(query: str) -> List[str]:
+    """Lower-cased alphanumeric words of a search box entry"""
+    return re.findall(r"[^\W_]+", (query or "").lower())
+
+
+def _search_postgresql(session, terms, statuses, limit) -> List[int]:
+    status_clause = "AND registration_status = ANY(:statuses)" if statuses else ""
+    rows = session.execute(
+        text(f"""
+            SELECT student_id
+            FROM students, to_tsquery('simple', :tsquery) AS query
+            WHERE {_PG_SEARCH_DOCUMENT} @@ query {status_clause}
+            ORDER BY ts_rank({_PG_SEARCH_DOCUMENT}, query) DESC, first_name, last_name, student_id
+            LIMIT :limit
+        """),
+        {
+            # Every word is a prefix match and all words must match
+            'tsquery': " & ".join(f"{term}:*" for term in terms),
+            'statuses': list(statuses or ()),
+            'limit': limit,
+        },
+    )
+    return [row.student_id for row in rows]
+
+
+def _search_sqlite(session, terms, statuses, limit) -> List[int]:
+    params = {
+        'match': " AND ".join(f'"{term}"*' for term in terms),
+        'limit': limit,
+    }
+    status_clause = ""
+    if statuses:
+        names = [f"status_{i}" for i in range(len(statuses))]
+        status_clause = f"AND students.registration_status IN ({', '.join(':' + n for n in names)})"
+        params.update(zip(names, statuses))
+    rows = session.execute(
+        text(f"""
+            SELECT students.student_id
+            FROM {SQLITE_FTS_TABLE}
+            JOIN students ON students.student_id = {SQLITE_FTS_TABLE}.rowid
+            WHERE {SQLITE_FTS_TABLE} MATCH :match {status_clause}
+            ORDER BY bm25({SQLITE_FTS_TABLE}, {_SQLITE_BM25_WEIGHTS}), students.first_name,
+                     students.last_name, students.student_id
+            LIMIT :limit
+        """),
+        params,
+    )
+    return [row.student_id for row in rows]
+
+
+def _search_like(session, terms, statuses, limit) -> List[int]:
+    # No index: every word must appear somewhere in a searchable column
+    columns = (Student.first_name, Student.last_name, Student.preferred_name, Student.admission_number, Student.grade)
+    stmt = select(Student.student_id).where(
+        and_(*(or_(*(column.ilike(f"%{term}%") for column in columns)) for term in terms))
+    )
+    if statuses:
+        stmt = stmt.where(Student.registration_status.in_(list(statuses)))
+    stmt = stmt.order_by(Student.first_name, Student.last_name, Student.student_id).limit(limit)
+    return list(session.scalars(stmt))
+
+
+def search_students(
+    query: str,
+    statuses: Optional[Sequence[str]] = None,
+    limit: int = SEARCH_LIMIT,
+) -> List[int]:
+    """
+    Find students by name, preferred name, admission number, guardian name or grade
+
+    Every word in ``query`` must match the start of an indexed word (or
+    appear anywhere in a name column, in the LIKE fallback).
+
+    Args:
+        query: Search box text
+        statuses: Restrict to these registration statuses (all when None)
+        limit: Maximum number of results
+
+    Returns:
+        Matching student ids, best match first (empty for a blank query)
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    with get_db_session(readonly=True) as session:
+        dialect = session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            return _search_postgresql(session, terms, statuses, limit)
+        if dialect == 'sqlite' and sqlite_search_index_exists(session.connection()):
+            return _search_sqlite(session, terms, statuses, limit)
+        return _search_like(session, terms, statuses, limit)
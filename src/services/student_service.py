@@ -0,0 +1,517 @@
+"""
+Student read models and registration workflow queries
+
+List views select only the columns they render; JSON profile blobs are
+loaded per student when a record is opened. List results are served from
+the process-wide result cache and invalidated by writes to the columns
+they show.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, any_, bindparam, cast, func, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import undefer_group
+
+from src.config.settings import get_settings
+from src.database.connection import async_db_session, get_db_session
+from src.database.models import Student, User
+from src.services.cache import cached, cached_async, rewrite_on_commit, touch
+
+# Registration statuses shown in the reviewer approval queue
+APPROVAL_QUEUE_STATUSES = ('pending_review', 'on_hold')
+
+# Decisions a reviewer can record with review_registrations()
+REVIEW_DECISIONS = ('approved', 'denied', 'on_hold', 'pending_review')
+
+# Approval queue columns that reviews and claims change
+_QUEUE_RETURNING = ('registration_status', 'claimed_by', 'claimed_until')
+
+# Cache tags: the columns each read model is built from
+_APPROVAL_QUEUE_TAGS = (
+    'students.admission_number', 'students.first_name', 'students.last_name',
+    'students.preferred_name', 'students.registration_status', 'students.created_at',
+    'students.created_by', 'students.claimed_by', 'students.claimed_until', 'users.name',
+)
+_ROSTER_TAGS = (
+    'students.admission_number', 'students.first_name', 'students.last_name',
+    'students.grade', 'students.section', 'students.registration_status',
+    'students.registration_step',
+)
+_ROSTER_FILTER_TAGS = ('students.grade', 'students.section')
+
+# Wizard step JSON columns that patch_registration() can merge into
+REGISTRATION_JSON_COLUMNS = ('contact_info', 'academic_info', 'medical_info', 'learning_profile')
+
+# Deferred column groups on Student
+STUDENT_DETAIL_GROUPS = ('contact', 'academic', 'medical', 'profile', 'notes')
+
+ROSTER_PAGE_SIZE = 50
+
+# Keyset cursor: (first_name, last_name, student_id) of the last row on a page
+RosterCursor = Tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class RosterPage:
+    """One page of the student roster"""
+    rows: List[dict]
+    next_cursor: Optional[RosterCursor]  # None on the last page
+
+
+def student_details(*groups: str) -> list:
+    """
+    Loader options that undefer Student column groups
+
+    Student JSON/notes columns are deferred, and sessions close before pages
+    render, so a detail view must undefer what it reads up front:
+
+        session.query(Student).options(*student_details('contact', 'notes'))
+
+    Args:
+        groups: Names from STUDENT_DETAIL_GROUPS; all groups when omitted
+
+    Returns:
+        List of loader options for ``Query.options()`` / ``Select.options()``
+    """
+    unknown = set(groups) - set(STUDENT_DETAIL_GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown Student column group(s): {', '.join(sorted(unknown))}")
+    return [undefer_group(group) for group in (groups or STUDENT_DETAIL_GROUPS)]
+
+
+def _approval_queue_stmt():
+    return (
+        select(
+            Student.student_id,
+            Student.admission_number,
+            Student.first_name,
+            Student.last_name,
+            Student.preferred_name,
+            Student.registration_status,
+            Student.created_at,
+            func.coalesce(User.name, 'Unknown').label('created_by'),
+            Student.claimed_by,
+            Student.claimed_until,
+        )
+        .outerjoin(User, User.user_id == Student.created_by)
+        .where(Student.registration_status.in_(APPROVAL_QUEUE_STATUSES))
+        .order_by(Student.created_at.desc())
+    )
+
+
+def list_approval_queue() -> List[dict]:
+    """
+    Registrations awaiting review, newest first
+
+    One statement regardless of queue length: list columns only, with the
+    creator's name joined in rather than lazy-loaded per row.
+
+    Returns:
+        List of dicts with student_id, admission_number, first_name,
+        last_name, preferred_name, registration_status, created_at,
+        created_by (creator name or 'Unknown') and the reviewer lease
+        (claimed_by, claimed_until)
+    """
+    def load():
+        # Primary, not replica: reviewers must see their own decisions immediately
+        with get_db_session() as session:
+            return [dict(row._mapping) for row in session.execute(_approval_queue_stmt())]
+
+    return cached(('approval_queue',), _APPROVAL_QUEUE_TAGS, load)
+
+
+async def list_approval_queue_async() -> List[dict]:
+    """list_approval_queue for gather_loaders (same cache entry, asyncpg on a miss)"""
+    async def load():
+        async with async_db_session() as session:
+            return [dict(row._mapping) for row in await session.execute(_approval_queue_stmt())]
+
+    return await cached_async(('approval_queue',), _APPROVAL_QUEUE_TAGS, load)
+
+
+def list_roster(
+    after: Optional[RosterCursor] = None,
+    page_size: int = ROSTER_PAGE_SIZE,
+    grade: Optional[str] = None,
+    section: Optional[str] = None,
+    registration_status: Optional[str] = None,
+) -> RosterPage:
+    """
+    One page of the student roster ordered by name
+
+    Keyset pagination on (first_name, last_name, student_id), served by
+    idx_students_roster, so every page costs the same regardless of depth.
+
+    Args:
+        after: Cursor from the previous page's ``next_cursor`` (None for the first page)
+        page_size: Rows per page
+        grade, section, registration_status: Optional exact-match filters
+
+    Returns:
+        RosterPage with list-column dicts and the cursor for the next page
+    """
+    sort_key = (Student.first_name, Student.last_name, Student.student_id)
+    stmt = select(
+        Student.student_id,
+        Student.admission_number,
+        Student.first_name,
+        Student.last_name,
+        Student.grade,
+        Student.section,
+        Student.registration_status,
+        Student.registration_step,
+    )
+    if grade:
+        stmt = stmt.where(Student.grade == grade)
+    if section:
+        stmt = stmt.where(Student.section == section)
+    if registration_status:
+        stmt = stmt.where(Student.registration_status == registration_status)
+    if after is not None:
+        stmt = stmt.where(tuple_(*sort_key) > tuple_(*after))
+    # One extra row tells us whether there is a next page
+    stmt = stmt.order_by(*sort_key).limit(page_size + 1)
+
+    def load():
+        # Primary, not replica: a write invalidates this entry on commit, and a
+        # replica lagging behind it would put the old rows back in the cache
+        with get_db_session() as session:
+            rows = [dict(row._mapping) for row in session.execute(stmt)]
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = (last['first_name'], last['last_name'], last['student_id'])
+        return RosterPage(rows=rows, next_cursor=next_cursor)
+
+    key = ('roster', after, page_size, grade, section, registration_status)
+    return cached(key, _ROSTER_TAGS, load)
+
+
+def roster_filter_options() -> dict:
+    """
+    Distinct values for the roster filters
+
+    Returns:
+        dict with sorted 'grades' and 'sections' lists
+    """
+    def load():
+        # Primary, not replica: a write invalidates this entry on commit, and a
+        # replica lagging behind it would put the old rows back in the cache
+        with get_db_session() as session:
+            grades = session.scalars(
+                select(Student.grade).where(Student.grade.isnot(None)).distinct().order_by(Student.grade)
+            ).all()
+            sections = session.scalars(
+                select(Student.section).where(Student.section.isnot(None)).distinct().order_by(Student.section)
+            ).all()
+        return {'grades': list(grades), 'sections': list(sections)}
+
+    return cached(('roster_filter_options',), _ROSTER_FILTER_TAGS, load)
+
+
+def load_registration(student_id: int) -> Optional[dict]:
+    """
+    Every column of one student, for the registration wizard
+
+    Cached per student and tagged with the row, so it is reloaded only
+    after that student changes (here or in another app process).
+
+    Returns:
+        dict of column values, or None if the student doesn't exist
+    """
+    stmt = select(*Student.__table__.c).where(Student.student_id == student_id)
+
+    def load():
+        # Primary, not replica: the wizard re-reads what it just saved
+        with get_db_session() as session:
+            row = session.execute(stmt).first()
+            return dict(row._mapping) if row else None
+
+    return cached(('registration', student_id), (f"students#{student_id}",), load)
+
+
+def _json_merge(column, patch: Dict[str, Any], dialect: str):
+    """SQL expression for ``column`` with the top-level keys of ``patch`` replaced"""
+    if dialect == 'postgresql':
+        return func.coalesce(cast(column, JSONB), cast(literal('{}'), JSONB)).op('||')(
+            literal(patch, JSONB)
+        )
+    # SQLite JSON1: one json_set() path per top-level key
+    args = []
+    for key, value in patch.items():
+        args.extend([f'$."{key}"', func.json(json.dumps(value))])
+    return func.json_set(func.coalesce(column, '{}'), *args)
+
+
+def patch_registration(
+    student_id: int,
+    step: Optional[int] = None,
+    merge: Optional[Dict[str, Dict[str, Any]]] = None,
+    values: Optional[Dict[str, Any]] = None,
+    version: Optional[int] = None,
+) -> bool:
+    """
+    Save registration wizard data in a single UPDATE, without reading the row
+
+    JSON columns in ``merge`` keep the keys the patch doesn't mention
+    (``col || patch`` on PostgreSQL, ``json_set`` on SQLite); ``values``
+    replace columns outright. ``registration_step`` only ever moves
+    forward (``GREATEST``), so going back to edit an earlier step doesn't
+    lower it. Every update bumps the registration's version; nothing else
+    (review state, reviewer claims) is touched.
+
+    Args:
+        student_id: Registration to update
+        step: Wizard step just completed
+        merge: Column name -> dict of top-level keys to set, for
+            REGISTRATION_JSON_COLUMNS
+        values: Column name -> new value (plain columns or whole JSON documents)
+        version: Only update if the registration is still at this version
+            (optimistic locking); its new version is then ``version + 1``
+
+    Returns:
+        True if the registration exists (at ``version``, when given) and was updated
+    """
+    merge = {column: patch for column, patch in (merge or {}).items() if patch}
+    values = dict(values or {})
+    unknown = set(merge) - set(REGISTRATION_JSON_COLUMNS)
+    if unknown:
+        raise ValueError(f"Not a mergeable JSON column: {', '.join(sorted(unknown))}")
+    if not (merge or values or step):
+        return False
+
+    with get_db_session() as session:
+        dialect = session.get_bind().dialect.name
+        columns = Student.__table__.c
+        assignments = {columns[name]: value for name, value in values.items()}
+        for name, patch in merge.items():
+            assignments[columns[name]] = _json_merge(columns[name], patch, dialect)
+        if step:
+            greatest = func.greatest if dialect == 'postgresql' else func.max
+            assignments[columns.registration_step] = greatest(
+                func.coalesce(columns.registration_step, 0), step
+            )
+        assignments[columns.version] = columns.version + 1
+
+        # Core statement on the session's connection: no ORM load, and the
+        # changed columns are reported to the result cache precisely below
+        id_filter = columns.student_id == student_id
+        if version is not None:
+            id_filter = id_filter & (columns.version == version)
+        result = session.connection().execute(
+            update(Student.__table__)
+            .where(id_filter)
+            .values(assignments)
+        )
+        if not result.rowcount:
+            return False
+        touch(
+            session,
+            *(f"students.{column.name}#{student_id}" for column in assignments),
+            f"students.updated_at#{student_id}",
+        )
+        return True
+
+
+def _approval_queue_after(changed: Dict[int, Dict[str, Any]]):
+    """Rewrite for the cached approval queue from UPDATE ... RETURNING rows keyed by student_id"""
+    def rewrite(queue: List[dict]) -> List[dict]:
+        rows = []
+        for row in queue:
+            if row['student_id'] in changed:
+                row = {**row, **changed[row['student_id']]}
+            if row['registration_status'] in APPROVAL_QUEUE_STATUSES:
+                rows.append(row)
+        return rows
+    return rewrite
+
+
+def _returned_rows(session, result, changed_columns) -> List[dict]:
+    """Rows from a Core UPDATE ... RETURNING on students, reported to the result cache"""
+    rows = [dict(row._mapping) for row in result]
+    if rows:
+        touch(
+            session,
+            *(f"students.{name}#{row['student_id']}" for row in rows for name in changed_columns),
+        )
+        rewrite_on_commit(
+            session,
+            ('approval_queue',),
+            _approval_queue_after({
+                row['student_id']: {name: row[name] for name in _QUEUE_RETURNING if name in row}
+                for row in rows
+            }),
+        )
+    return rows
+
+
+def review_registrations(
+    student_ids: List[int],
+    decision: str,
+    reviewer_id: Optional[int],
+    internal_notes: Optional[str] = None,
+    parent_notes: Optional[str] = None,
+    versions: Optional[Dict[int, int]] = None,
+) -> List[dict]:
+    """
+    Record a review decision for many registrations in one UPDATE
+
+    ``UPDATE ... WHERE student_id = ANY(:ids) RETURNING`` on PostgreSQL (a
+    single array parameter, so the statement text is the same for any
+    number of ids); ``IN (...)`` elsewhere. Only registrations still in the
+    approval queue are updated, so a registration another reviewer has
+    already approved or denied is left alone. Approving also makes the
+    student active; any reviewer claim is released.
+
+    With ``versions``, each registration is only updated if its version is
+    still the one the reviewer loaded (optimistic locking): an edit or
+    review that landed in between makes it drop out of the result instead
+    of being overwritten.
+
+    The returned rows are used to bring the cached approval queue up to
+    date in place, so the next render doesn't reload it.
+
+    Args:
+        student_ids: Registrations to decide
+        decision: One of REVIEW_DECISIONS
+        reviewer_id: user_id recorded as reviewed_by
+        internal_notes: Staff notes for every registration (None keeps each one's own)
+        parent_notes: Parent/guardian notes for every registration (None keeps each one's own)
+        versions: student_id -> version the reviewer saw, to detect lost updates
+
+    Returns:
+        List of dicts with student_id, registration_status, status and
+        the new version for the registrations actually updated
+    """
+    if decision not in REVIEW_DECISIONS:
+        raise ValueError(f"Unknown review decision '{decision}'")
+    student_ids = sorted({int(student_id) for student_id in student_ids})
+    if not student_ids:
+        return []
+
+    columns = Student.__table__.c
+    assignments = {
+        columns.registration_status: decision,
+        columns.reviewed_by: reviewer_id,
+        columns.reviewed_at: datetime.utcnow(),
+        columns.claimed_by: None,
+        columns.claimed_until: None,
+        columns.version: columns.version + 1,
+    }
+    if decision == 'approved':
+        assignments[columns.status] = 'active'
+    if internal_notes is not None:
+        assignments[columns.internal_notes] = internal_notes
+    if parent_notes is not None:
+        assignments[columns.parent_notes] = parent_notes
+
+    with get_db_session() as session:
+        if versions is not None:
+            id_filter = tuple_(columns.student_id, columns.version).in_(
+                [(student_id, versions[student_id]) for student_id in student_ids if student_id in versions]
+            )
+        elif session.get_bind().dialect.name == 'postgresql':
+            id_filter = columns.student_id == any_(
+                bindparam('ids', student_ids, type_=ARRAY(Integer))
+            )
+        else:
+            id_filter = columns.student_id.in_(student_ids)
+        result = session.connection().execute(
+            update(Student.__table__)
+            .where(id_filter, columns.registration_status.in_(APPROVAL_QUEUE_STATUSES))
+            .values(assignments)
+            .returning(
+                columns.student_id, columns.registration_status, columns.status,
+                columns.claimed_by, columns.claimed_until, columns.version,
+            )
+        )
+        return _returned_rows(session, result, [column.name for column in assignments] + ['updated_at'])
+
+
+def claim_next_registration(reviewer_id: int, lease_seconds: Optional[float] = None) -> Optional[dict]:
+    """
+    Lease the next pending registration to a reviewer
+
+    One statement: the oldest ``pending_review`` registration that nobody
+    holds an unexpired claim on is picked with ``FOR UPDATE SKIP LOCKED``,
+    so reviewers claiming at the same moment each get a different one
+    without waiting on each other's locks. A reviewer who already holds a
+    claim gets that registration back, with the lease renewed. Leases
+    simply expire, so an abandoned claim returns to the pool by itself.
+    (SQLite has no row locks; its single writer gives the same result.)
+
+    Claiming doesn't change the registration's version.
+
+    Args:
+        reviewer_id: user_id of the reviewer
+        lease_seconds: Lease length (default: settings.review_claim_lease_seconds)
+
+    Returns:
+        dict with student_id, registration_status, claimed_by, claimed_until
+        and version, or None if nothing is waiting
+    """
+    if reviewer_id is None:
+        raise ValueError("A reviewer is required to claim a registration")
+    if lease_seconds is None:
+        lease_seconds = get_settings().review_claim_lease_seconds
+    now = datetime.utcnow()
+    columns = Student.__table__.c
+    pending = columns.registration_status == 'pending_review'
+    own_claim = (
+        select(columns.student_id)
+        .where(pending, columns.claimed_by == reviewer_id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    # Oldest unclaimed first; walks idx_students_review_queue and stops at
+    # the first row that isn't locked by another reviewer's claim
+    next_unclaimed = (
+        select(columns.student_id)
+        .where(pending, or_(columns.claimed_until.is_(None), columns.claimed_until < now))
+        .order_by(columns.created_at, columns.student_id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    assignments = {
+        columns.claimed_by: reviewer_id,
+        columns.claimed_until: now + timedelta(seconds=lease_seconds),
+    }
+    with get_db_session() as session:
+        result = session.connection().execute(
+            update(Student.__table__)
+            .where(columns.student_id == func.coalesce(own_claim, next_unclaimed))
+            .values(assignments)
+            .returning(
+                columns.student_id, columns.registration_status,
+                columns.claimed_by, columns.claimed_until, columns.version,
+            )
+        )
+        rows = _returned_rows(session, result, [column.name for column in assignments] + ['updated_at'])
+        return rows[0] if rows else None
+
+
+def release_registration_claim(student_id: int, reviewer_id: int) -> bool:
+    """
+    Give a claimed registration back to the pool before its lease ends
+
+    Returns:
+        True if the reviewer held the claim
+    """
+    columns = Student.__table__.c
+    assignments = {columns.claimed_by: None, columns.claimed_until: None}
+    with get_db_session() as session:
+        result = session.connection().execute(
+            update(Student.__table__)
+            .where(columns.student_id == student_id, columns.claimed_by == reviewer_id)
+            .values(assignments)
+            .returning(columns.student_id, columns.registration_status, columns.claimed_by, columns.claimed_until)
+        )
+        return bool(_returned_rows(session, result, [column.name for column in assignments] + ['updated_at']))
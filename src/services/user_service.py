@@ -0,0 +1,118 @@
+"""
+User lookup for the Admin Panel and staff dropdowns
+
+Searches are prefix matches on lower(name) / lower(email), served by the
+text_pattern_ops indexes in database_setup.sql, and pages are keyset
+paginated on user_id (newest first) so they stay cheap however many
+accounts exist. Results are served from the process-wide result cache.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import func, or_, select
+
+from src.database.connection import get_db_session
+from src.database.models import User
+from src.services.cache import cached
+
+USER_PAGE_SIZE = 25
+
+# Roles offered as class teachers in the registration wizard
+TEACHER_ROLES = ('teacher', 'therapist', 'special_educator')
+
+# Cache tags: the columns each read model is built from
+_USER_LIST_TAGS = ('users.name', 'users.email', 'users.role', 'users.is_active', 'users.last_login')
+_TEACHER_TAGS = ('users.name', 'users.role')
+
+
+@dataclass(frozen=True)
+class UserPage:
+    """One page of user lookup results"""
+    rows: List[dict]
+    next_cursor: Optional[int]  # user_id to continue after; None on the last page
+
+
+def _like_prefix(value: str) -> str:
+    """LIKE pattern matching strings that start with ``value`` literally"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%"
+
+
+def search_users(
+    query: Optional[str] = None,
+    role: Optional[str] = None,
+    after: Optional[int] = None,
+    page_size: int = USER_PAGE_SIZE,
+) -> UserPage:
+    """
+    One page of users, newest first
+
+    Args:
+        query: Case-insensitive prefix of the user's name or email
+        role: Restrict to one role key
+        after: Cursor from the previous page's ``next_cursor``
+        page_size: Rows per page
+
+    Returns:
+        UserPage with user_id, name, email, role, is_active, created_at and
+        last_login per row (never the password hash)
+    """
+    stmt = select(
+        User.user_id,
+        User.name,
+        User.email,
+        User.role,
+        User.is_active,
+        User.created_at,
+        User.last_login,
+    )
+    query = (query or '').strip().lower()
+    if query:
+        pattern = _like_prefix(query)
+        stmt = stmt.where(or_(
+            func.lower(User.name).like(pattern, escape='\\'),
+            func.lower(User.email).like(pattern, escape='\\'),
+        ))
+    if role:
+        stmt = stmt.where(User.role == role)
+    if after is not None:
+        stmt = stmt.where(User.user_id < after)
+    # One extra row tells us whether there is a next page
+    stmt = stmt.order_by(User.user_id.desc()).limit(page_size + 1)
+
+    def load():
+        # Primary, not replica: a write invalidates this entry on commit, and a
+        # replica lagging behind it would put the old rows back in the cache
+        with get_db_session() as session:
+            rows = [dict(row._mapping) for row in session.execute(stmt)]
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = rows[-1]['user_id']
+        return UserPage(rows=rows, next_cursor=next_cursor)
+
+    return cached(('users', query, role or None, after, page_size), _USER_LIST_TAGS, load)
+
+
+def list_teachers() -> List[dict]:
+    """
+    Staff who can be assigned as class teacher, by name
+
+    Returns:
+        List of dicts with user_id and name
+    """
+    stmt = (
+        select(User.user_id, User.name)
+        .where(User.role.in_(TEACHER_ROLES))
+        .order_by(User.name)
+    )
+
+    def load():
+        # Primary, not replica: a write invalidates this entry on commit, and a
+        # replica lagging behind it would put the old rows back in the cache
+        with get_db_session() as session:
+            return [dict(row._mapping) for row in session.execute(stmt)]
+
+    return cached(('teachers',), _TEACHER_TAGS, load)
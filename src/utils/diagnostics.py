@@ -2,15 +2,24 @@
 Database connection diagnostics
 Runs automatically at app startup to verify database connectivity.
 
+Checks run on a process-wide background thread (see `HealthMonitor`) at a
+configurable interval; `run_diagnostics()` returns the latest cached
+snapshot, so browser sessions never pay for a round trip of their own.
+
 IMPORTANT: This module uses the same configuration loader as the main
-application (`src.config.settings.load_config`) so diagnostics and the
+application (`src.config.settings.get_settings`) so diagnostics and the
 app always use the **exact same** DATABASE_URL and settings.
 """
 
+import copy
 import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
 from typing import Tuple, Optional
 from dotenv import load_dotenv
-from src.config.settings import load_config
+from src.config.settings import get_settings
 
 # Load environment variables for local development (same as settings.py)
 load_dotenv()
@@ -44,9 +53,9 @@ def check_database_config() -> Tuple[bool, Optional[str], Optional[str]]:
     """
     try:
         # Use the same configuration logic as the main app
-        config = load_config()
-        database_url = config.get("database_url")
-        source = config.get("_config_source", "unknown")
+        config = get_settings()
+        database_url = config.database_url
+        source = config.config_source
     except Exception:
         database_url = None
         source = "Not configured"
@@ -63,15 +72,21 @@ def check_database_config() -> Tuple[bool, Optional[str], Optional[str]]:
     return True, display_url, source
 
 
-def test_database_connection() -> Tuple[bool, str, Optional[str]]:
+def test_database_connection(latency: Optional[dict] = None) -> Tuple[bool, str, Optional[str]]:
     """
     Test database connection
     
+    Args:
+        latency: Optional dict that receives ``connect_ms`` (fresh connection),
+            ``checkout_ms`` (pool checkout) and ``query_ms`` (SELECT 1 round trip)
+    
     Returns:
         (success, message, details)
     """
+    latency = latency if latency is not None else {}
     try:
-        from src.database.connection import get_db_session, _get_engine
+        from src.database.connection import get_db_session, _get_engine, get_circuit_breaker, measure_connect_time
+        from src.database.circuit_breaker import CLOSED
         from sqlalchemy import text
         
         # Check if engine can be initialized
@@ -80,7 +95,14 @@ def test_database_connection() -> Tuple[bool, str, Optional[str]]:
             return False, "Database engine not initialized", None
         
         # Test connection
+        checkout_start = time.perf_counter()
         with get_db_session() as session:
+            latency['checkout_ms'] = (time.perf_counter() - checkout_start) * 1000
+
+            query_start = time.perf_counter()
+            session.execute(text("SELECT 1"))
+            latency['query_ms'] = (time.perf_counter() - query_start) * 1000
+
             # Test query
             result = session.execute(text("SELECT version();"))
             version = result.scalar()
@@ -100,8 +122,12 @@ def test_database_connection() -> Tuple[bool, str, Optional[str]]:
                 details += f"\nFound {len(tables)} table(s): {', '.join(tables)}"
             else:
                 details += "\n⚠ No tables found - you may need to run database migrations"
+
+        # Fresh connection (TLS + auth), only while the database is known to be up
+        if get_circuit_breaker().state == CLOSED:
+            latency['connect_ms'] = measure_connect_time(db_engine) * 1000
             
-            return True, "Connection successful", details
+        return True, "Connection successful", details
             
     except ImportError as e:
         return False, f"Could not import database modules: {e}", None
@@ -111,12 +137,12 @@ def test_database_connection() -> Tuple[bool, str, Optional[str]]:
         return False, f"Error: {type(e).__name__}", str(e)
 
 
-def run_diagnostics() -> dict:
+def _check_now() -> dict:
     """
-    Run complete database diagnostics
+    Run the complete set of database checks
     
     Returns:
-        Dictionary with diagnostic results
+        Dictionary with diagnostic results and the latency of this check
     """
     results = {
         'config_ok': False,
@@ -124,7 +150,10 @@ def run_diagnostics() -> dict:
         'database_url': None,
         'config_source': None,
         'message': None,
-        'details': None
+        'details': None,
+        'circuit_breakers': {},
+        'checked_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'latency': {}
     }
     
     # Check configuration
@@ -138,10 +167,139 @@ def run_diagnostics() -> dict:
         return results
     
     # Test connection
-    connection_ok, message, details = test_database_connection()
+    latency = {}
+    connection_ok, message, details = test_database_connection(latency)
     results['connection_ok'] = connection_ok
     results['message'] = message
     results['details'] = details
+    results['latency'] = {k: round(v, 2) for k, v in latency.items()}
+
+    try:
+        from src.database.connection import get_circuit_breaker_states
+        results['circuit_breakers'] = get_circuit_breaker_states()
+    except ImportError:
+        pass
     
     return results
 
+
+class HealthMonitor:
+    """
+    Process-wide database health monitor
+
+    Re-runs `_check_now()` on a daemon thread every ``interval`` seconds and
+    keeps a bounded latency history. Readers get the cached snapshot.
+    """
+
+    def __init__(self, interval: float = 60.0, history_size: int = 60):
+        self.interval = max(float(interval), 1.0)
+        self._lock = threading.Lock()
+        self._first_check_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot: Optional[dict] = None
+        self._history = deque(maxlen=max(int(history_size), 1))
+
+    def refresh(self) -> dict:
+        """Run the checks now and store the result"""
+        results = _check_now()
+        sample = {'checked_at': results['checked_at'], 'ok': results['connection_ok']}
+        sample.update(results['latency'])
+        with self._lock:
+            self._history.append(sample)
+            self._snapshot = results
+        return results
+
+    def history(self) -> list:
+        """Latency samples, oldest first"""
+        with self._lock:
+            return list(self._history)
+
+    def snapshot(self) -> dict:
+        """
+        Latest cached results plus latency history and pool warm-up state
+
+        The first caller in the process runs the checks synchronously so it
+        never sees an empty snapshot; everyone after reads the cache.
+        """
+        if self._snapshot is None:
+            with self._first_check_lock:
+                # Another session may have finished the first check meanwhile
+                if self._snapshot is None:
+                    self.refresh()
+        self.start()
+
+        with self._lock:
+            result = copy.deepcopy(self._snapshot)
+            result['latency_history'] = list(self._history)
+        checked_at = datetime.fromisoformat(result['checked_at'])
+        result['age_seconds'] = round((datetime.utcnow() - checked_at).total_seconds(), 1)
+        # Live rather than cached: warm-ups happen between checks
+        try:
+            from src.database.pool_warmer import get_pool_warmer
+            result['pool_warmup'] = get_pool_warmer().snapshot()
+        except ImportError:
+            result['pool_warmup'] = None
+        return result
+
+    def start(self):
+        """Start the background thread (no-op if already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._wake.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="seims-health-monitor", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Ask the background thread to exit after the current check"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._wake.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Warning: database health check failed: {e}")
+
+
+_monitor: Optional[HealthMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get or create the process-wide health monitor"""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                config = get_settings()
+                _monitor = HealthMonitor(
+                    interval=config.diagnostics_interval_seconds,
+                    history_size=config.diagnostics_history_size,
+                )
+    return _monitor
+
+
+def run_diagnostics(force_refresh: bool = False) -> dict:
+    """
+    Get database diagnostics
+    
+    Returns the health monitor's cached snapshot (refreshed in the
+    background every DIAGNOSTICS_INTERVAL_SECONDS), so this is instant
+    for every session after the first.
+    
+    Args:
+        force_refresh: Run the checks now instead of using the cache
+    
+    Returns:
+        Dictionary with diagnostic results, latest latency and latency history
+    """
+    monitor = get_health_monitor()
+    if force_refresh:
+        monitor.refresh()
+    return monitor.snapshot()
@@ -0,0 +1,82 @@
+"""
+Lazily rendered tabs
+
+``st.tabs`` runs every tab body on every rerun and only hides the inactive
+ones in the browser, so a page pays for the queries of tabs nobody is
+looking at. ``lazy_tabs`` draws the tab bar as a widget instead and returns
+the active label; the page renders just that body:
+
+    active = lazy_tabs(["Student List", "Register New Student"], key="students_tab")
+    if active == "Student List":
+        ...
+
+The selection is kept in session state, so reruns (and ``st.rerun()``)
+stay on the same tab.
+
+``fetch_once`` shares a loader's result between the sections of one rerun
+that need the same data; the next rerun loads it again.
+"""
+
+from typing import Any, Callable, Hashable, List, Optional
+
+import streamlit as st
+
+from src.utils.script_run import current_run_state
+
+
+def lazy_tabs(labels: List[str], key: str, default: Optional[str] = None, label: str = "View") -> str:
+    """
+    Tab bar whose inactive tabs don't run
+
+    Args:
+        labels: Tab labels, in order
+        key: Session state key holding the active label
+        default: Label active on first render (defaults to the first)
+        label: Accessible label for the control (not shown)
+
+    Returns:
+        The active tab's label
+    """
+    labels = list(labels)
+    last_key = f"{key}__last"
+    if st.session_state.get(key) not in labels:
+        st.session_state[key] = default if default in labels else labels[0]
+
+    def _keep_selection():
+        # Clicking the active segment deselects it; keep the tab open instead
+        if st.session_state.get(key) not in labels:
+            st.session_state[key] = st.session_state.get(last_key, labels[0])
+
+    if hasattr(st, "segmented_control"):
+        st.segmented_control(label, labels, key=key, on_change=_keep_selection, label_visibility="collapsed")
+    else:
+        st.radio(label, labels, key=key, horizontal=True, label_visibility="collapsed")
+    active = st.session_state[key]
+    st.session_state[last_key] = active
+    return active
+
+
+def fetch_once(key: Hashable, loader: Callable[[], Any]) -> Any:
+    """
+    Run ``loader`` at most once per rerun for ``key``
+
+    Later calls with the same key during the same rerun get the first
+    stored result. The loader runs outside the rerun's lock, so a slow
+    load never blocks other keys; if two threads race on one key, both
+    load and the first to finish wins. Failures aren't remembered. Outside
+    a Streamlit script the loader simply runs.
+
+    Args:
+        key: Identifies the data, including every argument that changes it
+        loader: Zero-argument function returning the data
+    """
+    state = current_run_state()
+    if state is None:
+        return loader()
+    with state.lock:
+        memo = state.setdefault("fetch_once", {})
+        if key in memo:
+            return memo[key]
+    result = loader()
+    with state.lock:
+        return memo.setdefault(key, result)
@@ -0,0 +1,168 @@
+"""
+Streamlit script run identification
+
+Every Streamlit rerun executes the page script in a fresh module namespace,
+so the page's module-level frame identifies both the page being rendered and
+the individual rerun. This lets database helpers attribute work to a page
+without depending on Streamlit internals.
+
+Finding that frame means walking the stack, so the result is cached on the
+thread's ScriptRunContext and reused until Streamlit resets the context for
+the next rerun; queries then cost an attribute lookup instead of a walk.
+
+Work a page hands off to other threads or the async loop
+(src/database/async_runner.py) has no page frame on its stack; it carries
+the run in a context variable instead (``attributed_to``).
+
+``current_run_state()`` is scratch space that lives exactly as long as one
+rerun: it is stored in the rerun's module namespace and discarded with it.
+"""
+
+import contextvars
+import itertools
+import os
+import sys
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PAGES_DIR = os.path.join(_PROJECT_ROOT, "pages") + os.sep
+_APP_SCRIPT = os.path.join(_PROJECT_ROOT, "app.py")
+
+_RUN_ID_KEY = "__seims_script_run_id__"
+_RUN_STATE_KEY = "__seims_script_run_state__"
+_CTX_CACHE_ATTR = "_seims_script_run"
+_run_ids = itertools.count(1)
+
+_delegated_run: contextvars.ContextVar = contextvars.ContextVar("seims_script_run", default=None)
+
+
+class ScriptRun(NamedTuple):
+    """The page script currently executing and the id of this rerun"""
+    page: str
+    run_id: int
+
+
+def _is_page_script(filename: str) -> bool:
+    filename = os.path.abspath(filename)
+    return filename == _APP_SCRIPT or filename.startswith(_PAGES_DIR)
+
+
+class RunState(dict):
+    """Per-rerun scratch space (see ``current_run_state``)"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.RLock()
+
+
+# run_id -> RunState of reruns that are still alive, for delegated work
+_run_states: "weakref.WeakValueDictionary[int, RunState]" = weakref.WeakValueDictionary()
+_run_states_lock = threading.Lock()
+
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # pragma: no cover - CLI tools without Streamlit
+    get_script_run_ctx = None
+
+
+def _script_run_ctx():
+    if get_script_run_ctx is None:
+        return None
+    return get_script_run_ctx(suppress_warning=True)
+
+
+def _page_frame():
+    """Outermost page/app script frame on this thread's stack (or None)"""
+    page_frame = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "<module>" and _is_page_script(code.co_filename):
+            page_frame = frame
+        frame = frame.f_back
+    return page_frame
+
+
+def _stamp(page_frame) -> ScriptRun:
+    # The module namespace is recreated on every rerun, so stamping it
+    # gives each rerun a stable, process-unique id.
+    run_globals = page_frame.f_globals
+    run_id = run_globals.get(_RUN_ID_KEY)
+    if run_id is None:
+        run_id = next(_run_ids)
+        run_globals[_RUN_ID_KEY] = run_id
+    return ScriptRun(os.path.basename(page_frame.f_code.co_filename), run_id)
+
+
+def _resolve_page():
+    """
+    (ScriptRun, module namespace) of the page executing on this thread, or None
+
+    The stack is walked once per rerun: ``ScriptRunContext.reset()`` gives
+    the context a new ``cursors`` dict at the start of every rerun, which
+    invalidates the cached result. A miss (widget callbacks run before the
+    page body) is not cached, so the page frame is still found once it runs.
+    """
+    ctx = _script_run_ctx()
+    if ctx is not None:
+        cached = getattr(ctx, _CTX_CACHE_ATTR, None)
+        if cached is not None and cached[0] is ctx.cursors:
+            return cached[1]
+    page_frame = _page_frame()
+    if page_frame is None:
+        return None
+    resolved = (_stamp(page_frame), page_frame.f_globals)
+    if ctx is not None:
+        setattr(ctx, _CTX_CACHE_ATTR, (ctx.cursors, resolved))
+    return resolved
+
+
+def current_script_run() -> Optional[ScriptRun]:
+    """
+    Return the page script run on the current call stack
+
+    Returns:
+        ScriptRun for the outermost page/app script frame, the run the
+        current context is ``attributed_to``, or None when called outside
+        a Streamlit script (CLI tools, background threads).
+    """
+    resolved = _resolve_page()
+    if resolved is None:
+        return _delegated_run.get()
+    return resolved[0]
+
+
+def current_run_state() -> Optional[RunState]:
+    """
+    Scratch space for the current rerun
+
+    Returns:
+        The same RunState for every call during one rerun (including work
+        ``attributed_to`` it on other threads), a fresh one on the next
+        rerun, or None outside a Streamlit script.
+    """
+    resolved = _resolve_page()
+    if resolved is None:
+        run = _delegated_run.get()
+        return _run_states.get(run.run_id) if run is not None else None
+    run, run_globals = resolved
+    state = run_globals.get(_RUN_STATE_KEY)
+    if state is None:
+        with _run_states_lock:
+            state = run_globals.setdefault(_RUN_STATE_KEY, RunState())
+            _run_states[run.run_id] = state
+    return state
+
+
+@contextmanager
+def attributed_to(run: Optional[ScriptRun]):
+    """Attribute work in this context (and tasks/threads started from it) to ``run``"""
+    token = _delegated_run.set(run)
+    try:
+        yield
+    finally:
+        _delegated_run.reset(token)
@@ -0,0 +1,32 @@
+"""
+Shared fixtures: every test runs against a fresh in-memory SQLite database
+"""
+
+import os
+import sys
+
+# Never reach the DATABASE_URL in .env; set before anything reads settings
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['DATABASE_READ_URL'] = ''
+os.environ['CACHE_BUS_MODE'] = 'off'
+os.environ['DB_POOL_WARM_CONNECTIONS'] = '0'
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from src.database.connection import _get_engine, dispose_engines  # noqa: E402
+from src.database.models import Base  # noqa: E402
+from src.services.cache import get_result_cache  # noqa: E402
+
+
+@pytest.fixture
+def db_engine():
+    """Engine of an empty database with every table created"""
+    dispose_engines()
+    get_result_cache().clear()
+    engine, _ = _get_engine()
+    Base.metadata.create_all(engine)
+    yield engine
+    get_result_cache().clear()
+    dispose_engines()
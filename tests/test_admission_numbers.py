@@ -0,0 +1,66 @@
+"""
+Admission numbers on SQLite: before_insert hook, block reservation, past 9999
+"""
+
+from datetime import date
+
+from src.database.admission_numbers import format_admission_number, reserve_admission_numbers
+from src.database.connection import get_db_session
+from src.database.models import Student
+
+YEAR = date.today().year
+
+
+def _add_student(session, **values) -> Student:
+    student = Student(
+        first_name="Ada", last_name="Lovelace", date_of_birth=date(2015, 1, 1), enrollment_date=date(2024, 9, 1),
+        **values,
+    )
+    session.add(student)
+    session.flush()
+    return student
+
+
+def test_before_insert_assigns_numbers_in_order(db_engine):
+    with get_db_session() as session:
+        numbers = [_add_student(session).admission_number for _ in range(3)]
+        explicit = _add_student(session, admission_number="IMPORTED-1").admission_number
+
+    assert numbers == [f"S-{YEAR}-0001", f"S-{YEAR}-0002", f"S-{YEAR}-0003"]
+    assert explicit == "IMPORTED-1"
+
+
+def test_block_reservation_continues_the_year(db_engine):
+    with get_db_session() as session:
+        _add_student(session)
+        block = reserve_admission_numbers(session.connection(), 3)
+        after = _add_student(session).admission_number
+        other_year = reserve_admission_numbers(session.connection(), 2, year=2019)
+
+    assert block == [f"S-{YEAR}-0002", f"S-{YEAR}-0003", f"S-{YEAR}-0004"]
+    assert after == f"S-{YEAR}-0005"
+    assert other_year == ["S-2019-0001", "S-2019-0002"]
+    assert reserve_admission_numbers(None, 0) == []
+
+
+def test_numbers_grow_past_9999(db_engine):
+    # A database numbered before the counters existed continues after its highest number
+    with get_db_session() as session:
+        _add_student(session, admission_number=f"S-{YEAR}-9999")
+        assert _add_student(session).admission_number == f"S-{YEAR}-10000"
+        assert reserve_admission_numbers(session.connection(), 2) == [f"S-{YEAR}-10001", f"S-{YEAR}-10002"]
+
+    assert format_admission_number(2026, 42) == "S-2026-0042"
+    assert format_admission_number(2026, 123456) == "S-2026-123456"
+
+
+def test_rollback_releases_reserved_numbers(db_engine):
+    try:
+        with get_db_session() as session:
+            reserve_admission_numbers(session.connection(), 5)
+            raise RuntimeError("import failed")
+    except RuntimeError:
+        pass
+
+    with get_db_session() as session:
+        assert _add_student(session).admission_number == f"S-{YEAR}-0001"
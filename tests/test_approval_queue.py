@@ -0,0 +1,62 @@
+"""
+The approval queue costs one statement however long it is
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from src.database.connection import get_db_session
+from src.database.models import Student, User
+from src.services.cache import get_result_cache
+from src.services.student_service import list_approval_queue
+
+
+def _seed_pending(count: int):
+    with get_db_session() as session:
+        creators = [
+            User(email=f"teacher{i}@example.com", password_hash="x", name=f"Teacher {i}", role="teacher")
+            for i in range(3)
+        ]
+        session.add_all(creators)
+        session.flush()
+        session.add_all(
+            Student(
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                date_of_birth=date(2015, 1, 1),
+                enrollment_date=date(2024, 9, 1),
+                registration_status='pending_review',
+                created_by=creators[i % len(creators)].user_id,
+            )
+            for i in range(count)
+        )
+
+
+@contextmanager
+def _count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.mark.parametrize('queue_length', [1, 50])
+def test_approval_queue_is_one_statement(db_engine, queue_length):
+    _seed_pending(queue_length)
+    get_result_cache().clear()
+
+    with _count_statements(db_engine) as statements:
+        queue = list_approval_queue()
+
+    assert len(queue) == queue_length
+    assert all(row['created_by'].startswith('Teacher') for row in queue)
+    assert len(statements) == 1, statements
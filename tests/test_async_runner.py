@@ -0,0 +1,36 @@
+"""
+Sync page loaders run concurrently on the dedicated loader threads
+"""
+
+import threading
+
+from src.database import async_runner
+from src.database.async_runner import gather_loaders
+from src.utils.script_run import ScriptRun, attributed_to, current_script_run
+
+
+def test_sync_loaders_overlap():
+    # Each loader waits for all of them; run one after another they'd time out
+    barrier = threading.Barrier(3, timeout=5)
+
+    def loader():
+        barrier.wait()
+        return threading.current_thread().name
+
+    results = gather_loaders(first=loader, second=loader, third=loader)
+
+    assert len(set(results.values())) == 3
+    assert all(name.startswith("seims-loader") for name in results.values())
+
+
+def test_loader_pool_sized_from_connection_pool():
+    # sqlite:// resolves to the direct profile: 5 connections + 10 overflow
+    assert async_runner.loader_threads() == 15
+    assert async_runner._get_loader_executor()._max_workers == 15
+
+
+def test_sync_loaders_keep_page_attribution():
+    run = ScriptRun("pages/1_🏠_Dashboard.py", 1)
+    with attributed_to(run):
+        results = gather_loaders(run=current_script_run)
+    assert results["run"] == run
@@ -0,0 +1,73 @@
+"""
+Bulk review is one UPDATE and reports only the registrations it changed
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from src.database.connection import get_db_session
+from src.database.models import Student, User
+from src.services.student_service import patch_registration, review_registrations
+
+
+def _seed(statuses):
+    with get_db_session() as session:
+        reviewer = User(email="reviewer@example.com", password_hash="x", name="Reviewer", role="admin")
+        students = [
+            Student(
+                first_name=f"First{i}", last_name="Last", date_of_birth=date(2015, 1, 1),
+                enrollment_date=date(2024, 9, 1), registration_status=status, status='pending',
+            )
+            for i, status in enumerate(statuses)
+        ]
+        session.add(reviewer)
+        session.add_all(students)
+        session.flush()
+        return reviewer.user_id, [(s.student_id, s.version) for s in students]
+
+
+@contextmanager
+def _count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_only_queued_registrations_are_returned(db_engine):
+    reviewer_id, students = _seed(['pending_review', 'on_hold', 'approved', 'draft'])
+    ids = [student_id for student_id, _ in students]
+
+    with _count_statements(db_engine) as statements:
+        changed = review_registrations(ids, 'approved', reviewer_id)
+
+    assert len(statements) == 1, statements
+    assert {row['student_id'] for row in changed} == set(ids[:2])
+    assert all(row['registration_status'] == 'approved' and row['status'] == 'active' for row in changed)
+    with get_db_session() as session:
+        untouched = session.get(Student, ids[3])
+        assert (untouched.registration_status, untouched.reviewed_by) == ('draft', None)
+
+
+def test_stale_versions_drop_out(db_engine):
+    reviewer_id, students = _seed(['pending_review', 'pending_review'])
+    (fresh_id, fresh_version), (edited_id, edited_version) = students
+    # Someone edits the second registration after the reviewer loaded it
+    assert patch_registration(edited_id, values={'grade': '4'})
+
+    changed = review_registrations(
+        [fresh_id, edited_id], 'denied', reviewer_id,
+        versions={fresh_id: fresh_version, edited_id: edited_version},
+    )
+
+    assert [(row['student_id'], row['version']) for row in changed] == [(fresh_id, fresh_version + 1)]
+    with get_db_session() as session:
+        assert session.get(Student, edited_id).registration_status == 'pending_review'
@@ -0,0 +1,58 @@
+"""
+A half-open probe always reports back to the circuit breaker
+"""
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.database import connection
+from src.database.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from src.database.connection import get_circuit_breaker, get_db_session
+
+
+def _fail_to_connect(error):
+    def begin_session(session, retries, engine_name="primary"):
+        raise error
+    return begin_session
+
+
+def _half_open(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(RuntimeError("down"))
+    breaker._retry_at = 0.0  # backoff elapsed
+
+
+def test_probe_failing_with_other_error_reopens_breaker(db_engine, monkeypatch):
+    breaker = get_circuit_breaker()
+    _half_open(breaker)
+    monkeypatch.setattr(connection, '_begin_session', _fail_to_connect(PoolTimeoutError("pool exhausted")))
+
+    with pytest.raises(PoolTimeoutError):
+        with get_db_session():
+            pass
+
+    assert breaker.state == OPEN
+    assert breaker.snapshot()['trips'] == 2
+
+
+def test_other_errors_dont_count_while_closed(db_engine, monkeypatch):
+    breaker = get_circuit_breaker()
+    monkeypatch.setattr(connection, '_begin_session', _fail_to_connect(PoolTimeoutError("pool exhausted")))
+
+    for _ in range(breaker.failure_threshold + 1):
+        with pytest.raises(PoolTimeoutError):
+            with get_db_session(readonly=True):
+                pass
+
+    assert breaker.state == CLOSED
+
+
+def test_probe_success_closes_breaker(db_engine):
+    breaker = get_circuit_breaker()
+    _half_open(breaker)
+    assert breaker.state in (OPEN, HALF_OPEN)
+
+    with get_db_session(readonly=True):
+        pass
+
+    assert breaker.state == CLOSED
@@ -0,0 +1,50 @@
+"""
+DB_CONNECTION_PROFILE=auto picks the pool settings from the DATABASE_URL
+"""
+
+from dataclasses import replace
+
+import pytest
+from sqlalchemy.pool import NullPool
+
+from src.config.settings import get_settings
+from src.database.connection_profiles import detect_profile, engine_options, resolve_profile
+
+
+@pytest.mark.parametrize('url, profile', [
+    ('postgresql://user:pw@aws-0-eu-west-1.pooler.supabase.com:6543/postgres', 'transaction_pooler'),
+    ('postgresql+psycopg2://user:pw@pgbouncer.internal:6543/seims', 'transaction_pooler'),
+    ('postgresql://user:pw@aws-0-eu-west-1.pooler.supabase.com:5432/postgres', 'session_pooler'),
+    ('postgresql://user:pw@aws-0-eu-west-1.pooler.supabase.com/postgres', 'session_pooler'),
+    ('postgresql://user:pw@db.abcdefgh.supabase.co:5432/postgres', 'direct'),
+    ('postgresql://postgres@localhost:6432/seims', 'direct'),
+    ('postgresql://postgres@/seims?host=/var/run/postgresql', 'direct'),
+    ('sqlite://', 'direct'),
+    (None, 'session_pooler'),
+])
+def test_auto_detects_profile(url, profile):
+    assert detect_profile(url) == profile
+
+
+def test_transaction_pooler_keeps_no_app_side_pool():
+    config = replace(get_settings(), db_connection_profile='auto', db_pool_size=None, db_max_overflow=None)
+    profile = resolve_profile('postgresql://user:pw@pooler.example.com:6543/postgres', config)
+
+    assert profile.null_pool and not profile.prepared_statements
+    assert engine_options(profile)['poolclass'] is NullPool
+
+
+def test_overrides_apply_to_detected_profile():
+    config = replace(get_settings(), db_connection_profile='auto', db_pool_size=3, db_max_overflow=None)
+    profile = resolve_profile('postgresql://user:pw@pooler.example.com:5432/postgres', config)
+
+    assert profile.name == 'session_pooler'
+    assert (profile.pool_size, profile.max_overflow) == (3, 20)
+
+
+def test_explicit_profile_wins_over_port():
+    config = replace(get_settings(), db_connection_profile='direct')
+    assert resolve_profile('postgresql://user:pw@pooler.example.com:6543/postgres', config).name == 'direct'
+
+    with pytest.raises(ValueError):
+        resolve_profile('sqlite://', replace(config, db_connection_profile='pgbouncer'))
@@ -0,0 +1,62 @@
+"""
+Dashboard counters are one aggregate statement, then served from cache
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from src.database.connection import get_db_session
+from src.database.models import Student, User
+from src.services.cache import get_result_cache
+from src.services.dashboard_service import load_dashboard_metrics
+
+
+def _seed():
+    with get_db_session() as session:
+        session.add_all([
+            User(email="active@example.com", password_hash="x", name="Active", role="teacher"),
+            User(email="inactive@example.com", password_hash="x", name="Inactive", role="teacher", is_active=False),
+        ])
+        for i, (status, registration_status) in enumerate([
+            ('active', 'approved'),
+            ('active', 'approved'),
+            ('inactive', 'pending_review'),
+            ('inactive', 'pending_review'),
+            ('inactive', 'on_hold'),
+        ]):
+            session.add(Student(
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                date_of_birth=date(2015, 1, 1),
+                enrollment_date=date(2024, 9, 1),
+                status=status,
+                registration_status=registration_status,
+            ))
+
+
+@contextmanager
+def _count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_dashboard_counters_are_one_statement(db_engine):
+    _seed()
+    get_result_cache().clear()
+
+    with _count_statements(db_engine) as statements:
+        metrics = load_dashboard_metrics()
+        assert load_dashboard_metrics() == metrics
+
+    assert metrics == {'total_users': 1, 'active_students': 2, 'pending_approvals': 2, 'on_hold': 1}
+    assert len(statements) == 1, statements
@@ -0,0 +1,105 @@
+"""
+Streaming export in every format, with and without flattened JSON columns
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import date, time
+
+import pytest
+
+from src.database.connection import get_db_session
+from src.database.models import Session, Student, User
+from src.services import export_service
+from src.services.export_service import EXPORT_FORMATS, export_table
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pq = None
+
+
+def _seed():
+    with get_db_session() as session:
+        teacher = User(email="teacher@example.com", password_hash="x", name="Teacher", role="teacher")
+        student = Student(
+            first_name="Ada", last_name="Lovelace", date_of_birth=date(2015, 1, 1), enrollment_date=date(2024, 9, 1),
+        )
+        session.add_all([teacher, student])
+        session.flush()
+        session.add_all([
+            Session(
+                student_id=student.student_id, teacher_id=teacher.user_id, session_date=date(2026, 3, 2),
+                start_time=time(9, 30), progress_ratings={'reading': 4, 'focus': {'score': 3.5, 'note': "calm"}},
+                goals_addressed=["g1", "g2"],
+            ),
+            Session(
+                student_id=student.student_id, teacher_id=teacher.user_id, session_date=date(2026, 3, 3),
+                start_time=time(10, 0), progress_ratings={'reading': True},
+            ),
+            Session(
+                student_id=student.student_id, teacher_id=teacher.user_id, session_date=date(2026, 3, 4),
+                start_time=time(11, 0),
+            ),
+        ])
+
+
+def _read(fmt: str, data: bytes) -> list:
+    if fmt == 'csv':
+        return list(csv.DictReader(io.StringIO(data.decode('utf-8'))))
+    if fmt == 'jsonl':
+        return [json.loads(line) for line in data.decode('utf-8').splitlines()]
+    return pq.read_table(io.BytesIO(data)).to_pylist()
+
+
+@pytest.mark.parametrize('flatten', [False, True])
+@pytest.mark.parametrize('fmt', EXPORT_FORMATS)
+def test_export_sessions(db_engine, fmt, flatten):
+    if fmt == 'parquet' and pq is None:
+        pytest.skip("pyarrow is not installed")
+    _seed()
+    out = io.BytesIO()
+
+    assert export_table('sessions', fmt, out, flatten=flatten, batch_size=2) == 3
+
+    rows = _read(fmt, out.getvalue())
+    assert len(rows) == 3
+    first, second = rows[0], rows[1]
+    if not flatten:
+        ratings = first['progress_ratings']
+        assert (json.loads(ratings) if isinstance(ratings, str) else ratings)['reading'] == 4
+    elif fmt == 'jsonl':
+        assert first['progress_ratings.reading'] == 4
+        assert first['progress_ratings.focus.score'] == 3.5
+        assert second['progress_ratings.reading'] is True
+    else:
+        # Flattened keys are string columns; leaves of any JSON type are written as text
+        assert first['progress_ratings.reading'] == "4"
+        assert first['progress_ratings.focus.score'] == "3.5"
+        assert first['progress_ratings.focus.note'] == "calm"
+        assert second['progress_ratings.reading'] == "true"
+        assert json.loads(first['goals_addressed']) == ["g1", "g2"]
+        assert rows[2]['progress_ratings.reading'] in (None, '')
+
+
+def test_failed_export_leaves_no_file(db_engine, tmp_path, monkeypatch):
+    _seed()
+    path = tmp_path / "sessions.csv"
+    path.write_bytes(b"previous export\n")
+
+    def failing_writer(batches, columns, out):
+        out.write(b"half a file")
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(export_service, '_write_csv', failing_writer)
+    with pytest.raises(RuntimeError):
+        export_table('sessions', 'csv', str(path))
+
+    assert path.read_bytes() == b"previous export\n"
+    assert os.listdir(tmp_path) == ["sessions.csv"]
+
+    monkeypatch.undo()
+    assert export_table('sessions', 'csv', str(path)) == 3
+    assert len(path.read_text().splitlines()) == 4
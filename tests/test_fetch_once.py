@@ -0,0 +1,61 @@
+"""
+fetch_once shares a result per rerun without holding the rerun's lock while loading
+"""
+
+import threading
+
+import pytest
+
+from src.utils import lazy_tabs
+from src.utils.lazy_tabs import fetch_once
+from src.utils.script_run import RunState
+
+
+@pytest.fixture
+def run_state(monkeypatch):
+    state = RunState()
+    monkeypatch.setattr(lazy_tabs, 'current_run_state', lambda: state)
+    return state
+
+
+def test_second_call_reuses_first_result(run_state):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert fetch_once('users', loader) == 1
+    assert fetch_once('users', loader) == 1
+    assert fetch_once('teachers', loader) == 2
+
+
+def test_slow_loader_doesnt_block_other_keys(run_state):
+    release = threading.Event()
+    slow = threading.Thread(target=fetch_once, args=('slow', lambda: release.wait(5)))
+    slow.start()
+    try:
+        # Would deadlock-wait for the slow loader if it ran under the lock
+        done = threading.Thread(target=fetch_once, args=('fast', lambda: 'fast'))
+        done.start()
+        done.join(1)
+        assert not done.is_alive()
+    finally:
+        release.set()
+        slow.join()
+    assert run_state['fetch_once'] == {'slow': True, 'fast': 'fast'}
+
+
+def test_first_stored_result_wins(run_state):
+    # A racing caller finishing second gets the stored value, not its own
+    def loader():
+        run_state['fetch_once']['key'] = 'first'
+        return 'second'
+
+    assert fetch_once('key', loader) == 'first'
+
+
+def test_failures_are_not_remembered(run_state):
+    with pytest.raises(RuntimeError):
+        fetch_once('key', lambda: (_ for _ in ()).throw(RuntimeError("down")))
+    assert fetch_once('key', lambda: 'ok') == 'ok'
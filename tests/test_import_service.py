@@ -0,0 +1,105 @@
+"""
+Bulk import: vectorized validation, ISO-only dates and the SQLite batch load
+"""
+
+import io
+from datetime import date, datetime
+
+import pandas as pd
+
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.services import import_service
+from src.services.import_service import import_students, read_student_file, validate_students
+
+TODAY = date(2026, 6, 1)
+
+
+def _csv(text: str) -> pd.DataFrame:
+    return read_student_file(io.BytesIO(text.encode('utf-8')), 'students.csv')
+
+
+def _errors(errors: pd.DataFrame) -> set:
+    return {(row, column, error) for row, column, error in errors[['row', 'column', 'error']].itertuples(index=False)}
+
+
+def test_validate_reports_each_problem_by_row(db_engine):
+    df = _csv(
+        "first_name,last_name,dob,gender,guardian_email\n"
+        "Asha,Rao,2016-04-21,female,meera@example.com\n"  # 2: valid
+        ",Rao,2016-04-21,,\n"                               # 3: missing first name
+        "Ravi,Iyer,04/05/2016,,\n"                          # 4: ambiguous date
+        "Neha,Shah,2030-01-01,,\n"                          # 5: born in the future
+        "Omar,Khan,2015-02-30,Robot,not-an-email\n"         # 6: no such day, gender, email
+        "asha,RAO,2016-04-21,,\n"                           # 7: duplicate of row 2
+    )
+
+    valid, errors = validate_students(df, today=TODAY)
+
+    assert list(valid['row']) == [2]
+    assert valid.loc[0, 'gender'] == 'Female'
+    assert _errors(errors) == {
+        (3, 'first_name', "Required"),
+        (4, 'date_of_birth', "Not a valid date (use YYYY-MM-DD)"),
+        (5, 'date_of_birth', "Date of birth is in the future"),
+        (5, 'date_of_birth', "Date of birth must be before the enrollment date"),
+        (6, 'date_of_birth', "Not a valid date (use YYYY-MM-DD)"),
+        (6, 'gender', "Must be one of: Male, Female, Other, Prefer not to say"),
+        (6, 'guardian_email', "Not a valid email address"),
+        (7, 'first_name', "Duplicate of an earlier row (same name and date of birth)"),
+    }
+
+
+def test_excel_date_cells_are_accepted(db_engine):
+    df = pd.DataFrame({
+        'first_name': ["Asha", "Ravi"],
+        'last_name': ["Rao", "Iyer"],
+        'date_of_birth': [datetime(2016, 4, 21), "2016/04/05"],
+    }, dtype=object)
+
+    valid, errors = validate_students(df, today=TODAY)
+
+    assert list(valid['date_of_birth']) == [pd.Timestamp(2016, 4, 21)]
+    assert _errors(errors) == {(3, 'date_of_birth', "Not a valid date (use YYYY-MM-DD)")}
+
+
+def test_sqlite_batch_load(db_engine, monkeypatch):
+    monkeypatch.setattr(import_service, '_BATCH_SIZE', 2)
+    df = _csv(
+        "first_name,last_name,date_of_birth,grade,guardian_name,guardian_phone\n"
+        + "".join(f"First{i},Last{i},2016-01-0{i + 1},3,Guardian {i},555-010{i}\n" for i in range(5))
+    )
+
+    result = import_students(df, registration_status='draft')
+
+    assert result.valid_rows == 5 and len(result.imported) == 5
+    assert list(result.imported['row']) == [2, 3, 4, 5, 6]
+    with get_db_session() as session:
+        students = session.query(Student).order_by(Student.student_id).all()
+        assert [s.admission_number for s in students] == list(result.imported['admission_number'])
+        assert {s.registration_status for s in students} == {'draft'}
+        assert {s.registration_step for s in students} == {3}
+
+
+def test_students_added_after_validation_are_skipped(db_engine, monkeypatch):
+    validate = import_service.validate_students
+
+    def validate_then_race(df):
+        checked = validate(df)
+        # Another import commits the same child between validation and load
+        with get_db_session() as session:
+            session.add(Student(
+                first_name="Asha", last_name="Rao", date_of_birth=date(2016, 4, 21), enrollment_date=TODAY,
+            ))
+        return checked
+
+    monkeypatch.setattr(import_service, 'validate_students', validate_then_race)
+    df = _csv("first_name,last_name,date_of_birth\nAsha,Rao,2016-04-21\nRavi,Iyer,2016-05-04\n")
+
+    result = import_students(df)
+
+    assert list(result.imported['first_name']) == ["Ravi"]
+    assert result.valid_rows == 1
+    assert _errors(result.errors) == {(2, 'first_name', "A student with this name and date of birth already exists")}
+    with get_db_session() as session:
+        assert session.query(Student).filter(Student.first_name == "Asha").count() == 1
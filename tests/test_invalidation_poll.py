@@ -0,0 +1,36 @@
+"""
+Poll mode notices committed inserts, updates and deletes per table
+"""
+
+from datetime import date
+
+from src.database.connection import get_db_session
+from src.database.models import Student, User
+from src.services.invalidation_bus import InvalidationBus
+
+
+def test_poll_detects_changes_per_table(db_engine):
+    with get_db_session() as session:
+        student = Student(
+            first_name="Ada", last_name="Lovelace", date_of_birth=date(2015, 1, 1), enrollment_date=date(2024, 9, 1),
+        )
+        session.add(student)
+        session.flush()
+        student_id = student.student_id
+
+    bus = InvalidationBus('poll')
+    assert bus.poll_once() == set()
+    assert bus.poll_once() == set()
+
+    with get_db_session() as session:
+        session.get(Student, student_id).grade = '5'
+    assert bus.poll_once() == {'students'}
+
+    with get_db_session() as session:
+        session.add(User(email="new@example.com", password_hash="x", name="New", role="teacher"))
+    assert bus.poll_once() == {'users'}
+
+    with get_db_session() as session:
+        session.delete(session.get(Student, student_id))
+    assert bus.poll_once() == {'students'}
+    assert bus.poll_once() == set()
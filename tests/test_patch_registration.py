@@ -0,0 +1,73 @@
+"""
+Wizard saves are one UPDATE: merged JSON, forward-only step, version bump
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.services.student_service import patch_registration, student_details
+
+
+def _seed():
+    with get_db_session() as session:
+        student = Student(
+            first_name="Ada",
+            last_name="Lovelace",
+            date_of_birth=date(2015, 1, 1),
+            enrollment_date=date(2024, 9, 1),
+            registration_status='draft',
+            registration_step=3,
+            contact_info={'address': {'city': "London"}, 'phone': "555-0100"},
+        )
+        session.add(student)
+        session.flush()
+        return student.student_id, student.version
+
+
+def _load(student_id):
+    with get_db_session() as session:
+        return session.get(Student, student_id, options=student_details('contact'))
+
+
+@contextmanager
+def _count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_patch_is_one_update_with_version_bump(db_engine):
+    student_id, version = _seed()
+
+    with _count_statements(db_engine) as statements:
+        assert patch_registration(
+            student_id, step=2, merge={'contact_info': {'phone': "555-0199"}}, version=version
+        )
+
+    assert len(statements) == 1 and statements[0].lstrip().upper().startswith('UPDATE'), statements
+    student = _load(student_id)
+    assert student.version == version + 1
+    assert student.registration_step == 3  # going back never lowers the step
+    assert student.contact_info == {'address': {'city': "London"}, 'phone': "555-0199"}
+
+
+def test_stale_version_changes_nothing(db_engine):
+    student_id, version = _seed()
+    assert patch_registration(student_id, step=4, version=version)
+
+    assert not patch_registration(student_id, values={'first_name': "Stale"}, version=version)
+    student = _load(student_id)
+    assert student.first_name == "Ada"
+    assert student.registration_step == 4
+    assert student.version == version + 1
@@ -0,0 +1,79 @@
+"""
+The pool warmer counts connections the app is using towards its target
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+from src.database.pool_warmer import warm_engine
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    """File SQLite database behind a QueuePool of 4 (+2 overflow)"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'warm.db'}", poolclass=QueuePool, pool_size=4, max_overflow=2,
+    )
+    yield engine
+    engine.dispose()
+
+
+@contextmanager
+def _count_connects(engine):
+    opened = []
+    listener = lambda dbapi_connection, record: opened.append(dbapi_connection)  # noqa: E731
+    event.listen(engine, 'connect', listener)
+    try:
+        yield opened
+    finally:
+        event.remove(engine, 'connect', listener)
+
+
+def test_cold_pool_is_filled_to_target(pooled_engine):
+    with _count_connects(pooled_engine) as opened:
+        assert warm_engine(pooled_engine, 3) == 3
+    assert len(opened) == 3
+    assert pooled_engine.pool.checkedin() == 3
+    assert pooled_engine.pool.checkedout() == 0
+
+
+def test_checked_out_connections_count_towards_target(pooled_engine):
+    in_use = [pooled_engine.connect() for _ in range(2)]
+    try:
+        with _count_connects(pooled_engine) as opened:
+            assert warm_engine(pooled_engine, 3) == 3
+        # Only the missing connection is opened; the app's two stay checked out
+        assert len(opened) == 1
+        assert pooled_engine.pool.checkedout() == 2
+        assert pooled_engine.pool.checkedin() == 1
+    finally:
+        for connection in in_use:
+            connection.close()
+
+
+def test_nothing_opened_when_app_already_uses_target(pooled_engine):
+    in_use = [pooled_engine.connect() for _ in range(3)]
+    try:
+        with _count_connects(pooled_engine) as opened:
+            assert warm_engine(pooled_engine, 2) == 3
+        assert opened == []
+        assert pooled_engine.pool.checkedin() == 0
+    finally:
+        for connection in in_use:
+            connection.close()
+
+
+def test_keepalive_reuses_idle_connections(pooled_engine):
+    warm_engine(pooled_engine, 3)
+    with _count_connects(pooled_engine) as opened:
+        assert warm_engine(pooled_engine, 3) == 3
+    assert opened == []
+
+
+def test_target_capped_at_pool_size(pooled_engine):
+    # Overflow connections would be closed on return, so they're never warmed
+    assert warm_engine(pooled_engine, 10) == 4
+    assert pooled_engine.pool.checkedin() == 4
@@ -0,0 +1,55 @@
+"""
+Cached read models are loaded from the primary even when a replica is configured
+"""
+
+from datetime import date
+
+import pytest
+
+from src.config.settings import reload_settings
+from src.database.connection import _get_engine, _get_read_engine, dispose_engines, get_db_session
+from src.database.models import Base, Student, User
+from src.services.cache import get_result_cache
+from src.services.dashboard_service import load_dashboard_metrics
+from src.services.student_service import list_roster, roster_filter_options
+from src.services.user_service import list_teachers, search_users
+
+
+@pytest.fixture
+def lagging_replica(monkeypatch):
+    """A primary and an (empty) replica that never catches up: two separate in-memory databases"""
+    monkeypatch.setenv('DATABASE_READ_URL', 'sqlite://')
+    reload_settings()
+    get_result_cache().clear()
+    primary, _ = _get_engine()
+    replica, _ = _get_read_engine()
+    assert replica is not primary
+    for engine in (primary, replica):
+        Base.metadata.create_all(engine)
+    yield
+    monkeypatch.delenv('DATABASE_READ_URL')
+    reload_settings()
+    get_result_cache().clear()
+    dispose_engines()
+
+
+def test_cached_read_models_see_primary_writes(lagging_replica):
+    # Warm the cache, then write; the commit invalidates the entries
+    load_dashboard_metrics()
+    list_roster()
+    with get_db_session() as session:
+        session.add(User(email="t@example.com", password_hash="x", name="Teacher", role="teacher"))
+        session.add(Student(
+            first_name="Ada",
+            last_name="Lovelace",
+            date_of_birth=date(2015, 1, 1),
+            enrollment_date=date(2024, 9, 1),
+            grade="3",
+            registration_status='pending_review',
+        ))
+
+    assert load_dashboard_metrics()['pending_approvals'] == 1
+    assert [row['first_name'] for row in list_roster().rows] == ["Ada"]
+    assert roster_filter_options()['grades'] == ["3"]
+    assert [row['name'] for row in search_users().rows] == ["Teacher"]
+    assert [row['name'] for row in list_teachers()] == ["Teacher"]
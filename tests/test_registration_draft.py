@@ -0,0 +1,45 @@
+"""
+Draft saves keep the buffered changes until an UPDATE actually lands
+"""
+
+from datetime import date
+
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.services.registration_draft import RegistrationDraft
+from src.services.student_service import load_registration
+
+
+def _create_registration() -> int:
+    with get_db_session() as session:
+        student = Student(
+            first_name="Ada",
+            last_name="Lovelace",
+            date_of_birth=date(2015, 1, 1),
+            enrollment_date=date(2024, 9, 1),
+            registration_status='draft',
+        )
+        session.add(student)
+        session.flush()
+        return student.student_id
+
+
+def test_flush_writes_and_clears_buffer(db_engine):
+    draft = RegistrationDraft(_create_registration())
+    draft.stage(step=2, merge={'contact_info': {'phone': '555-0100'}})
+
+    assert draft.flush()
+    assert not draft.dirty and not draft.save_failed
+    assert load_registration(draft.student_id)['contact_info'] == {'phone': '555-0100'}
+
+
+def test_flush_keeps_buffer_when_registration_is_gone(db_engine):
+    student_id = _create_registration()
+    draft = RegistrationDraft(student_id)
+    draft.stage(step=2, merge={'contact_info': {'phone': '555-0100'}})
+    with get_db_session() as session:
+        session.delete(session.get(Student, student_id))
+
+    assert not draft.flush()
+    assert draft.dirty and draft.save_failed
+    assert draft.saves == 0 and draft.last_saved_at is None
@@ -0,0 +1,58 @@
+"""
+Saving review notes mid-review keeps the reviewer's claim and decision state
+"""
+
+from datetime import date
+
+from src.database.connection import get_db_session
+from src.database.models import Student, User
+from src.services.student_service import claim_next_registration, patch_registration, student_details
+
+
+def _seed():
+    with get_db_session() as session:
+        reviewer = User(email="reviewer@example.com", password_hash="x", name="Reviewer", role="admin")
+        student = Student(
+            first_name="Ada",
+            last_name="Lovelace",
+            date_of_birth=date(2015, 1, 1),
+            enrollment_date=date(2024, 9, 1),
+            registration_status='pending_review',
+        )
+        session.add_all([reviewer, student])
+        session.flush()
+        return reviewer.user_id, student.student_id
+
+
+def _load(student_id):
+    with get_db_session() as session:
+        return session.get(Student, student_id, options=student_details('notes'))
+
+
+def test_notes_only_save_keeps_claim(db_engine):
+    reviewer_id, student_id = _seed()
+    claim = claim_next_registration(reviewer_id)
+    assert claim['student_id'] == student_id
+
+    assert patch_registration(
+        student_id, values={'internal_notes': "Call parents", 'parent_notes': ""}, version=claim['version']
+    )
+
+    student = _load(student_id)
+    assert student.internal_notes == "Call parents"
+    assert student.version == claim['version'] + 1
+    assert student.claimed_by == reviewer_id
+    assert student.claimed_until == claim['claimed_until']
+    assert student.reviewed_by is None and student.reviewed_at is None
+    assert student.registration_status == 'pending_review'
+    # Someone else grabbing the registration now finds it still claimed
+    assert claim_next_registration(reviewer_id + 1) is None
+
+
+def test_notes_only_save_detects_lost_update(db_engine):
+    _, student_id = _seed()
+    version = _load(student_id).version
+    assert patch_registration(student_id, values={'internal_notes': "first"}, version=version)
+
+    assert not patch_registration(student_id, values={'internal_notes': "stale"}, version=version)
+    assert _load(student_id).internal_notes == "first"
@@ -0,0 +1,68 @@
+"""
+Keyset roster pages cover every student exactly once, ties included
+"""
+
+from datetime import date
+
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.services.cache import get_result_cache
+from src.services.student_service import list_roster
+
+
+def _seed(names):
+    with get_db_session() as session:
+        session.add_all(
+            Student(
+                first_name=first,
+                last_name=last,
+                date_of_birth=date(2015, 1, 1),
+                enrollment_date=date(2024, 9, 1),
+                grade='3' if i % 2 else '4',
+            )
+            for i, (first, last) in enumerate(names)
+        )
+
+
+def _all_pages(**filters):
+    pages, cursor = [], None
+    while True:
+        page = list_roster(after=cursor, **filters)
+        pages.append(page.rows)
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_pages_split_on_name_ties(db_engine):
+    # Six students share a name, so page boundaries fall inside the tie
+    names = [("Sam", "Lee")] * 6 + [("Ada", "Byron"), ("Zoe", "Adams"), ("Sam", "Khan")]
+    _seed(names)
+    get_result_cache().clear()
+
+    pages = _all_pages(page_size=4)
+    rows = [row for page in pages for row in page]
+
+    assert [len(page) for page in pages] == [4, 4, 1]
+    assert len({row['student_id'] for row in rows}) == len(names)
+    keys = [(row['first_name'], row['last_name'], row['student_id']) for row in rows]
+    assert keys == sorted(keys)
+
+
+def test_exact_multiple_has_no_empty_last_page(db_engine):
+    _seed([(f"First{i}", "Last") for i in range(8)])
+    get_result_cache().clear()
+
+    pages = _all_pages(page_size=4)
+
+    assert [len(page) for page in pages] == [4, 4]
+
+
+def test_filters_apply_across_pages(db_engine):
+    _seed([(f"First{i:02d}", "Last") for i in range(10)])
+    get_result_cache().clear()
+
+    rows = [row for page in _all_pages(page_size=2, grade='3') for row in page]
+
+    assert len(rows) == 5
+    assert {row['grade'] for row in rows} == {'3'}
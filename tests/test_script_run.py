@@ -0,0 +1,66 @@
+"""
+Page attribution walks the stack once per rerun, and query fingerprints
+keep PostgreSQL casts intact
+"""
+
+import os
+
+from src.database.instrumentation import fingerprint
+from src.utils import script_run
+
+_PAGE = os.path.join(script_run._PAGES_DIR, "9_Test_Page.py")
+
+
+class _FakeContext:
+    """Stands in for Streamlit's ScriptRunContext: reset() swaps ``cursors``"""
+
+    def __init__(self):
+        self.cursors = {}
+
+    def reset(self):
+        self.cursors = {}
+
+
+def _run_page(body: str) -> dict:
+    namespace = {}
+    exec(compile(body, _PAGE, "exec"), namespace)
+    return namespace
+
+
+def test_page_resolved_once_per_rerun(monkeypatch):
+    ctx = _FakeContext()
+    walks = []
+    page_frame = script_run._page_frame
+    monkeypatch.setattr(script_run, "_script_run_ctx", lambda: ctx)
+    monkeypatch.setattr(script_run, "_page_frame", lambda: walks.append(1) or page_frame())
+
+    body = (
+        "from src.utils.script_run import current_run_state, current_script_run\n"
+        "runs = [current_script_run() for _ in range(5)]\n"
+        "state = current_run_state()\n"
+    )
+    first = _run_page(body)
+    assert len(walks) == 1
+    assert {run.page for run in first['runs']} == {"9_Test_Page.py"}
+    assert len({run.run_id for run in first['runs']}) == 1
+
+    ctx.reset()
+    second = _run_page(body)
+    assert len(walks) == 2
+    assert second['runs'][0].run_id != first['runs'][0].run_id
+    assert second['state'] is not first['state']
+
+
+def test_callback_miss_is_not_cached(monkeypatch):
+    ctx = _FakeContext()
+    monkeypatch.setattr(script_run, "_script_run_ctx", lambda: ctx)
+
+    # Widget callbacks run on the script thread before the page body
+    assert script_run.current_script_run() is None
+    page = _run_page("from src.utils.script_run import current_script_run\nrun = current_script_run()\n")
+    assert page['run'].page == "9_Test_Page.py"
+
+
+def test_fingerprint_keeps_casts():
+    assert fingerprint("SELECT :id, data::jsonb FROM t WHERE x = :x") == "SELECT ?, data::jsonb FROM t WHERE x = ?"
+    assert fingerprint("SELECT CAST(%(v)s AS TEXT)::varchar") == "SELECT CAST(? AS TEXT)::varchar"
@@ -0,0 +1,56 @@
+"""
+Student search: FTS5 index created with the schema, LIKE fallback without it
+"""
+
+from datetime import date
+
+from sqlalchemy import text
+
+from src.database.connection import get_db_session
+from src.database.models import Student
+from src.services.search_service import search_students
+
+
+def _seed():
+    with get_db_session() as session:
+        students = [
+            Student(
+                first_name="Mary-Jane", last_name="Watson", date_of_birth=date(2015, 1, 1),
+                enrollment_date=date(2024, 9, 1), registration_status='approved', grade='3',
+                contact_info={'primary_guardian': {'full_name': "Anna Watson"}},
+            ),
+            Student(
+                first_name="Peter", last_name="Parker", date_of_birth=date(2015, 1, 1),
+                enrollment_date=date(2024, 9, 1), registration_status='pending_review', grade='4',
+            ),
+        ]
+        session.add_all(students)
+        session.flush()
+        return [s.student_id for s in students]
+
+
+def test_create_all_sets_up_fts_index(db_engine):
+    with db_engine.connect() as connection:
+        names = set(connection.scalars(text("SELECT name FROM sqlite_master WHERE name LIKE 'students_fts%'")))
+    assert {'students_fts', 'students_fts_insert', 'students_fts_update', 'students_fts_delete'} <= names
+
+    mary, peter = _seed()
+    assert search_students("mary wat") == [mary]
+    assert search_students("anna") == [mary]  # guardian name, FTS only
+    assert search_students("par", statuses=("approved",)) == []
+
+    with get_db_session() as session:
+        session.get(Student, peter).last_name = "Quill"
+    assert search_students("quill") == [peter]
+
+
+def test_falls_back_to_like_without_fts_table(db_engine):
+    mary, peter = _seed()
+    with db_engine.begin() as connection:
+        for name in ('students_fts_insert', 'students_fts_update', 'students_fts_delete'):
+            connection.execute(text(f"DROP TRIGGER {name}"))
+        connection.execute(text("DROP TABLE students_fts"))
+
+    assert search_students("ARK") == [peter]
+    assert search_students("mary jane") == [mary]
+    assert search_students("peter", statuses=("approved",)) == []
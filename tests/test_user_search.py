@@ -0,0 +1,50 @@
+"""
+Admin Panel user lookup: literal prefix matches, keyset pages newest first
+"""
+
+from src.database.connection import get_db_session
+from src.database.models import User
+from src.services.cache import get_result_cache
+from src.services.user_service import search_users
+
+
+def _seed(users):
+    with get_db_session() as session:
+        session.add_all(
+            User(email=email, password_hash="x", name=name, role=role)
+            for name, email, role in users
+        )
+
+
+def test_pages_cover_every_user_newest_first(db_engine):
+    _seed([(f"User {i}", f"user{i}@example.com", 'teacher') for i in range(7)])
+    get_result_cache().clear()
+
+    pages, cursor = [], None
+    while True:
+        page = search_users(after=cursor, page_size=3)
+        pages.append(page.rows)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    ids = [row['user_id'] for rows in pages for row in rows]
+    assert [len(rows) for rows in pages] == [3, 3, 1]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 7
+    assert 'password_hash' not in pages[0][0]
+
+
+def test_prefix_search_is_literal_and_case_insensitive(db_engine):
+    _seed([
+        ("Ann Lee", "ann@example.com", 'teacher'),
+        ("Annabel Ray", "bel@example.com", 'admin'),
+        ("Joanna Fox", "a_n@example.com", 'teacher'),
+        ("Zed", "a%n@example.com", 'teacher'),
+    ])
+    get_result_cache().clear()
+
+    assert {r['name'] for r in search_users("ANN").rows} == {"Ann Lee", "Annabel Ray"}
+    assert {r['name'] for r in search_users("ann", role='admin').rows} == {"Annabel Ray"}
+    # LIKE wildcards in the search box match themselves only
+    assert [r['name'] for r in search_users("a_").rows] == ["Joanna Fox"]
+    assert [r['name'] for r in search_users("a%").rows] == ["Zed"]